@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+import click
+import pandas as pd
+from config import ConfigEnv
+from benchmarks.bench_pipeline import BENCH_ENV, prepare_workspace, run_command
+from benchmarks.synthetic_mla import SIZES
+
+
+def default_workers():
+    """Potencias de 2 hasta el número de núcleos, más el número de núcleos: 1, 2, 4, ..., N."""
+    workers, n = [], 1
+    while n < os.cpu_count():
+        workers.append(n)
+        n *= 2
+    return workers + [os.cpu_count()]
+
+
+@click.command()
+@click.option("--size", default='100k', type=click.Choice(list(SIZES)), help='tamaño del dataset sintético')
+@click.option("--workers", default=None,
+              help='procesos a medir, separados por coma (por defecto 1, 2, 4, ..., N)')
+@click.option("--shard_rows", default=ConfigEnv.FE_SHARD_ROWS, help='filas por shard del pool')
+@click.option("--workdir", default='data/benchmarks', help='carpeta de los espacios de trabajo por tamaño')
+@click.option("--output", default=None, help='archivo JSON de resultados (por defecto en reports/benchmarks)')
+@click.option("--seed", default=42, help='semilla del generador sintético')
+def main(size, workers, shard_rows, workdir, output, seed):
+    """
+    Curva de escalamiento del pool de procesos de las variables de texto y geográficas de
+    `feaure-engineering-products`: prepara el espacio de trabajo del tamaño indicado (como
+    `bench_pipeline`), ejecuta `processed-data-products` una vez y luego `feaure-engineering-products`
+    con cada número de procesos, sin caché de etapas y con los cachés de texto y embeddings vacíos.
+
+    Reporta por número de procesos el tiempo del comando y de la etapa `row_features`, el speedup y la
+    eficiencia respecto de un proceso, y si `df_feature_engineering` es idéntico al de un proceso.
+    """
+    workers = [int(n) for n in workers.split(',')] if workers else default_workers()
+    if 1 not in workers:
+        workers = [1] + workers
+    workspace, file_name = prepare_workspace(workdir, size, seed)
+    env = {'STAGE_CACHE': '0', 'FE_SHARD_ROWS': str(shard_rows)}
+    rows = SIZES[size]
+
+    print(f"[{size}] processed-data-products ...")
+    result = run_command('processed-data-products', workspace, file_name, rows, env=env)
+    if result['returncode'] != 0:
+        raise click.ClickException(f"processed-data-products falló:\n{result['error']}")
+
+    results = {'created_at': datetime.now().isoformat(), 'size': size, 'rows': rows,
+               'shard_rows': shard_rows, 'cpu_count': os.cpu_count(), 'seed': seed, 'env': BENCH_ENV,
+               'workers': {}}
+    reference = None
+    for n_workers in sorted(set(workers)):
+        # Cachés de texto y embeddings vacíos: cada corrida calcula todas las filas
+        shutil.rmtree(workspace / 'data' / 'cache', ignore_errors=True)
+        print(f"[{size}] feaure-engineering-products con {n_workers} procesos ...")
+        result = run_command('feaure-engineering-products', workspace, file_name, rows,
+                             env={**env, 'FE_N_WORKERS': str(n_workers)})
+        if result['returncode'] != 0:
+            raise click.ClickException(f"feaure-engineering-products falló con {n_workers} procesos:\n"
+                                       f"{result['error']}")
+        stages = {stage['stage']: stage for stage in result.get('stages', [])}
+        df = pd.read_parquet(workspace / 'data' / 'processed' / 'df_feature_engineering.parquet')
+        reference = df if reference is None else reference
+        results['workers'][n_workers] = {
+            'wall_seconds': result['wall_seconds'],
+            'row_features_seconds': stages['row_features']['wall_seconds'],
+            'peak_rss_mb': result.get('peak_rss_mb'),
+            'identical': df.equals(reference),
+        }
+
+    base = results['workers'][1]['row_features_seconds']
+    print(f"{'procesos':>8} {'comando (s)':>12} {'row_features (s)':>17} {'filas/s':>10} {'speedup':>8} "
+          f"{'eficiencia':>10} {'idéntico':>9}")
+    for n_workers, result in results['workers'].items():
+        result['speedup'] = base / result['row_features_seconds']
+        result['efficiency'] = result['speedup'] / n_workers
+        print(f"{n_workers:>8} {result['wall_seconds']:>12.1f} {result['row_features_seconds']:>17.1f} "
+              f"{rows / result['row_features_seconds']:>10,.0f} {result['speedup']:>8.2f} "
+              f"{result['efficiency']:>10.0%} {str(result['identical']):>9}")
+
+    timestamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    output = Path(output or f"reports/benchmarks/feature_workers_{timestamp}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados guardados en {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+import click
+import joblib
+import numpy as np
+from pathlib import Path
+from constants.constants import feature, feature_engineering, target
+from src.artifact_store import ArtifactStore
+from src.forest_arrays import ForestArrays
+from src.model_training import ModelTraining
+
+
+def single_row_latency(model, X, n_rows):
+    """Mediana en ms de `predict_proba` con una sola fila."""
+    latencies = []
+    for i in range(min(n_rows, len(X))):
+        start = time.perf_counter()
+        model.predict_proba(X[i:i + 1])
+        latencies.append(time.perf_counter() - start)
+    return np.median(latencies) * 1e3
+
+
+@click.command()
+@click.option("--model_path", default="models/best_rf.pkl", help='pickle del RandomForest entrenado')
+@click.option("--arrays_path", default="models/best_rf_arrays", help='carpeta de la exportación a arreglos')
+@click.option("--n_single", default=200, help='predicciones de una fila para la latencia unitaria')
+def main(model_path, arrays_path, n_single):
+    """
+    Compara el pickle del RandomForest con su exportación a arreglos planos (`ForestArrays`): tiempo de
+    carga, tamaño en disco, latencia de una fila y por lote, y paridad de `predict_proba` sobre la matriz
+    de `data/processed/df_feature_engineering.parquet`.
+    """
+    start = time.perf_counter()
+    forest = joblib.load(model_path)
+    pickle_load = time.perf_counter() - start
+
+    ForestArrays.from_sklearn(forest).save(arrays_path)
+    start = time.perf_counter()
+    arrays = ForestArrays.load(arrays_path)
+    arrays_load = time.perf_counter() - start
+
+    df = ArtifactStore().load('df_feature_engineering', columns=feature + feature_engineering + target)
+    X, _, _ = ModelTraining().X_transform_preprocessed(df)
+
+    start = time.perf_counter()
+    sklearn_proba = forest.predict_proba(X)
+    sklearn_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    arrays_proba = arrays.predict_proba(X)
+    arrays_batch = time.perf_counter() - start
+
+    arrays_size = sum(path.stat().st_size for path in Path(arrays_path).iterdir())
+    print(f"filas: {len(X):,} - árboles: {len(arrays.roots)} - nodos: {len(arrays.feature):,}")
+    print(f"carga:  pickle {pickle_load * 1e3:,.1f} ms - arreglos {arrays_load * 1e3:,.1f} ms")
+    print(f"tamaño: pickle {Path(model_path).stat().st_size / 1e6:,.1f} MB - "
+          f"arreglos {arrays_size / 1e6:,.1f} MB")
+    print(f"una fila: sklearn {single_row_latency(forest, X, n_single):.2f} ms - "
+          f"arreglos {single_row_latency(arrays, X, n_single):.2f} ms")
+    print(f"lote:   sklearn {sklearn_batch:.2f} s - arreglos {arrays_batch:.2f} s")
+    print(f"diferencia máxima de predict_proba: {np.abs(sklearn_proba - arrays_proba).max():.2e} - "
+          f"acuerdo en la clase: {np.mean(sklearn_proba.argmax(1) == arrays_proba.argmax(1)):.2%}")
+
+
+if __name__ == "__main__":
+    main()
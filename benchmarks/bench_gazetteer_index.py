@@ -0,0 +1,64 @@
+import time
+import click
+import numpy as np
+from src.artifact_store import ArtifactStore
+from src.feature_engineering import FeatureEngineering
+from src.gazetteer_index import GazetteerIndex
+
+
+@click.command()
+@click.option("--n_rows", default=100000, help='número de registros a comparar')
+def main(n_rows):
+    """
+    Compara la coincidencia de ciudades nacional (`find_best_match` contra todos los municipios) con
+    la restringida por provincia de `GazetteerIndex`: comparaciones, tiempo, tasa de coincidencia,
+    acuerdo entre ambos y coincidencias cuya provincia difiere de la resuelta para el vendedor.
+    Los registros se toman de `data/processed/df_processed.parquet`.
+    """
+    fe = FeatureEngineering()
+    df = ArtifactStore().load('df_processed',
+                              columns=['seller_address_state.name', 'seller_address_city.name'])
+    df = df.head(n_rows).fillna('').astype(str)
+
+    ciudades_ar = fe.aac.api_gob_ar()
+    gazetteer = GazetteerIndex(ciudades_ar, fe.tn.normalize_text)
+
+    state, city = 'seller_address_state.name_clean', 'seller_address_city.name_clean'
+    df[state] = fe.tn.clean_series(df['seller_address_state.name'], remove_sw=False, lemmatize=False,
+                                   stem=False, use_regex=True)
+    df[city] = fe.tn.clean_series(df['seller_address_city.name'], remove_sw=False, lemmatize=False,
+                                  stem=False, use_regex=True)
+    df = fe.match_cities(df, state, gazetteer.states)
+    pairs = df[[city, f"{state}_match"]].drop_duplicates()
+
+    # Línea base: cada ciudad contra la tabla nacional completa
+    start = time.perf_counter()
+    baseline = [fe.find_best_match(value, gazetteer.cities) for value in pairs[city]]
+    elapsed_baseline = time.perf_counter() - start
+    comparisons_baseline = int((pairs[city] != '').sum()) * len(gazetteer.cities)
+
+    start = time.perf_counter()
+    indexed, indexed_scores = gazetteer.match_series(pairs[city], pairs[f"{state}_match"])
+    elapsed_index = time.perf_counter() - start
+
+    # Provincias de cada municipio oficial, para detectar coincidencias fuera de la provincia resuelta
+    provinces_by_city = ciudades_ar.groupby('nombre')['provincia_name'].agg(set).to_dict()
+    resolved = pairs[f"{state}_match"].isin(gazetteer.partitions).to_numpy()
+    baseline_match = np.array([match for match, _ in baseline], dtype=object)
+    baseline_matched = np.array([score > 0 for _, score in baseline])
+    cross_province = [resolved[i] and baseline_matched[i]
+                      and pairs[f"{state}_match"].iloc[i] not in provinces_by_city[baseline_match[i]]
+                      for i in range(len(pairs))]
+
+    print(f"pares únicos (ciudad, provincia): {len(pairs)} - municipios: {len(gazetteer.names)}")
+    print(f"find_best_match: {comparisons_baseline:,} comparaciones en {elapsed_baseline:.2f} s - "
+          f"coincidencias: {baseline_matched.mean():.1%} - "
+          f"fuera de la provincia: {np.mean(cross_province):.1%}")
+    print(f"GazetteerIndex:  {gazetteer.comparisons:,} comparaciones en {elapsed_index:.2f} s - "
+          f"coincidencias: {(indexed_scores > 0).mean():.1%}")
+    print(f"reducción de comparaciones: {comparisons_baseline / max(gazetteer.comparisons, 1):.1f}x - "
+          f"acuerdo con find_best_match: {np.mean(indexed == baseline_match):.1%}")
+
+
+if __name__ == "__main__":
+    main()
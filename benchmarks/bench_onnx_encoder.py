@@ -0,0 +1,57 @@
+import time
+import click
+import numpy as np
+from constants.constants import categorias_MELI
+from src.artifact_store import ArtifactStore
+from src.embedding_categorizer import EmbeddingCategorizer
+from src.text_normalizer import TextNormalizer
+
+
+def predict_categories(encoder, titles, batch_size):
+    """Retorna el índice de la categoría más similar (coseno) de cada título y el tiempo de codificación."""
+    start = time.perf_counter()
+    title_embeddings = encoder.generate_embeddings(titles, batch_size)
+    elapsed = time.perf_counter() - start
+    category_embeddings = encoder.generate_embeddings(categorias_MELI, batch_size)
+    title_embeddings /= np.linalg.norm(title_embeddings, axis=1, keepdims=True)
+    category_embeddings /= np.linalg.norm(category_embeddings, axis=1, keepdims=True)
+    return (title_embeddings @ category_embeddings.T).argmax(axis=1), elapsed
+
+
+@click.command()
+@click.option("--n_titles", default=5000, help='número de títulos del conjunto de validación')
+@click.option("--batch_size", default=100, help='títulos por inferencia')
+@click.option("--threads", default=1, help='hilos por backend (torch.set_num_threads e intra-op de ONNX)')
+def main(n_titles, batch_size, threads):
+    """
+    Verifica la paridad del backend ONNX int8 contra el de PyTorch (acuerdo en la categoría de mayor
+    similitud) y compara su throughput en títulos/s por núcleo. Se usan los últimos `n_titles`
+    títulos de `data/processed/df_processed.parquet`, limpios igual que `title_clean`.
+    """
+    import torch
+    torch.set_num_threads(threads)
+
+    titles = ArtifactStore().load('df_processed', columns=['title'])['title'].dropna().astype(str)
+    titles = TextNormalizer().clean_series(titles.tail(n_titles), remove_sw=False, lemmatize=False,
+                                           stem=False, use_regex=True).tolist()
+
+    torch_backend = EmbeddingCategorizer(use_cache=False, backend='torch')
+    onnx_backend = EmbeddingCategorizer(use_cache=False, backend='onnx')
+    onnx_backend.model.intra_op_threads = threads
+
+    # Carga y calentamiento fuera de la medición
+    for backend in (torch_backend, onnx_backend):
+        backend.generate_embeddings(titles[:batch_size], batch_size)
+
+    torch_pred, torch_elapsed = predict_categories(torch_backend, titles, batch_size)
+    onnx_pred, onnx_elapsed = predict_categories(onnx_backend, titles, batch_size)
+
+    print(f"títulos: {len(titles)} - hilos: {threads}")
+    print(f"acuerdo en la categoría predicha (onnx int8 vs torch): {np.mean(torch_pred == onnx_pred):.2%}")
+    print(f"torch:     {len(titles) / torch_elapsed / threads:,.0f} títulos/s por núcleo")
+    print(f"onnx int8: {len(titles) / onnx_elapsed / threads:,.0f} títulos/s por núcleo "
+          f"({torch_elapsed / onnx_elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
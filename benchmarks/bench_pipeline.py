@@ -0,0 +1,228 @@
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import click
+from config import ConfigEnv
+from constants.constants import TEST_ROWS
+from src.api_argentina_connector import APIArgentinaConnector
+from benchmarks.synthetic_mla import SIZES, SyntheticMLAGenerator
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Comandos de extremo a extremo en el orden del pipeline; cada uno usa los artefactos del anterior
+COMMANDS = ['processed-data-products', 'feaure-engineering-products', 'model-training', 'predict', 'score']
+FILE_COMMANDS = ('processed-data-products', 'predict', 'score')
+
+# Artefactos ajustados en el discovery (notebooks), que ningún comando genera
+DISCOVERY_ARTIFACTS = ('preprocessor.pkl', 'label_encoders.pkl', 'best_hyperparameters_*.json')
+
+# Entorno de los comandos: embeddings por hashing, gazetteer sintético y rutas dentro del espacio de
+# trabajo, de modo que la corrida no usa red ni modifica los cachés o artefactos del proyecto
+BENCH_ENV = {
+    'EMBEDDING_BACKEND': 'hashing',
+    'GAZETTEER_SNAPSHOT_PATH': 'data/gazetteer/municipios_ar.json',
+    'GAZETTEER_FALLBACK_PATH': '',
+    'TEXT_CACHE_PATH': 'data/cache/text_cache.sqlite3',
+    'EMBEDDING_CACHE_PATH': 'data/cache/embeddings',
+    'PROFILE_PATH': 'reports/profiles',
+}
+
+
+def command_rows(command, size):
+    """Filas procesadas por un comando: entrenamiento, test (predict) o el archivo completo (score)."""
+    if command == 'predict':
+        return TEST_ROWS
+    if command == 'score':
+        return SIZES[size] + TEST_ROWS
+    return SIZES[size]
+
+
+def prepare_workspace(workdir, size, seed):
+    """
+    Prepara el espacio de trabajo de un tamaño: genera el archivo sintético (si no existe), elimina los
+    artefactos, cachés y reportes de corridas anteriores, escribe el snapshot de municipios sintético y
+    copia los artefactos del discovery del proyecto (preprocesador, label encoders e hiperparámetros).
+
+    Retorna:
+        tuple: (carpeta del espacio de trabajo, nombre del archivo .jsonlines).
+    """
+    workspace = Path(workdir) / size
+    file_name = f"synthetic_mla_{size}-seed{seed}.jsonlines"
+    raw_path = workspace / 'data' / 'raw' / file_name
+    if not raw_path.exists():
+        print(f"Generando {SIZES[size] + TEST_ROWS:,} registros sintéticos en {raw_path} ...")
+        SyntheticMLAGenerator(seed).write(raw_path, SIZES[size] + TEST_ROWS)
+
+    for folder in ('models', 'reports', 'data/processed', 'data/cache', 'data/scored', 'data/gazetteer'):
+        shutil.rmtree(workspace / folder, ignore_errors=True)
+    for folder in ('models', 'reports', 'data/processed'):
+        (workspace / folder).mkdir(parents=True)
+    for pattern in DISCOVERY_ARTIFACTS:
+        for path in (ROOT / 'models').glob(pattern):
+            shutil.copy(path, workspace / 'models')
+
+    gazetteer_path = SyntheticMLAGenerator.write_gazetteer(workspace / 'data/raw/synthetic_municipios.json')
+    connector = APIArgentinaConnector(snapshot_path=workspace / BENCH_ENV['GAZETTEER_SNAPSHOT_PATH'])
+    connector.save_snapshot(connector.load_snapshot(gazetteer_path))
+    return workspace, file_name
+
+
+def run_command(command, workspace, file_name, rows, env=None):
+    """
+    Ejecuta un comando de `main.py` con `--profile` en el espacio de trabajo y lee sus métricas por etapa.
+    `env` agrega variables de entorno a las de BENCH_ENV.
+
+    Retorna:
+        dict: Tiempo de reloj, filas por segundo, pico de RSS, etapas y, si falló, el error.
+    """
+    args = [sys.executable, str(ROOT / 'main.py'), command, '--profile']
+    if command in FILE_COMMANDS:
+        args += ['--file_name', file_name]
+    profiles = workspace / BENCH_ENV['PROFILE_PATH']
+    before = set(profiles.glob('*.json')) if profiles.exists() else set()
+
+    start = time.perf_counter()
+    process = subprocess.run(args, cwd=workspace, env={**os.environ, **BENCH_ENV, **(env or {})},
+                             capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - start
+
+    result = {'wall_seconds': wall_seconds, 'rows': rows, 'rows_per_second': rows / wall_seconds,
+              'returncode': process.returncode}
+    if process.returncode != 0:
+        result['error'] = process.stderr[-2000:]
+        return result
+    report_paths = sorted(set(profiles.glob('*.json')) - before)
+    if report_paths:
+        with open(report_paths[-1], 'r') as f:
+            report = json.load(f)
+        result['peak_rss_mb'] = report['peak_rss_mb']
+        result['stages'] = report['stages']
+    return result
+
+
+def run_benchmark(sizes, commands, workdir, seed):
+    """Ejecuta los comandos en orden para cada tamaño y retorna los resultados con el entorno."""
+    try:
+        git_commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                    text=True).stdout.strip() or None
+    except OSError:
+        git_commit = None
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'env': BENCH_ENV,
+        'sizes': {},
+    }
+    for size in sizes:
+        workspace, file_name = prepare_workspace(workdir, size, seed)
+        results['sizes'][size] = {}
+        for command in commands:
+            print(f"[{size}] {command} ...")
+            result = run_command(command, workspace, file_name, command_rows(command, size))
+            results['sizes'][size][command] = result
+            if result['returncode'] != 0:
+                print(f"[{size}] {command} falló (código {result['returncode']}):\n{result['error']}")
+                break
+            print(f"[{size}] {command}: {result['wall_seconds']:.1f} s "
+                  f"({result['rows_per_second']:,.0f} filas/s)")
+    return results
+
+
+def timings(results):
+    """Tiempos de reloj por (tamaño, comando, etapa); la etapa es None para el comando completo."""
+    values = {}
+    for size, commands in results['sizes'].items():
+        for command, result in commands.items():
+            if result['returncode'] != 0:
+                continue
+            values[(size, command, None)] = result['wall_seconds']
+            for stage in result.get('stages', []):
+                values[(size, command, stage['stage'])] = stage['wall_seconds']
+    return values
+
+
+def compare_results(current, baseline, threshold, min_seconds):
+    """
+    Compara los tiempos de reloj de dos corridas. Una medición es una regresión si es más lenta que la
+    línea base en más de `threshold` (relativo) y en más de `min_seconds` (absoluto, para ignorar el
+    ruido de las etapas cortas).
+
+    Retorna:
+        list: Una fila por medición común a ambas corridas, con la razón actual/base y si es regresión.
+    """
+    current_values, baseline_values = timings(current), timings(baseline)
+    rows = []
+    for key in [key for key in current_values if key in baseline_values]:
+        now, before = current_values[key], baseline_values[key]
+        ratio = now / before if before > 0 else float('inf')
+        rows.append({'size': key[0], 'command': key[1], 'stage': key[2], 'baseline_seconds': before,
+                     'seconds': now, 'ratio': ratio,
+                     'regression': ratio > 1 + threshold and now - before > min_seconds})
+    return rows
+
+
+@click.command()
+@click.option("--sizes", default='10k', help=f"tamaños separados por coma ({', '.join(SIZES)})")
+@click.option("--commands", default=",".join(COMMANDS), help='comandos a medir, separados por coma')
+@click.option("--workdir", default='data/benchmarks', help='carpeta de los espacios de trabajo por tamaño')
+@click.option("--output", default=None, help='archivo JSON de resultados (por defecto en reports/benchmarks)')
+@click.option("--baseline", default=None, help='resultados JSON de la línea base con los que comparar')
+@click.option("--compare_only", default=None, help='resultados JSON a comparar con --baseline sin ejecutar')
+@click.option("--threshold", default=0.10, help='aumento relativo de tiempo considerado regresión')
+@click.option("--min_seconds", default=0.5, help='aumento mínimo en segundos considerado regresión')
+@click.option("--seed", default=42, help='semilla del generador sintético')
+def main(sizes, commands, workdir, output, baseline, compare_only, threshold, min_seconds, seed):
+    """
+    Benchmark reproducible del pipeline sobre datos sintéticos, sin conexión: genera registros con la
+    forma de `MLA_100k_checked_v3` (más los TEST_ROWS de test), ejecuta en orden los comandos de
+    `main.py` con `--profile` en un espacio de trabajo aislado por tamaño (embeddings por hashing y
+    gazetteer sintético) y guarda el tiempo de cada comando y de cada etapa en un JSON.
+
+    Con `--baseline` compara la corrida contra una línea base guardada y termina con código 1 si algún
+    comando o etapa es más lento que `--threshold`; con `--compare_only` compara dos resultados ya
+    guardados sin ejecutar nada.
+    """
+    if compare_only:
+        with open(compare_only, 'r') as f:
+            results = json.load(f)
+    else:
+        sizes = [size.strip().lower() for size in sizes.split(',')]
+        commands = [command.strip() for command in commands.split(',')]
+        unknown = [size for size in sizes if size not in SIZES] + [c for c in commands if c not in COMMANDS]
+        if unknown:
+            raise click.BadParameter(f"valores desconocidos: {', '.join(unknown)}")
+        print(f"Embeddings: {BENCH_ENV['EMBEDDING_BACKEND']} - idioma: {ConfigEnv.LENGUAGE}")
+        results = run_benchmark(sizes, commands, workdir, seed)
+        output = Path(output or f"reports/benchmarks/bench_{datetime.now().strftime('%Y%m%dT%H%M%S')}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados guardados en {output}")
+
+    if baseline:
+        with open(baseline, 'r') as f:
+            rows = compare_results(results, json.load(f), threshold, min_seconds)
+        for row in rows:
+            name = f"{row['size']} {row['command']}" + (f" / {row['stage']}" if row['stage'] else "")
+            flag = "REGRESIÓN" if row['regression'] else ""
+            print(f"{name:<60} {row['baseline_seconds']:>9.2f} s -> {row['seconds']:>9.2f} s "
+                  f"({row['ratio']:.2f}x) {flag}")
+        regressions = [row for row in rows if row['regression']]
+        print(f"{len(rows)} mediciones comparadas, {len(regressions)} regresiones "
+              f"(umbral {threshold:.0%} y {min_seconds} s)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import json
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import click
+from constants.constants import TEST_ROWS
+
+# Tamaños estándar de los benchmarks: registros de entrenamiento, a los que se suman TEST_ROWS de test
+SIZES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+
+# Municipios por provincia del gazetteer sintético (nombres oficiales de la API de municipios)
+MUNICIPIOS = {
+    'Ciudad Autónoma de Buenos Aires': ['Ciudad Autónoma de Buenos Aires'],
+    'Buenos Aires': ['La Plata', 'Mar del Plata', 'Bahía Blanca', 'Quilmes', 'Lanús', 'Morón', 'Tigre',
+                     'San Isidro', 'Vicente López', 'Pilar', 'Lomas de Zamora', 'Avellaneda', 'Tandil'],
+    'Córdoba': ['Córdoba', 'Villa Carlos Paz', 'Río Cuarto', 'Villa María', 'Alta Gracia'],
+    'Santa Fe': ['Rosario', 'Santa Fe', 'Rafaela', 'Venado Tuerto', 'Reconquista'],
+    'Mendoza': ['Mendoza', 'Godoy Cruz', 'Guaymallén', 'San Rafael', 'Luján de Cuyo'],
+    'Tucumán': ['San Miguel de Tucumán', 'Yerba Buena', 'Tafí Viejo'],
+    'Entre Ríos': ['Paraná', 'Concordia', 'Gualeguaychú'],
+    'Salta': ['Salta', 'San Ramón de la Nueva Orán', 'Tartagal'],
+    'Neuquén': ['Neuquén', 'Cutral Có', 'San Martín de los Andes'],
+    'Chubut': ['Comodoro Rivadavia', 'Trelew', 'Puerto Madryn'],
+    'Misiones': ['Posadas', 'Oberá', 'Eldorado'],
+    'Corrientes': ['Corrientes', 'Goya'],
+    'Río Negro': ['San Carlos de Bariloche', 'General Roca', 'Viedma'],
+    'San Juan': ['San Juan', 'Rawson'],
+    'Jujuy': ['San Salvador de Jujuy', 'Palpalá'],
+}
+
+# Provincias tal como las reporta el vendedor: la capital aparece como en el dataset original
+STATE_ALIASES = {'Ciudad Autónoma de Buenos Aires': ['Capital Federal', 'Capital Federal', 'CABA']}
+
+# Barrios porteños usados como ciudad en los registros de Capital Federal (no son municipios)
+BARRIOS = ['Palermo', 'Belgrano', 'Caballito', 'Flores', 'Almagro', 'Recoleta', 'Villa Urquiza',
+           'San Telmo', 'Balvanera', 'Villa Crespo']
+
+PRODUCTS = {
+    'MLA1055': ['Celular', 'Smartphone', 'Funda', 'Cargador', 'Auriculares'],
+    'MLA1648': ['Notebook', 'Monitor', 'Teclado', 'Mouse', 'Disco Rígido', 'Memoria Ram'],
+    'MLA1144': ['Joystick', 'Consola', 'Juego'],
+    'MLA1196': ['Libro', 'Revista', 'Comic', 'Enciclopedia'],
+    'MLA1430': ['Remera', 'Campera', 'Zapatillas', 'Jean', 'Vestido', 'Cartera'],
+    'MLA1574': ['Sillón', 'Mesa', 'Lámpara', 'Cortina', 'Juego de Sábanas'],
+    'MLA1798': ['Moneda', 'Billete', 'Estampilla', 'Postal Antigua'],
+    'MLA1276': ['Bicicleta', 'Pelota', 'Mancuernas', 'Carpa'],
+    'MLA1132': ['Muñeca', 'Autito', 'Rompecabezas', 'Lego'],
+    'MLA5725': ['Cubierta', 'Estéreo', 'Faro', 'Alfombra para Auto'],
+}
+BRANDS = ['Samsung', 'Motorola', 'Sony', 'Lg', 'Philips', 'Nike', 'Adidas', 'Hp', 'Lenovo', 'Apple',
+          'Genérico', 'Mattel', 'Topper', 'Atma']
+NEW_WORDS = ['Nuevo', 'Original', 'Sellado', 'Garantía', 'Oficial', 'Envío Gratis', 'Oferta', 'Importado']
+USED_WORDS = ['Usado', 'Impecable', 'Antiguo', 'Vintage', 'Muy Buen Estado', 'Detalles', 'Colección']
+OTHER_WORDS = ['Negro', 'Blanco', 'Rojo', 'Grande', 'Chico', 'Talle M', 'Pack X 2', '2015', 'Lote']
+
+WARRANTIES = ['Sí', 'Si', 'Sin garantía', 'Garantía de fábrica', '{n} meses', '{n} meses de garantía',
+              'Garantía por defectos de fabricación', '{n} días', '1 año', 'Mis calificaciones',
+              'Ver reputación y calificaciones', 'Todo probado, sin garantía', 'Garantía oficial {n} meses']
+
+PAYMENT_METHODS = [('MLATB', 'Transferencia bancaria', 'G'), ('MLAWC', 'Acordar con el comprador', 'G'),
+                   ('MLAMO', 'Efectivo', 'G'), ('MLAVE', 'Visa Electron', 'C'),
+                   ('MLAMC', 'Mastercard', 'C'), ('MLAVS', 'Visa', 'C'), ('MLADC', 'Contra reembolso', 'G'),
+                   ('MLABC', 'Giro postal', 'G')]
+PICTURE_SIZES = ['500x375', '500x500', '375x500', '500x281', '400x400', '300x225', '240x180']
+SHIPPING_MODES = ['not_specified', 'me2', 'custom', 'me1']
+LISTING_TYPES = ['bronze', 'free', 'silver', 'gold_special', 'gold', 'gold_premium', 'gold_pro']
+TAGS = ['dragged_bids_and_visits', 'good_quality_thumbnail', 'dragged_visits', 'free_relist',
+        'poor_quality_thumbnail']
+START = datetime(2015, 8, 1, tzinfo=timezone.utc)
+
+
+class SyntheticMLAGenerator:
+    """
+    Esta clase genera registros sintéticos con la forma de las líneas de `MLA_100k_checked_v3.jsonlines`
+    (publicaciones de Mercado Libre Argentina): dirección del vendedor, envío, imágenes y medios de pago
+    anidados, títulos y garantías en español y la etiqueta `condition`, correlacionada con el tipo de
+    publicación, las palabras del título, la garantía y las cantidades para que el modelo tenga señal.
+    Los registros se generan en secuencia desde una semilla, de modo que el archivo de 10k filas es el
+    prefijo del de 100k con la misma semilla.
+
+    También escribe el gazetteer sintético de municipios (con la forma de la respuesta de la API), que
+    reemplaza a la API gubernamental en los benchmarks sin conexión.
+
+    Métodos:
+        record(index): Genera un registro.
+        write(path, n_rows): Escribe `n_rows` registros en un archivo .jsonlines.
+        write_gazetteer(path): Escribe el gazetteer sintético de municipios.
+    """
+    def __init__(self, seed=42):
+        """
+        Inicializa el generador.
+
+        Parámetros:
+            seed (int): Semilla del generador de números aleatorios.
+        """
+        self.rng = random.Random(seed)
+        self.addresses = [(state, city) for state, cities in MUNICIPIOS.items() for city in cities]
+
+    def seller_address(self):
+        """Provincia y ciudad del vendedor, con las variantes de escritura del dataset original."""
+        rng = self.rng
+        state, city = rng.choice(self.addresses) if rng.random() < 0.6 else self.addresses[0]
+        if state in STATE_ALIASES:
+            state = rng.choice(STATE_ALIASES[state])
+            city = rng.choice(BARRIOS + ['Capital Federal', 'CABA'])
+        if rng.random() < 0.15:
+            city = city.lower()
+        elif rng.random() < 0.05:
+            city = f"{city} centro"
+        return {
+            'country': {'name': 'Argentina', 'id': 'AR'},
+            'state': {'name': state, 'id': f"AR-{state[:1].upper()}"},
+            'city': {'name': city, 'id': f"TUxB{zlib.crc32(city.encode()):010d}"},
+        }
+
+    def title(self, is_new, category_id):
+        """Título en español con producto, marca y palabras asociadas (o no) a la condición."""
+        rng = self.rng
+        words = [rng.choice(PRODUCTS[category_id]), rng.choice(BRANDS)]
+        condition_words = NEW_WORDS if (is_new == (rng.random() < 0.8)) else USED_WORDS
+        words += rng.sample(condition_words, rng.randint(0, 2)) + rng.sample(OTHER_WORDS, rng.randint(0, 3))
+        return " ".join(words)
+
+    def warranty(self, is_new):
+        """Texto libre de garantía, nulo en la mayoría de las publicaciones usadas."""
+        rng = self.rng
+        if rng.random() < (0.35 if is_new else 0.75):
+            return None
+        pool = WARRANTIES[:9] if is_new and rng.random() < 0.8 else WARRANTIES
+        return rng.choice(pool).format(n=rng.choice([1, 3, 6, 12, 24, 30, 90]))
+
+    def pictures(self, item_id):
+        """Lista de imágenes con tamaño y tamaño máximo ('AnchoxAlto')."""
+        rng = self.rng
+        pictures = []
+        for k in range(rng.choice([0, 1, 1, 2, 3, 6])):
+            size = rng.choice(PICTURE_SIZES)
+            width, height = map(int, size.split('x'))
+            scale = rng.choice([1, 2, 2.4, 3])
+            picture_id = f"{rng.randint(1000, 9999)}-{item_id}_{k}"
+            pictures.append({
+                'size': size, 'max_size': f"{int(width * scale)}x{int(height * scale)}", 'quality': '',
+                'id': picture_id, 'url': f"http://mla-s1-p.mlstatic.com/{picture_id}-O.jpg",
+                'secure_url': f"https://a248.e.akamai.net/mla-s1-p.mlstatic.com/{picture_id}-O.jpg",
+            })
+        return pictures
+
+    def record(self, index):
+        """
+        Genera el registro `index`.
+
+        Parámetros:
+            index (int): Posición del registro (define el `id` de la publicación).
+
+        Retorna:
+            dict: Registro con la forma de una línea del archivo .jsonlines original.
+        """
+        rng = self.rng
+        item_id = f"MLA{4000000000 + index}"
+        listing_type = rng.choices(LISTING_TYPES, weights=[30, 25, 10, 15, 5, 10, 5])[0]
+        is_new = rng.random() < (0.35 if listing_type == 'free' else 0.6)
+        category_id = rng.choice(list(PRODUCTS))
+        price = round(rng.lognormvariate(6.5 if is_new else 6.0, 1.3), 2)
+        initial_quantity = rng.choice([1, 1, 1, 2, 5, 10, 50, 100]) if is_new else rng.choice([1, 1, 1, 2])
+        sold_quantity = min(int(rng.expovariate(1 / (6 if is_new else 1))), initial_quantity)
+        created = START + timedelta(seconds=rng.randint(0, 60 * 86400))
+        start_ms = int(created.timestamp() * 1000)
+        stop_ms = start_ms + rng.choice([60, 60, 30, 90]) * 86400 * 1000
+        updated = created + timedelta(seconds=rng.randint(0, 30 * 86400))
+        methods = rng.sample(PAYMENT_METHODS, rng.choice([0, 1, 1, 2, 3]))
+        return {
+            'seller_address': self.seller_address(),
+            'warranty': self.warranty(is_new),
+            'sub_status': [],
+            'condition': 'new' if is_new else 'used',
+            'deal_ids': [],
+            'base_price': price,
+            'shipping': {
+                'local_pick_up': rng.random() < 0.8, 'methods': [], 'tags': [],
+                'free_shipping': is_new and rng.random() < 0.08,
+                'mode': rng.choices(SHIPPING_MODES, weights=[50, 35 if is_new else 15, 10, 2])[0],
+                'dimensions': None,
+            },
+            'non_mercado_pago_payment_methods': [
+                {'description': description, 'id': method_id, 'type': method_type}
+                for method_id, description, method_type in methods],
+            'seller_id': rng.randint(1000000, 9000000000),
+            'variations': [],
+            'site_id': 'MLA',
+            'listing_type_id': listing_type,
+            'price': price,
+            'attributes': [],
+            'buying_mode': rng.choices(['buy_it_now', 'classified', 'auction'], weights=[90, 8, 2])[0],
+            'tags': rng.sample(TAGS, rng.choice([0, 1, 1, 2])),
+            'listing_source': '',
+            'parent_item_id': f"MLA{rng.randint(1000000000, 9999999999)}",
+            'coverage_areas': [],
+            'category_id': category_id,
+            'descriptions': [{'id': f"{item_id}-{rng.randint(100000000, 999999999)}"}],
+            'last_updated': updated.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'international_delivery_mode': 'none',
+            'pictures': self.pictures(item_id),
+            'id': item_id,
+            'official_store_id': None,
+            'differential_pricing': None,
+            'accepts_mercadopago': rng.random() < 0.97,
+            'original_price': None,
+            'currency_id': 'ARS',
+            'thumbnail': f"http://mla-s1-p.mlstatic.com/{item_id}-I.jpg",
+            'title': self.title(is_new, category_id),
+            'automatic_relist': rng.random() < 0.05,
+            'date_created': created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'secure_thumbnail': f"https://a248.e.akamai.net/mla-s1-p.mlstatic.com/{item_id}-I.jpg",
+            'stop_time': stop_ms,
+            'status': rng.choices(['active', 'paused', 'closed'], weights=[95, 4, 1])[0],
+            'video_id': None,
+            'catalog_product_id': None,
+            'subtitle': None,
+            'initial_quantity': initial_quantity,
+            'start_time': start_ms,
+            'permalink': f"http://articulo.mercadolibre.com.ar/{item_id}",
+            'sold_quantity': sold_quantity,
+            'available_quantity': initial_quantity - sold_quantity,
+        }
+
+    def write(self, path, n_rows):
+        """
+        Escribe `n_rows` registros en un archivo .jsonlines, uno por línea.
+
+        Parámetros:
+            path (str | Path): Archivo de destino.
+            n_rows (int): Número de registros.
+
+        Retorna:
+            Path: Ruta del archivo escrito.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for index in range(n_rows):
+                f.write(json.dumps(self.record(index), ensure_ascii=False) + "\n")
+        return path
+
+    @staticmethod
+    def write_gazetteer(path):
+        """
+        Escribe el gazetteer sintético con la forma de la respuesta de la API de municipios, que
+        `APIArgentinaConnector` acepta como archivo de respaldo (GAZETTEER_FALLBACK_PATH).
+
+        Parámetros:
+            path (str | Path): Archivo de destino.
+
+        Retorna:
+            Path: Ruta del archivo escrito.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        municipios = [{'nombre': city, 'provincia': {'nombre': state}}
+                      for state, cities in MUNICIPIOS.items() for city in cities]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'cantidad': len(municipios), 'municipios': municipios}, f, ensure_ascii=False)
+        return path
+
+
+@click.command()
+@click.option("--size", default='100k', type=click.Choice(list(SIZES)), help='número de registros')
+@click.option("--output_dir", default='data/raw', help='carpeta del archivo .jsonlines generado')
+@click.option("--seed", default=42, help='semilla del generador')
+def main(size, output_dir, seed):
+    """
+    Genera `synthetic_mla_<size>.jsonlines` con registros sintéticos de publicaciones y el gazetteer
+    sintético de municipios `synthetic_municipios.json` en la carpeta de salida. El archivo tiene
+    `size` registros de entrenamiento más los TEST_ROWS finales que los comandos reservan para test.
+    """
+    generator = SyntheticMLAGenerator(seed)
+    n_rows = SIZES[size] + TEST_ROWS
+    path = generator.write(Path(output_dir) / f"synthetic_mla_{size}.jsonlines", n_rows)
+    gazetteer = generator.write_gazetteer(Path(output_dir) / "synthetic_municipios.json")
+    print(f"{n_rows:,} registros escritos en {path} - gazetteer en {gazetteer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,87 @@ class ConfigEnv:
     # Nombre del archivo
     FILE_NAME = os.getenv("FILE_NAME")
 
+    # Número de registros por bloque al leer el archivo .jsonlines
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE") or 50000)
+
     # Idioma
     LENGUAGE = os.getenv("LENGUAGE")
 
+    # Lematización por lotes con spaCy (nlp.pipe): textos por lote y número de procesos
+    SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE") or 1000)
+    SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS") or 1)
+
+    # Caché persistente de normalización de texto (1 activo, 0 inactivo), ruta y máximo de entradas
+    TEXT_CACHE = os.getenv("TEXT_CACHE", "1") != "0"
+    TEXT_CACHE_PATH = os.getenv("TEXT_CACHE_PATH") or "data/cache/text_cache.sqlite3"
+    TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES") or 1000000)
+
+    # Caché persistente de embeddings de títulos (1 activo, 0 inactivo) y carpeta
+    EMBEDDING_CACHE = os.getenv("EMBEDDING_CACHE", "1") != "0"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH") or "data/cache/embeddings"
+
+    # Backend de inferencia de embeddings (torch - onnx - hashing), carpeta de los modelos ONNX exportados e
+    # hilos de ONNX Runtime por operación (0 usa todos los núcleos)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND") or "torch"
+    ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH") or "models/onnx"
+    ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS") or 1)
+
+    # Categorización en streaming (1 activo, 0 inactivo): presupuesto de caracteres con relleno y
+    # máximo de títulos por lote
+    EMBEDDING_STREAMING = os.getenv("EMBEDDING_STREAMING", "1") != "0"
+    EMBEDDING_MAX_BATCH_CHARS = int(os.getenv("EMBEDDING_MAX_BATCH_CHARS") or 16000)
+    EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE") or 512)
+
+    # Validación cruzada del entrenamiento: número de folds y métricas separadas por coma
+    # (accuracy, roc_auc, log_loss, brier)
+    CV_FOLDS = int(os.getenv("CV_FOLDS") or 10)
+    CV_METRICS = (os.getenv("CV_METRICS") or "accuracy,roc_auc").split(",")
+
+    # Motor de entrenamiento del modelo: RandomForest (rf) o HistGradientBoosting (hgb)
+    MODEL_ENGINE = os.getenv("MODEL_ENGINE") or "rf"
+
+    # Búsqueda de hiperparámetros (comando tune): archivo SQLite del estudio, trials por ejecución,
+    # trials en paralelo y núcleos disponibles (0 usa todos)
+    TUNE_STORAGE_PATH = os.getenv("TUNE_STORAGE_PATH") or "models/tuning.sqlite3"
+    TUNE_N_TRIALS = int(os.getenv("TUNE_N_TRIALS") or 50)
+    TUNE_N_JOBS = int(os.getenv("TUNE_N_JOBS") or 1)
+    TUNE_CPU_BUDGET = int(os.getenv("TUNE_CPU_BUDGET") or 0)
+
+    # Servidor de predicción (comando serve): host, puerto, máximo de registros por micro-lote y espera
+    # máxima en milisegundos para completar un micro-lote
+    SERVER_HOST = os.getenv("SERVER_HOST") or "127.0.0.1"
+    SERVER_PORT = int(os.getenv("SERVER_PORT") or 8000)
+    SERVER_MAX_BATCH_SIZE = int(os.getenv("SERVER_MAX_BATCH_SIZE") or 64)
+    SERVER_MAX_WAIT_MS = float(os.getenv("SERVER_MAX_WAIT_MS") or 10)
+
+    # Scoring masivo (comando score): procesos del pool (0 usa todos los núcleos) y tamaño en MB de cada
+    # shard del archivo de entrada
+    SCORE_N_WORKERS = int(os.getenv("SCORE_N_WORKERS") or 0)
+    SCORE_SHARD_MB = float(os.getenv("SCORE_SHARD_MB") or 64)
+
+    # Perfilado por etapas (opción --profile de los comandos): carpeta de los reportes y perfilador de la
+    # etapa capturada con --profile_stage (cprofile - pyinstrument)
+    PROFILE_PATH = os.getenv("PROFILE_PATH") or "reports/profiles"
+    PROFILE_TOOL = os.getenv("PROFILE_TOOL") or "cprofile"
+
+    # Caché incremental de etapas (1 activo, 0 inactivo): omite los comandos cuyos datos, parámetros y
+    # código no cambiaron y guarda por fila la limpieza y las variables de texto y geográficas
+    STAGE_CACHE = os.getenv("STAGE_CACHE", "1") != "0"
+    STAGE_CACHE_PATH = os.getenv("STAGE_CACHE_PATH") or "data/cache/stages"
+
+    # Pool de procesos de las variables de texto y geográficas de la ingeniería de variables:
+    # procesos (1 sin pool, 0 todos los núcleos) y filas por shard
+    FE_N_WORKERS = int(os.getenv("FE_N_WORKERS") or 1)
+    FE_SHARD_ROWS = int(os.getenv("FE_SHARD_ROWS") or 10000)
+
+    # Snapshot local de municipios (API georef): ruta, archivo de respaldo, vigencia en horas,
+    # timeout en segundos e intentos de descarga
+    GAZETTEER_SNAPSHOT_PATH = os.getenv("GAZETTEER_SNAPSHOT_PATH") or "data/gazetteer/municipios_ar.json"
+    GAZETTEER_FALLBACK_PATH = os.getenv("GAZETTEER_FALLBACK_PATH") or None
+    GAZETTEER_TTL_HOURS = float(os.getenv("GAZETTEER_TTL_HOURS") or 168)
+    GAZETTEER_TIMEOUT = float(os.getenv("GAZETTEER_TIMEOUT") or 10)
+    GAZETTEER_RETRIES = int(os.getenv("GAZETTEER_RETRIES") or 3)
+
     # Determina el entorno: (PROD - DEV - SCRIPT)
     ENVIRONMENT = os.getenv("ENVIRONMENT")
 
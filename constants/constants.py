@@ -13,6 +13,12 @@ categorias_MELI = [
 # URL de la API para obtener todos los municipios de Argentina
 url_govar = "https://apis.datos.gob.ar/georef/api/municipios?max=5000"
 
+# Versión del formato del snapshot local de municipios; incrementarla obliga a descargarlo de nuevo
+GAZETTEER_SNAPSHOT_VERSION = 1
+
+# Número de registros al final del archivo .jsonlines reservados para test
+TEST_ROWS = 10000
+
 # Lenguajes
 LANGUAGE_MAPPING = {
     "EN": "english",
@@ -20,6 +26,85 @@ LANGUAGE_MAPPING = {
     "PT": "portuguese",
 }
 
+# Esquema de extracción de los registros crudos: columna -> (ruta dentro del registro, tipo).
+# El índice -1 toma el último elemento de la lista, igual que el aplanado anterior (flatten_json).
+# Los campos de tipo 'size' ('AnchoxAlto') generan las columnas <columna>_width y <columna>_height.
+raw_schema = {
+    'seller_address_state.name': (('seller_address', 'state', 'name'), 'str'),
+    'seller_address_city.name': (('seller_address', 'city', 'name'), 'str'),
+    'condition': (('condition',), 'str'),
+    'base_price': (('base_price',), 'float'),
+    'shipping_local_pick_up': (('shipping', 'local_pick_up'), 'bool'),
+    'shipping_free_shipping': (('shipping', 'free_shipping'), 'bool'),
+    'shipping_mode': (('shipping', 'mode'), 'str'),
+    'non_mercado_pago_payment_methods_description': (
+        ('non_mercado_pago_payment_methods', -1, 'description'), 'str'),
+    'non_mercado_pago_payment_methods_type': (('non_mercado_pago_payment_methods', -1, 'type'), 'str'),
+    'listing_type_id': (('listing_type_id',), 'str'),
+    'price': (('price',), 'float'),
+    'buying_mode': (('buying_mode',), 'str'),
+    'tags_0': (('tags', 0), 'str'),
+    'accepts_mercadopago': (('accepts_mercadopago',), 'bool'),
+    'automatic_relist': (('automatic_relist',), 'bool'),
+    'status': (('status',), 'str'),
+    'initial_quantity': (('initial_quantity',), 'int'),
+    'sold_quantity': (('sold_quantity',), 'int'),
+    'available_quantity': (('available_quantity',), 'int'),
+    'warranty': (('warranty',), 'string'),
+    'pictures': (('pictures', -1, 'size'), 'size'),
+    'pictures_max': (('pictures', -1, 'max_size'), 'size'),
+    'start_time': (('start_time',), 'timestamp_ms'),
+    'stop_time': (('stop_time',), 'timestamp_ms'),
+    'date_created': (('date_created',), 'timestamp'),
+    'last_updated': (('last_updated',), 'timestamp'),
+    'title': (('title',), 'str'),
+    'seller_id': (('seller_id',), 'int'),
+    'category_id': (('category_id',), 'str'),
+}
+
+# Componentes de spaCy que no intervienen en la lematización
+SPACY_DISABLED_COMPONENTS = ["parser", "ner"]
+
+# Versión de la lógica de limpieza de texto; incrementarla invalida el caché persistente de textos
+TEXT_CACHE_VERSION = 1
+
+# Palabras clave por clase para KeywordClassifier, en orden de prioridad: gana la primera clase con
+# al menos una coincidencia. Se comparan contra texto normalizado (sin tildes, en minúsculas).
+warranty_keywords = {
+    "sin garantia": ["sin garantia", "no tiene garantia", "no ofrecemos", "experiencia"],
+    "garantia basada en reputacion": [
+        "reputacion", "calificacion", "calificaciones", "comprador", "venta", "comentario", "prueba"
+    ],
+    "garantia por defectos": [
+        "con garantia", "defectos de fabricacion", "fallo", "garantia por defectos", "cubre defectos",
+        "si", "garantia fabrica"
+    ],
+    "garantia media": ["mes", "10 dia", "30 dia", "90 dia"],
+    "garantia larga": ["12 mes", "1 ano", "2 ano", "3 ano", "5 ano", "garantia de por vida"],
+}
+WARRANTY_DEFAULT_CLASS = "sin garantia"
+
+product_keywords = {
+    "nuevo": [
+        "nuevo", "flamante", "original", "precintado", "sellado", "estreno", "intacto", "sin uso",
+        "garantia", "oficial", "modelo", "version", "ultima", "tecnologia", "innovador", "moderno",
+        "actual", "premium", "lanzamiento", "digital", "automatizado", "optimizado", "avanzado",
+        "mejorado", "actualizado", "profesional", "full", "completo", "vanguardia", "importado nuevo",
+        "exclusivo", "primera mano", "perfecto estado", "accesorios nuevos", "edicion limitada",
+        "garantia fabrica", "full pack"
+    ],
+    "usado": [
+        "usado", "segunda mano", "antiguo", "vintage", "clasico", "restaurado", "reacondicionado",
+        "detalles", "buen estado", "desgastado", "fallas", "defectos", "reparado", "signos uso",
+        "funcionamiento correcto", "original usado", "deterioro", "envejecido", "descatalogado",
+        "discontinuado", "unico dueno", "coleccionista", "retro", "pieza antigua", "raro", "escaso",
+        "usado funcional", "autentico", "reparacion", "adaptado", "repuesto", "cambio", "segunda vida",
+        "estado conservacion", "historico", "modelo antiguo", "desgaste normal", "estructura original",
+        "restaurado profesional", "manual funcionamiento", "marca antigua", "pieza unica"
+    ],
+}
+PRODUCT_DEFAULT_CLASS = "otro"
+
 # Features
 feature_engineering = [
     'warranty_class', 'pictures_area', 'pictures_max_area', 'pictures_ratio_relation',
@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# Desglose del tiempo de importación de módulos de un comando del CLI (python -X importtime).
+# Uso: ./dev/import_time.sh model-training [opciones del comando]
+COMMAND=${1:?"Indique el comando del CLI, ej. model-training"}
+LOG=${IMPORT_TIME_LOG:-"reports/importtime_${COMMAND}.log"}
+
+# Ejecuta el comando registrando en el log el tiempo de cada import
+python -X importtime main.py "$@" 2> "${LOG}"
+
+# Muestra los módulos con mayor tiempo acumulado (microsegundos)
+echo "Top 25 imports por tiempo acumulado [us] - comando: ${COMMAND}"
+grep "^import time:" "${LOG}" | grep -v "self \[us\]" | sort -t'|' -k2 -n -r | head -25
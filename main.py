@@ -1,12 +1,20 @@
+import functools
 import click
-import joblib
-import pandas as pd
+from pathlib import Path
 from config import ConfigEnv
-from constants.constants import categorias_MELI
+from constants.constants import categorias_MELI, feature, feature_engineering, target
+from src.artifact_store import ArtifactStore
+from src.bulk_scorer import BulkScorer
 from src.data_preprocessing import DataPreprocessing
 from src.feature_engineering import FeatureEngineering
+from src.model_engine import MODEL_ENGINES
 from src.model_training import ModelTraining
+from src.hyperparameter_tuner import HyperparameterTuner
 from src.predict_and_evaluate import PredictAndEvaluate
+from src.prediction_server import PredictionServer
+from src.scoring_pipeline import ScoringPipeline
+from src.stage_cache import StageCache
+from src.stage_profiler import PROFILER
 
 
 @click.group()
@@ -15,102 +23,287 @@ def cli():
     pass
 
 
+def profiled(command):
+    """
+    Agrega a un comando las opciones `--profile` (métricas por etapa en JSON y formato Prometheus en
+    `PROFILE_PATH`), `--profile_stage` (etapa a capturar con un perfilador de funciones) y
+    `--profile_tool` (cprofile - pyinstrument).
+    """
+    @click.option("--profile", is_flag=True, default=False,
+                  help='registra tiempo, CPU, memoria y filas/s por etapa (JSON y Prometheus)')
+    @click.option("--profile_stage", default=None, help='etapa a capturar con cProfile/pyinstrument')
+    @click.option("--profile_tool", default=ConfigEnv.PROFILE_TOOL,
+                  type=click.Choice(['cprofile', 'pyinstrument']), help='perfilador de la etapa capturada')
+    @functools.wraps(command)
+    def wrapper(*args, profile, profile_stage, profile_tool, **kwargs):
+        if not profile:
+            return command(*args, **kwargs)
+        PROFILER.enable(command.__name__, capture_stage=profile_stage, capture_tool=profile_tool)
+        try:
+            return command(*args, **kwargs)
+        finally:
+            for path in PROFILER.dump(ConfigEnv.PROFILE_PATH):
+                print("Perfil guardado en", path)
+    return wrapper
+
+
 @cli.command()
+@profiled
 @click.option("--file_name", default=ConfigEnv.FILE_NAME,
               help='nombre del archivo .jsonlines')
-def processed_data_products(file_name):
+@click.option("--use_knn", is_flag=True, default=False,
+              help='imputa las variables numéricas con KNN en lugar de la mediana')
+def processed_data_products(file_name, use_knn):
     """
     procesa los datos de productos a partir de un archivo en formato .jsonlines.
+    Ajusta el imputador y la transformación Box-Cox y los guarda en `models/`. Se omite si los datos, los
+    parámetros y el código no cambiaron desde la última ejecución (caché de etapas).
     Parámetros:
         file_name (str): Nombre del archivo .jsonlines ubicado en `data/raw/`.
                          Si no se especifica, se usa el valor predeterminado de ConfigEnv.
+        use_knn (bool): Si se indica, imputa las variables numéricas con KNN.
 
     Retorna:
-        Archivo `df_processed.csv` en `data/processed/`, separado por '|'.
+        Archivo `df_processed.parquet` en `data/processed/`.
     """
     print("cargando datos ..")
     file_path = f'data/raw/{file_name}'
-    dp = DataPreprocessing()
-    df_products_transformed = dp.preprocessing(file_path)
+    store, cache = ArtifactStore(), StageCache()
+    dp = DataPreprocessing(cache=cache)
+    cache_key = dp.stage_key(file_path, use_knn=use_knn) if cache.enabled else None
+    if cache.is_fresh(store, 'df_processed', cache_key):
+        print("df_processed está al día con los datos, parámetros y código; se omite el preprocesamiento.")
+        click.echo("Task complete.")
+        return
 
-    path = "data/processed/df_processed.csv"
-    df_products_transformed.to_csv(path, index=False, sep='|')
+    df_products_transformed = dp.preprocessing(file_path, use_knn=use_knn)
+    store.save(df_products_transformed, 'df_processed', stage='processed_data_products', source=file_name,
+               cache_key=cache_key, outputs=cache.output_digests(dp.output_paths()))
     print("OK!")
     click.echo("Task complete.")
 
 
 @cli.command()
-def feaure_engineering_products():
+@profiled
+@click.option("--n_workers", default=ConfigEnv.FE_N_WORKERS,
+              help='procesos de las variables de texto y geográficas (1 sin pool, 0 usa todos)')
+@click.option("--shard_rows", default=ConfigEnv.FE_SHARD_ROWS, help='filas por shard del pool')
+def feaure_engineering_products(n_workers, shard_rows):
     """
-    crea nuevas variables de los productos a partir de los datos de df_processed.csv
+    crea nuevas variables de los productos a partir de los datos de df_processed.parquet. Se omite si
+    df_processed, el código y los modelos no cambiaron; si no, solo calcula las variables de texto y
+    geográficas de las filas que no están en el caché de etapas, repartidas en un pool de `n_workers`
+    procesos.
 
     Retorna:
-        Archivo `df_feature_engineering.csv` en `data/processed/`, separado por '|'.
+        Archivo `df_feature_engineering.parquet` en `data/processed/`.
     """
     print("cargando datos ..")
-    file_path = 'data/processed/df_processed.csv'
-    df_products = pd.read_csv(file_path, sep='|')
+    store, cache = ArtifactStore(), StageCache()
+    fe = FeatureEngineering(cache=cache, n_workers=n_workers, shard_rows=shard_rows)
+    cache_key = fe.stage_key(store.metadata('df_processed').get('cache_key'),
+                             categorias_MELI) if cache.enabled else None
+    if cache.is_fresh(store, 'df_feature_engineering', cache_key):
+        print("df_feature_engineering está al día con df_processed, el código y los modelos; se omite.")
+        click.echo("Task complete.")
+        return
 
-    fe = FeatureEngineering()
+    df_products = store.load('df_processed')
     df_products_feature = fe.feature_engineering_vars(df_products, categorias_MELI)
 
-    path = "data/processed/df_feature_engineering.csv"
-    df_products_feature.to_csv(path, index=False, sep='|')
+    store.save(df_products_feature, 'df_feature_engineering', stage='feaure_engineering_products',
+               cache_key=cache_key, outputs=cache.output_digests(fe.output_paths()))
 
     print("OK!")
     click.echo("Task complete.")
 
 
 @cli.command()
-def model_training():
+@profiled
+@click.option("--engine", default=ConfigEnv.MODEL_ENGINE, type=click.Choice(list(MODEL_ENGINES)),
+              help='motor de entrenamiento (rf - hgb)')
+def model_training(engine):
     """
-    crea nuevas variables de los productos a partir de los datos de df_processed.csv
+    entrena el modelo a partir de los datos de df_feature_engineering.parquet
+
+    Parámetros:
+        engine (str): Motor de entrenamiento: RandomForest (rf) o HistGradientBoosting (hgb).
 
     Retorna:
-        Archivo `df_feature_engineering.csv` en `data/processed/`, separado por '|'.
+        Modelo `best_rf.pkl` (o `best_hgb.pkl`) en `models/`, reporte `feature_importance.csv` en
+        `reports/` y predicciones fuera de fold `oof_predictions.parquet` en `data/processed/`.
     """
     print("cargando datos ..")
-    file_path = 'data/processed/df_feature_engineering.csv'
-    df_proccesed = pd.read_csv(file_path, sep='|')
-
+    store, cache = ArtifactStore(), StageCache()
     mt = ModelTraining()
-    best_rf, feature_names = mt.train_best_model(df_proccesed)
-    joblib.dump(best_rf, "models/best_rf.pkl")
+    cache_key = mt.stage_key(store.metadata('df_feature_engineering').get('cache_key'),
+                             engine) if cache.enabled else None
+    if cache.is_fresh(store, 'oof_predictions', cache_key):
+        print("El modelo está al día con df_feature_engineering, los parámetros y el código; se omite.")
+        click.echo("Task complete.")
+        return
+
+    df_proccesed = store.load('df_feature_engineering', columns=feature + feature_engineering + target)
+    best_model, feature_names = mt.train_best_model(df_proccesed, engine=engine)
+    model_engine = mt.get_engine(engine)
+    model_engine.save_model(best_model, mt.PATH_MODELS)
     print("Modelo guardado correctamente.")
 
-    path = "reports/feature_importance.csv"
-    feature_importance = mt.save_feature_importance(best_rf.feature_importances_, feature_names, 25)
-    feature_importance.to_csv(path, index=False)
+    importances = model_engine.feature_importance(best_model)
+    if importances is not None:
+        path = "reports/feature_importance.csv"
+        feature_importance = mt.save_feature_importance(importances, feature_names, 25)
+        feature_importance.to_csv(path, index=False)
+
+    # Predicciones fuera de fold de la validación cruzada, para calibración posterior. Se guardan al final:
+    # la llave de la etapa solo queda registrada si el entrenamiento terminó
+    store.save(mt.oof_predictions, 'oof_predictions', stage='model_training', n_splits=ConfigEnv.CV_FOLDS,
+               engine=engine, cache_key=cache_key, outputs=cache.output_digests(mt.output_paths(engine)))
+
+    print("OK!")
+    click.echo("Task complete.")
+
+
+@cli.command()
+@profiled
+@click.option("--n_trials", default=ConfigEnv.TUNE_N_TRIALS, help='número de trials de esta ejecución')
+@click.option("--n_jobs", default=ConfigEnv.TUNE_N_JOBS, help='trials ejecutados en paralelo')
+@click.option("--cpu_budget", default=ConfigEnv.TUNE_CPU_BUDGET, help='núcleos disponibles (0 usa todos)')
+def tune(n_trials, n_jobs, cpu_budget):
+    """
+    busca los hiperparámetros del Random Forest (Optuna: TPE + successive halving) a partir de los
+    datos de df_feature_engineering.parquet. El estudio se guarda en SQLite por hash de los datos:
+    cada ejecución agrega `n_trials` trials al estudio de los mismos datos, o empieza uno nuevo si
+    cambiaron.
+
+    Retorna:
+        Mejores hiperparámetros en `models/best_hyperparameters_rf.json`.
+    """
+    print("cargando datos ..")
+    store = ArtifactStore()
+    df_proccesed = store.load('df_feature_engineering', columns=feature + feature_engineering + target)
+
+    mt = ModelTraining()
+    X_train, y_train, feature_names = mt.X_transform_preprocessed(df_proccesed, mt.get_engine('rf'))
+
+    tuner = HyperparameterTuner(storage_path=ConfigEnv.TUNE_STORAGE_PATH, n_jobs=n_jobs,
+                                cpu_budget=cpu_budget or None)
+    best_params = tuner.tune(X_train, y_train, feature_names, n_trials=n_trials)
+    tuner.save_best_params(best_params, mt.PATH_MODELS / 'best_hyperparameters_rf.json')
+    print("Mejores hiperparámetros:", best_params)
+
+    print("OK!")
+    click.echo("Task complete.")
+
+
+@cli.command()
+@profiled
+@click.option("--engines", default=",".join(MODEL_ENGINES), help='motores a comparar, separados por coma')
+def compare_engines(engines):
+    """
+    compara los motores de entrenamiento sobre los mismos datos de df_feature_engineering.parquet:
+    tiempo de ajuste, tamaño del modelo, latencia de una fila y por lote, accuracy y ROC AUC.
+
+    Retorna:
+        Reporte `engine_comparison.csv` en `reports/`.
+    """
+    print("cargando datos ..")
+    store = ArtifactStore()
+    df_proccesed = store.load('df_feature_engineering', columns=feature + feature_engineering + target)
+
+    mt = ModelTraining()
+    comparison = mt.compare_engines(df_proccesed, engines.split(","))
+    comparison.to_csv("reports/engine_comparison.csv", index=False)
+    print(comparison.to_string(index=False))
 
     print("OK!")
     click.echo("Task complete.")
 
 
 @cli.command()
+@profiled
 @click.option("--file_name", default=ConfigEnv.FILE_NAME,
               help='nombre del archivo .jsonlines')
-def predict(file_name):
+@click.option("--engine", default=ConfigEnv.MODEL_ENGINE, type=click.Choice(list(MODEL_ENGINES)),
+              help='motor del modelo entrenado (rf - hgb)')
+def predict(file_name, engine):
     """
-    crea nuevas variables de los productos a partir de los datos de df_processed.csv
+    evalúa el modelo entrenado con el motor `--engine` sobre el conjunto de prueba (los últimos
+    `TEST_ROWS` registros del archivo): preprocesa esas filas y crea sus variables con los
+    transformadores ya ajustados, reutilizando las filas del caché de etapas, y predice con el modelo.
 
     Retorna:
-        Archivo `df_feature_engineering.csv` en `data/processed/`, separado por '|'.
+        Accuracy y ROC AUC del conjunto de prueba, impresos en consola.
     """
     print("cargando datos ..")
     file_path = f'data/raw/{file_name}'
 
-    dp = DataPreprocessing()
+    cache = StageCache()
+    dp = DataPreprocessing(cache=cache)
     df_products = dp.preprocessing(file_path, df_name='test')
 
-    fe = FeatureEngineering()
-    df_proccesed = fe.feature_engineering_vars(df_products, categorias_MELI)
+    fe = FeatureEngineering(cache=cache)
+    df_proccesed = fe.feature_engineering_vars(df_products, categorias_MELI, fit=False)
+
+    Pred = PredictAndEvaluate(engine=engine)
+    results = Pred.evaluate_model(df_proccesed)
+    print("Métricas del conjunto de prueba:", results)
+
+    print("OK!")
+    click.echo("Task complete.")
+
+
+@cli.command()
+@profiled
+@click.option("--file_name", default=ConfigEnv.FILE_NAME,
+              help='nombre del archivo .jsonlines')
+@click.option("--output_dir", default=None, help='carpeta de salida (por defecto data/scored/<archivo>)')
+@click.option("--n_workers", default=ConfigEnv.SCORE_N_WORKERS, help='procesos del pool (0 usa todos)')
+@click.option("--shard_mb", default=ConfigEnv.SCORE_SHARD_MB, help='tamaño aproximado de cada shard en MB')
+@click.option("--engine", default=ConfigEnv.MODEL_ENGINE, type=click.Choice(list(MODEL_ENGINES)),
+              help='motor del modelo entrenado (rf - hgb)')
+def score(file_name, output_dir, n_workers, shard_mb, engine):
+    """
+    puntúa un archivo .jsonlines completo, sin etiquetas, repartiendo shards del archivo en un pool de
+    procesos. Reanuda una corrida interrumpida omitiendo los shards ya escritos.
+
+    Retorna:
+        Partes `part-NNNNN.parquet` (id, p_new, predicted_condition) en `data/scored/<archivo>/`.
+    """
+    file_path = f'data/raw/{file_name}'
+    output_dir = output_dir or f'data/scored/{Path(file_name).stem}'
 
-    Pred = PredictAndEvaluate()
-    Pred.evaluate_model(df_proccesed)
+    scorer = BulkScorer(file_path, output_dir, n_workers=n_workers, shard_mb=shard_mb, engine=engine)
+    summary = scorer.run()
+    print(f"{summary['rows']:,} filas puntuadas en {summary['seconds']:.1f} s "
+          f"({summary['rows_per_second']:,.0f} filas/s); total en {output_dir}: {summary['total_rows']:,}")
 
     print("OK!")
     click.echo("Task complete.")
 
 
+@cli.command()
+@profiled
+@click.option("--host", default=ConfigEnv.SERVER_HOST, help='host del servidor')
+@click.option("--port", default=ConfigEnv.SERVER_PORT, help='puerto del servidor')
+@click.option("--max_batch_size", default=ConfigEnv.SERVER_MAX_BATCH_SIZE,
+              help='máximo de registros por micro-lote')
+@click.option("--max_wait_ms", default=ConfigEnv.SERVER_MAX_WAIT_MS,
+              help='espera máxima en ms de un micro-lote')
+@click.option("--engine", default=ConfigEnv.MODEL_ENGINE, type=click.Choice(list(MODEL_ENGINES)),
+              help='motor del modelo entrenado (rf - hgb)')
+def serve(host, port, max_batch_size, max_wait_ms, engine):
+    """
+    inicia el servidor de predicción: mantiene cargados todos los artefactos ajustados y puntúa registros
+    crudos (misma forma que las líneas del archivo .jsonlines) agrupando solicitudes en micro-lotes.
+
+    Rutas:
+        POST /predict, GET /metrics (latencia p50/p99 y throughput) y GET /health.
+    """
+    server = PredictionServer(ScoringPipeline(engine=engine), max_batch_size=max_batch_size,
+                              max_wait_ms=max_wait_ms)
+    server.run(host=host, port=port)
+
+
 if __name__ == "__main__":
     cli()
@@ -1,44 +1,207 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
 import requests
 import pandas as pd
-from constants.constants import url_govar
+from config import ConfigEnv
+from constants.constants import url_govar, GAZETTEER_SNAPSHOT_VERSION
+from src.text_normalizer import TextNormalizer
 
 
 class APIArgentinaConnector:
     """
     Esta clase gestiona la conexión con la API de datos gubernamentales de Argentina.
     Permite obtener información sobre los municipios del país y estructurarlos en un DataFrame.
+    Los municipios se guardan en un snapshot local versionado (JSON) con los nombres normalizados de
+    provincias y ciudades ya calculados; mientras exista un snapshot (o el archivo de respaldo), la
+    lectura nunca espera a la API y, si está vencido según el TTL, se actualiza en segundo plano.
 
     Métodos:
+        fetch(): Descarga los municipios de la API, con timeout y reintentos.
+        parse_response(data): Convierte la respuesta de la API en un DataFrame.
+        build_snapshot(ciudades_ar): Construye el snapshot con los diccionarios normalizados.
+        load_snapshot(path): Lee un snapshot (o una respuesta cruda de la API) desde disco.
+        save_snapshot(snapshot): Guarda el snapshot de forma atómica.
+        is_stale(snapshot): Indica si el snapshot superó el TTL.
+        refresh(): Descarga y guarda un nuevo snapshot.
+        refresh_async(): Lanza `refresh` en un hilo en segundo plano.
+        snapshot(): Retorna el snapshot vigente sin bloquear en la API cuando hay uno en disco.
         api_gob_ar(): Obtiene la lista de municipios de Argentina y la devuelve en un DataFrame.
     """
 
-    def __init__(self):
+    def __init__(self, snapshot_path=ConfigEnv.GAZETTEER_SNAPSHOT_PATH,
+                 fallback_path=ConfigEnv.GAZETTEER_FALLBACK_PATH, ttl_hours=ConfigEnv.GAZETTEER_TTL_HOURS,
+                 timeout=ConfigEnv.GAZETTEER_TIMEOUT, retries=ConfigEnv.GAZETTEER_RETRIES, snapshot=None):
         """
         Inicializa una instancia de APIArgentinaConnector.
+
+        Parámetros:
+            snapshot_path (str): Ruta del snapshot local de municipios.
+            fallback_path (str): Archivo de respaldo (snapshot o respuesta de la API) usado si no hay
+            snapshot local; None para no usar respaldo.
+            ttl_hours (float): Horas de vigencia del snapshot antes de actualizarlo en segundo plano.
+            timeout (float): Segundos máximos de espera de cada petición a la API.
+            retries (int): Número de intentos de descarga.
+            snapshot (dict): Snapshot ya cargado (ej. el del proceso padre de un pool); se usa tal cual,
+            sin leer el disco ni actualizarlo.
         """
         self.url = url_govar
+        self.snapshot_path = Path(snapshot_path)
+        self.fallback_path = Path(fallback_path) if fallback_path else None
+        self.ttl_hours = ttl_hours
+        self.timeout = timeout
+        self.retries = retries
+        self._snapshot = snapshot
+        self._refresh_thread = None
 
-    def api_gob_ar(self):
+    def fetch(self):
         """
-        Obtiene la lista de municipios de Argentina desde la API gubernamental.
+        Descarga la lista de municipios desde la API gubernamental, reintentando con espera
+        exponencial ante errores de red o respuestas inválidas.
+        Información en: https://www.datos.gob.ar/apis
 
-        Returns:
-            pandas.DataFrame: Un DataFrame con dos columnas:
-                - 'nombre': Nombre del municipio.
-                - 'provincia_name': Nombre de la provincia a la que pertenece.
+        Retorna:
+            pd.DataFrame: Municipios con las columnas 'nombre' y 'provincia_name'.
+        """
+        for attempt in range(1, self.retries + 1):
+            try:
+                response = requests.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                return self.parse_response(response.json())
+            except (requests.RequestException, ValueError) as error:
+                if attempt == self.retries:
+                    raise
+                print(f"Error consultando la API de municipios (intento {attempt}): {error}")
+                time.sleep(2 ** (attempt - 1))
+
+    @staticmethod
+    def parse_response(data):
+        """Convierte la respuesta de la API en un DataFrame con las columnas 'nombre' y 'provincia_name'."""
+        municipios = data.get("municipios", [])
+        return pd.DataFrame({
+            'nombre': [municipio["nombre"] for municipio in municipios],
+            'provincia_name': [municipio["provincia"]["nombre"] for municipio in municipios]
+        })
+
+    def build_snapshot(self, ciudades_ar):
+        """
+        Construye el snapshot de municipios con los nombres normalizados y los diccionarios
+        nombre normalizado -> nombre oficial de provincias y ciudades.
+
+        Parámetros:
+            ciudades_ar (pd.DataFrame): Municipios con las columnas 'nombre' y 'provincia_name'.
+
+        Retorna:
+            dict: Snapshot serializable en JSON.
+        """
+        ciudades_ar = ciudades_ar[['nombre', 'provincia_name']].copy()
+        ciudades_ar['nombre_normalizado'] = [TextNormalizer.normalize_text(c) for c in ciudades_ar['nombre']]
+        ciudades_ar['provincia_normalizada'] = [TextNormalizer.normalize_text(p)
+                                                for p in ciudades_ar['provincia_name']]
+        return {
+            'version': GAZETTEER_SNAPSHOT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'source': self.url,
+            'municipios': ciudades_ar.to_dict(orient='records'),
+            'states': dict(zip(ciudades_ar['provincia_normalizada'], ciudades_ar['provincia_name'])),
+            'cities': dict(zip(ciudades_ar['nombre_normalizado'], ciudades_ar['nombre'])),
+        }
+
+    def load_snapshot(self, path):
+        """
+        Lee un snapshot desde disco. También acepta una respuesta cruda de la API guardada en JSON.
+
+        Retorna:
+            dict: El snapshot, o None si el archivo no existe, no es válido o es de otra versión.
+        """
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if 'version' not in data and 'municipios' in data:
+            return self.build_snapshot(self.parse_response(data))
+        if data.get('version') != GAZETTEER_SNAPSHOT_VERSION:
+            return None
+        return data
+
+    def save_snapshot(self, snapshot):
+        """Guarda el snapshot en un archivo temporal y lo reemplaza de forma atómica."""
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(snapshot, file, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def is_stale(self, snapshot):
+        """Indica si el snapshot fue creado hace más de `ttl_hours` horas."""
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(snapshot['created_at'])
+        return age.total_seconds() > self.ttl_hours * 3600
+
+    def refresh(self):
+        """
+        Descarga los municipios y guarda un nuevo snapshot.
+
+        Retorna:
+            dict: El nuevo snapshot, o None si la descarga falló.
+        """
+        try:
+            snapshot = self.build_snapshot(self.fetch())
+        except (requests.RequestException, ValueError) as error:
+            print(f"No fue posible actualizar el snapshot de municipios: {error}")
+            return None
+        self.save_snapshot(snapshot)
+        self._snapshot = snapshot
+        print(f"Snapshot de municipios actualizado en {self.snapshot_path}")
+        return snapshot
+
+    def refresh_async(self):
+        """Lanza `refresh` en un hilo en segundo plano, si no hay uno en curso."""
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            self._refresh_thread = threading.Thread(target=self.refresh, daemon=True)
+            self._refresh_thread.start()
+        return self._refresh_thread
+
+    def snapshot(self):
+        """
+        Retorna el snapshot de municipios. Usa, en orden, el snapshot local (actualizándolo en segundo
+        plano si está vencido), el archivo de respaldo (actualizando en segundo plano) y, solo si no
+        existe ninguno, una descarga sincrónica.
+
+        Retorna:
+            dict: Snapshot con las llaves 'municipios', 'states' y 'cities'.
 
         Manejo de errores:
-            - Si la API no responde o devuelve un error, podría generar una excepción.
+            - Si no hay snapshot ni respaldo y la API no responde, lanza RuntimeError.
         """
-        # URL de la API para obtener todos los municipios de Argentina
-        # Información en: https://www.datos.gob.ar/apis
+        if self._snapshot is None:
+            snapshot = self.load_snapshot(self.snapshot_path)
+            if snapshot is not None:
+                if self.is_stale(snapshot):
+                    self.refresh_async()
+            elif self.fallback_path is not None and (snapshot := self.load_snapshot(self.fallback_path)):
+                print(f"Usando el respaldo de municipios {self.fallback_path}")
+                self.refresh_async()
+            else:
+                snapshot = self.refresh()
+                if snapshot is None:
+                    raise RuntimeError("No hay snapshot de municipios en disco y la API no está disponible; "
+                                       "configure GAZETTEER_FALLBACK_PATH con un archivo de respaldo.")
+            self._snapshot = self._snapshot or snapshot
+        return self._snapshot
 
-        response = requests.get(self.url)
-        data = response.json()
+    def api_gob_ar(self):
+        """
+        Obtiene la lista de municipios de Argentina desde el snapshot vigente.
 
-        # Extraer la lista de municipios
-        municipios = data.get("municipios", [])
-        ciudades_ar = pd.DataFrame(municipios)
-        ciudades_ar["provincia_name"] = ciudades_ar["provincia"].apply(lambda x: x["nombre"])
-        ciudades_ar = ciudades_ar[['nombre', 'provincia_name']]
-        return ciudades_ar
+        Returns:
+            pandas.DataFrame: Un DataFrame con las columnas:
+                - 'nombre': Nombre del municipio.
+                - 'provincia_name': Nombre de la provincia a la que pertenece.
+                - 'nombre_normalizado' y 'provincia_normalizada': Nombres normalizados.
+        """
+        return pd.DataFrame(self.snapshot()['municipios'])
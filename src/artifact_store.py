@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class ArtifactStore:
+    """
+    Esta clase gestiona los artefactos intermedios del pipeline (salidas de cada comando) en formato
+    Parquet. A diferencia de los CSV separados por '|', conserva los tipos de datos (fechas, categorías,
+    enteros), permite leer solo un subconjunto de columnas y registra en los metadatos del archivo el
+    número de filas y el esquema.
+
+    Métodos:
+        artifact_path(name): Retorna la ruta del archivo Parquet de un artefacto.
+        save(df, name, **metadata): Guarda un DataFrame como artefacto con sus metadatos.
+        load(name, columns=None, memory_map=True): Carga un artefacto, opcionalmente proyectando columnas.
+        metadata(name): Retorna los metadatos registrados de un artefacto sin leer sus datos.
+    """
+    METADATA_KEY = b'ml_condition_predictor'
+
+    def __init__(self, path="data/processed"):
+        """
+        Inicializa el ArtifactStore.
+
+        Parámetros:
+            path (str): Directorio donde se guardan los artefactos.
+        """
+        self.path = Path(path)
+
+    def artifact_path(self, name):
+        """Retorna la ruta del archivo Parquet de un artefacto."""
+        return self.path / f"{name}.parquet"
+
+    def save(self, df, name, **metadata):
+        """
+        Guarda un DataFrame como artefacto Parquet, registrando filas, esquema y metadatos adicionales.
+
+        Parámetros:
+            df (pd.DataFrame): Datos a guardar.
+            name (str): Nombre del artefacto (ej. 'df_processed').
+            **metadata: Metadatos adicionales serializables en JSON (ej. stage, source).
+
+        Retorna:
+            Path: Ruta del archivo guardado.
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        info = {
+            'name': name,
+            'num_rows': table.num_rows,
+            'schema': {field.name: str(field.type) for field in table.schema},
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            **metadata
+        }
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[self.METADATA_KEY] = json.dumps(info).encode('utf-8')
+        table = table.replace_schema_metadata(schema_metadata)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self.artifact_path(name)
+        pq.write_table(table, path, compression='zstd')
+        return path
+
+    def load(self, name, columns=None, memory_map=True):
+        """
+        Carga un artefacto como DataFrame con sus tipos de datos originales.
+
+        Parámetros:
+            name (str): Nombre del artefacto.
+            columns (list): Columnas a leer. Si es None, se leen todas.
+            memory_map (bool): Si es True, lee el archivo mediante memory map.
+
+        Retorna:
+            pd.DataFrame: Datos del artefacto.
+        """
+        table = pq.read_table(self.artifact_path(name), columns=columns, memory_map=memory_map)
+        return table.to_pandas()
+
+    def metadata(self, name):
+        """Retorna los metadatos registrados (filas, esquema, etc.) de un artefacto sin leer sus datos."""
+        schema = pq.read_schema(self.artifact_path(name))
+        return json.loads(schema.metadata[self.METADATA_KEY])
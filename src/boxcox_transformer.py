@@ -0,0 +1,58 @@
+from scipy.special import boxcox
+
+
+class BoxCoxTransformer:
+    """
+    Esta clase aplica la transformación de Box-Cox con el lambda aprendido una sola vez (fit) sobre el
+    conjunto de entrenamiento, de modo que en predicción se transforma sin reajustar el lambda.
+
+    Métodos:
+        fit(df): Estima el lambda de cada columna cuyos valores son todos positivos.
+        transform(df): Aplica la transformación con los lambdas aprendidos.
+        fit_transform(df): Ajusta y transforma el mismo DataFrame.
+    """
+    def __init__(self, cols):
+        """
+        Inicializa el BoxCoxTransformer.
+
+        Parámetros:
+            cols (list): Lista de columnas a transformar.
+        """
+        self.cols = cols
+
+    def fit(self, df):
+        """
+        Estima el lambda de Box-Cox de las columnas especificadas si sus valores son positivos.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame de entrenamiento.
+
+        Retorna:
+            BoxCoxTransformer: La instancia ajustada.
+        """
+        import scipy.stats as stats  # solo se requiere al ajustar
+
+        self.lambdas_ = {}
+        for col in self.cols:
+            if (df[col] > 0).all():
+                _, self.lambdas_[col] = stats.boxcox(df[col] + 1)
+        return self
+
+    def transform(self, df):
+        """
+        Aplica la transformación de Box-Cox con los lambdas aprendidos en `fit`.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame a transformar (puede ser un único registro).
+
+        Retorna:
+            pd.DataFrame: DataFrame con las transformaciones aplicadas.
+        """
+        df_transformed = df.copy()
+        for col, lmbda in self.lambdas_.items():
+            df_transformed[col] = boxcox(df[col] + 1, lmbda)
+        return df_transformed
+
+    def fit_transform(self, df):
+        """Ajusta el transformador y transforma el mismo DataFrame."""
+        return self.fit(df).transform(df)
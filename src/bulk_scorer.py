@@ -0,0 +1,200 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from config import ConfigEnv
+from src.artifact_store import ArtifactStore
+from src.jsonlines_reader import JsonLinesReader
+from src.model_training import ModelTraining
+from src.scoring_pipeline import ScoringPipeline
+from src.stage_cache import StageCache
+from src.stage_profiler import PROFILER
+
+# Pipeline de cada proceso del pool, cargado una sola vez por `_init_worker`
+_pipeline = None
+
+
+def _init_worker(engine, profile_command=None):
+    """Inicializador del pool: activa el profiler si está activo en el proceso padre y carga y calienta
+    el ScoringPipeline del proceso."""
+    global _pipeline
+    if profile_command:
+        PROFILER.enable(profile_command)
+    _pipeline = ScoringPipeline(engine=engine).warm_up()
+
+
+def _score_shard(input_path, output_dir, shard, byte_start, byte_stop, chunk_size):
+    """
+    Puntúa las líneas de un rango de bytes y escribe su parte Parquet de forma atómica (archivo temporal
+    y renombrado), de modo que una parte existente siempre está completa.
+
+    Retorna:
+        tuple: (shard, filas puntuadas, segundos, registros del profiler del proceso desde el shard anterior).
+    """
+    start = time.perf_counter()
+    with PROFILER.stage('score_shard') as record:
+        reader = JsonLinesReader(input_path, chunk_size=chunk_size)
+        parts = [_pipeline.score(records) for records in reader.iter_byte_chunks(byte_start, byte_stop)]
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            {'id': [], 'p_new': [], 'predicted_condition': []})
+        df['id'] = df['id'].astype('string')
+        df['p_new'] = df['p_new'].astype(float)
+        df['predicted_condition'] = df['predicted_condition'].astype('string')
+
+        store = ArtifactStore(output_dir)
+        tmp_path = store.save(df, f"_tmp-part-{shard:05d}", stage='score', source=str(input_path),
+                              shard=shard, byte_start=byte_start, byte_stop=byte_stop)
+        os.replace(tmp_path, store.artifact_path(f"part-{shard:05d}"))
+        record['rows_out'] = len(df)
+    return shard, len(df), time.perf_counter() - start, PROFILER.collect()
+
+
+class BulkScorer:
+    """
+    Esta clase puntúa un archivo .jsonlines completo, sin etiquetas, con el preprocesamiento, la
+    ingeniería de variables y el modelo ajustados. El archivo se divide en rangos de bytes alineados a
+    líneas (shards) que se reparten en un pool de procesos; cada proceso carga los artefactos una sola
+    vez y escribe por shard una parte Parquet con las columnas `id`, `p_new` y `predicted_condition`.
+
+    El avance se registra en `_progress.json` dentro de la carpeta de salida: al ejecutar de nuevo sobre
+    el mismo archivo y con los mismos modelos se omiten los shards ya escritos, de modo que una corrida
+    interrumpida se reanuda.
+
+    Métodos:
+        artifact_paths(): Archivos de los artefactos ajustados que carga cada proceso.
+        fingerprint(): Identifica el archivo de entrada, la partición en shards y los artefactos.
+        load_progress(): Carga el avance guardado (o uno vacío).
+        save_progress(progress): Guarda el avance de forma atómica.
+        run(): Puntúa los shards pendientes y retorna un resumen con las filas por segundo.
+    """
+    PROGRESS_FILE = '_progress.json'
+
+    def __init__(self, input_path, output_dir, n_workers=ConfigEnv.SCORE_N_WORKERS,
+                 shard_mb=ConfigEnv.SCORE_SHARD_MB, chunk_size=ConfigEnv.CHUNK_SIZE,
+                 engine=ConfigEnv.MODEL_ENGINE):
+        """
+        Inicializa el BulkScorer.
+
+        Parámetros:
+            input_path (str): Archivo .jsonlines a puntuar.
+            output_dir (str): Carpeta de salida de las partes Parquet y del avance.
+            n_workers (int): Procesos del pool (0 usa todos los núcleos).
+            shard_mb (float): Tamaño aproximado de cada shard en MB.
+            chunk_size (int): Registros por bloque dentro de un shard.
+            engine (str): Motor del modelo (rf - hgb).
+        """
+        self.input_path = Path(input_path)
+        self.output_dir = Path(output_dir)
+        self.n_workers = n_workers or os.cpu_count()
+        self.shard_size = int(shard_mb * (1 << 20))
+        self.chunk_size = chunk_size
+        self.engine = engine
+        self.reader = JsonLinesReader(str(self.input_path), chunk_size=chunk_size)
+        self._fingerprint = None
+
+    def artifact_paths(self):
+        """
+        Archivos de los artefactos ajustados que carga cada proceso: modelo del motor, FeaturePipeline,
+        imputadores y Box-Cox. Si `feature_pipeline.pkl` no existe se construye aquí, como lo haría cada
+        proceso al cargarlo, para que su hash no cambie entre una corrida y su reanudación.
+        """
+        mt = ModelTraining()
+        mt.load_feature_pipeline()
+        return mt.get_engine(self.engine).model_paths(mt.PATH_MODELS) + [
+            mt.PATH_MODELS / name for name in ('feature_pipeline.pkl', 'imputer.pkl', 'boxcox.pkl',
+                                               'imputer_feature_engineering.pkl')]
+
+    def fingerprint(self):
+        """
+        Archivo de entrada (ruta, tamaño y fecha de modificación), tamaño de shard y hash de los
+        artefactos ajustados, de modo que un reentrenamiento entre una corrida y su reanudación no mezcla
+        predicciones de dos modelos en la misma carpeta.
+        """
+        if self._fingerprint is None:
+            stat = self.input_path.stat()
+            self._fingerprint = {
+                'input': str(self.input_path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                'shard_size': self.shard_size, 'engine': self.engine,
+                'artifacts': {str(path): StageCache.file_digest(path) for path in self.artifact_paths()},
+            }
+        return self._fingerprint
+
+    def load_progress(self):
+        """
+        Carga el avance de la carpeta de salida.
+
+        Retorna:
+            dict: Avance con 'fingerprint' y 'shards' (shard -> filas); vacío si no existe.
+
+        Manejo de errores:
+            - Si el avance corresponde a otro archivo, a otra partición o a otros modelos, lanza ValueError.
+        """
+        path = self.output_dir / self.PROGRESS_FILE
+        if not path.exists():
+            return {'fingerprint': self.fingerprint(), 'shards': {}}
+        with open(path, 'r') as f:
+            progress = json.load(f)
+        if progress['fingerprint'] != self.fingerprint():
+            raise ValueError(f"{self.output_dir} contiene el avance de otro archivo, de otra partición o de "
+                             "otros modelos; use otra carpeta de salida o elimínela para empezar de nuevo.")
+        return progress
+
+    def save_progress(self, progress):
+        """Guarda el avance en un archivo temporal y lo renombra, para no dejarlo a medio escribir."""
+        path = self.output_dir / self.PROGRESS_FILE
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, path)
+
+    def run(self):
+        """
+        Puntúa en paralelo los shards pendientes, registrando el avance al terminar cada uno. Si el profiler
+        está activo, las etapas medidas en cada proceso (`score_shard`, `scoring`, ...) se agregan a las
+        del proceso actual.
+
+        Retorna:
+            dict: Shards totales y omitidos, filas puntuadas, segundos y filas por segundo.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        progress = self.load_progress()
+        shards = self.reader.byte_ranges(self.shard_size)
+        pending = [(shard, byte_start, byte_stop) for shard, (byte_start, byte_stop) in enumerate(shards)
+                   if str(shard) not in progress['shards']
+                   or not ArtifactStore(self.output_dir).artifact_path(f"part-{shard:05d}").exists()]
+        print(f"{len(shards)} shards de ~{self.shard_size / (1 << 20):.0f} MB, "
+              f"{len(shards) - len(pending)} ya puntuados, {len(pending)} pendientes "
+              f"({self.n_workers} procesos)")
+
+        start, total_rows = time.perf_counter(), 0
+        profile_command = PROFILER.command if PROFILER.enabled else None
+        with PROFILER.stage('bulk_scoring') as record:
+            if pending:
+                with ProcessPoolExecutor(max_workers=min(self.n_workers, len(pending)),
+                                         initializer=_init_worker,
+                                         initargs=(self.engine, profile_command)) as executor:
+                    futures = [executor.submit(_score_shard, str(self.input_path), str(self.output_dir),
+                                               shard, byte_start, byte_stop, self.chunk_size)
+                               for shard, byte_start, byte_stop in pending]
+                    for future in as_completed(futures):
+                        shard, rows, seconds, records = future.result()
+                        PROFILER.merge(records)
+                        progress['shards'][str(shard)] = rows
+                        self.save_progress(progress)
+                        total_rows += rows
+                        elapsed = time.perf_counter() - start
+                        print(f"Shard {shard}: {rows:,} filas en {seconds:.1f} s - acumulado {total_rows:,} "
+                              f"filas ({total_rows / elapsed:,.0f} filas/s)")
+            record['rows_out'] = total_rows
+
+        elapsed = time.perf_counter() - start
+        return {
+            'shards': len(shards),
+            'skipped_shards': len(shards) - len(pending),
+            'rows': total_rows,
+            'total_rows': sum(progress['shards'].values()),
+            'seconds': elapsed,
+            'rows_per_second': total_rows / elapsed if elapsed > 0 else 0.0,
+        }
@@ -1,10 +1,14 @@
-import ast
-import json
-import numpy as np
+import hashlib
+import joblib
 import pandas as pd
-import scipy.stats as stats
-from dateutil.parser import parse
-from sklearn.impute import KNNImputer
+from pathlib import Path
+from config import ConfigEnv
+from constants.constants import TEST_ROWS, raw_schema
+from src.boxcox_transformer import BoxCoxTransformer
+from src.jsonlines_reader import JsonLinesReader
+from src.stage_profiler import PROFILER
+from src.missing_value_imputer import MissingValueImputer
+from src.stage_cache import StageCache
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -16,17 +20,63 @@ class DataPreprocessing:
     transformación de variables y generación de conjuntos de entrenamiento y prueba.
 
     Métodos:
+        split_range(df_name): Retorna el rango de filas del archivo que corresponde a train o test.
+        iter_dataset(path_raw, df_name): Itera por bloques los registros de train o test.
         build_dataset(path_raw): Carga y divide los datos en conjuntos de entrenamiento y prueba.
-        clean_data_init(df): Realiza la limpieza inicial del DataFrame.
+        extract_fields(records, schema): Extrae los campos anidados declarados en el esquema.
+        parse_dimensions(values): Separa cadenas 'AnchoxAlto' en ancho y alto de forma vectorizada.
+        clean_data_init(records, schema): Construye el DataFrame limpio y tipado desde los registros.
+        normalize_dtypes(df, schema): Aplica a un bloque armado por partes los tipos de `clean_data_init`.
+        clean_lines(lines): Limpia un bloque de líneas crudas, reutilizando las ya limpiadas del caché.
+        dataset_digest(path_raw, df_name): Hash del contenido de las líneas de train o test.
+        stage_key(path_raw, use_knn): Llave de la etapa de preprocesamiento (datos, parámetros y código).
+        output_paths(): Archivos de los transformadores que genera el preprocesamiento.
         impute_missing_values(df, categorical_strategy, numerical_strategy, use_knn, n_neighbors):
-            Imputa valores faltantes en el DataFrame.
-        transform_df_boxcox(df, cols): Aplica la transformación de Box-Cox a columnas numéricas.
-        preprocessing(file_path): Ejecuta el preprocesamiento completo del conjunto de datos.
+            Ajusta un imputador e imputa valores faltantes en el DataFrame.
+        transform_df_boxcox(df, cols): Ajusta y aplica la transformación de Box-Cox a columnas numéricas.
+        save_transformers(): Guarda el imputador y el Box-Cox ajustados en `models/`.
+        load_transformers(): Carga el imputador y el Box-Cox ajustados desde `models/`.
+        transform(df_clean): Aplica el imputador y el Box-Cox ajustados sin recalcular estadísticos.
+        preprocessing(file_path, df_name, use_knn): Ejecuta el preprocesamiento completo de los datos.
     """
-    def __init__(self):
+    def __init__(self, chunk_size=ConfigEnv.CHUNK_SIZE, cache=None):
         """
         Initializes the DataPreprocessing instance.
+
+        Parámetros:
+            chunk_size (int): Número máximo de registros por bloque al leer el archivo .jsonlines.
+            cache (StageCache): Caché de etapas (por defecto, el configurado en ConfigEnv).
+        """
+        self.chunk_size = chunk_size
+        self.cache = cache or StageCache()
+        self.PATH_MODELS = Path("./models")
+        self.imputer = None
+        self.boxcox = None
+
+    def split_range(self, df_name='train'):
+        """
+        Retorna el rango de filas [start, stop) del archivo que corresponde a cada conjunto.
+        Los últimos `TEST_ROWS` registros son test y el resto train.
+        """
+        if df_name == 'test':
+            return -TEST_ROWS, None
+        return 0, -TEST_ROWS
+
+    def iter_dataset(self, path_raw, df_name='train'):
+        """
+        Itera por bloques los registros del conjunto indicado sin cargar el archivo completo.
+
+        Parámetros:
+            path_raw (str): Ruta del archivo JSON con los datos.
+            df_name (str): 'train' o 'test'.
+
+        Retorna:
+            generator: Listas de registros (dict) con a lo sumo `chunk_size` elementos.
         """
+        reader = JsonLinesReader(path_raw, chunk_size=self.chunk_size)
+        start, stop = self.split_range(df_name)
+        return reader.iter_chunks(start, stop)
+
     # You can safely assume that `build_dataset` is correctly implemented
     def build_dataset(self, path_raw):
         """
@@ -38,125 +88,156 @@ class DataPreprocessing:
         Retorna:
             tuple: X_train, y_train, X_test, y_test
         """
-        data = [json.loads(x) for x in open(path_raw)]
         target = lambda x: x.get("condition")
-        N = -10000
-        X_train = data[:N]
-        X_test = data[N:]
+        X_train = [x for chunk in self.iter_dataset(path_raw, 'train') for x in chunk]
+        X_test = [x for chunk in self.iter_dataset(path_raw, 'test') for x in chunk]
         y_train = [target(x) for x in X_train]
         y_test = [target(x) for x in X_test]
         for x in X_test:
             del x["condition"]
         return X_train, y_train, X_test, y_test
 
-    def clean_data_init(self, df: pd.DataFrame) -> pd.DataFrame:
+    def extract_fields(self, records, schema=raw_schema):
         """
-        Realiza la limpieza inicial del DataFrame eliminando estructuras anidadas,
-        columnas irrelevantes y optimizando tipos de datos.
+        Extrae del registro crudo únicamente los campos anidados declarados en el esquema.
 
         Parámetros:
-            df (pd.DataFrame): DataFrame original a limpiar.
+            records (list): Lista de registros (dict) leídos del archivo .jsonlines.
+            schema (dict): Columna -> (ruta dentro del registro, tipo). Ver `raw_schema`.
 
         Retorna:
-            pd.DataFrame: DataFrame limpio.
+            dict: Columna -> lista de valores crudos (None si la ruta no existe).
         """
-        print("Aplicando transformación de estructuras anidadas...")
-
-        def flatten_json(value, prefix=''):
-            # Convierte estructuras anidadas ej. 'JSON, listas' en columnas planas
-            if isinstance(value, str):
+        def get_path(record, path):
+            value = record
+            for key in path:
                 try:
-                    value = ast.literal_eval(value)
-                except (ValueError, SyntaxError):
-                    return {prefix: value}
-
-            if isinstance(value, dict):
-                return {f'{prefix}_{k}': v for k, v in value.items()} or {prefix: np.nan}
-
-            if isinstance(value, list):
-                if not value:
-                    return {prefix: np.nan}
-                elif all(isinstance(i, dict) for i in value):
-                    return {f'{prefix}_{k}': v for item in value for k, v in item.items()}
-                return {f'{prefix}_{i}': v for i, v in enumerate(value)}
-
-            return {prefix: value}
-
-        # Aplica transformacion
-        print("Eliminando columnas irrelevantes...")
-        df_expanded = pd.concat(
-            [pd.json_normalize(df[col].apply(lambda x: flatten_json(x, col))) for col in df.columns],
-            axis=1
-        )
-
-        # Elimina columnas con 'id', 'url' o 'permalink'
-        df_expanded.columns = df_expanded.columns.astype(str)
-        df_clean = df_expanded.loc[:, ~df_expanded.columns.str
-                                   .contains(r'\b(url|permalink)\b', case=False, regex=True)]
-
-        # Convierte tipos de datos validando fechas
-        print("Validando columnas de fecha...")
-        for col in df_clean.select_dtypes(include=['object']):
-            try:
-                sample_values = df_clean[col].dropna() \
-                                             .sample(n=min(10, len(df_clean[col].dropna())),
-                                                     random_state=42).tolist()
-
-                if all(isinstance(parse(val, fuzzy=True), pd.Timestamp) for val in sample_values):
-                    df_clean[col] = pd.to_datetime(df_clean[col], errors='coerce', infer_datetime_format=True)
-            except Exception:
-                continue
+                    value = value[key]
+                except (KeyError, IndexError, TypeError):
+                    return None
+            return value
 
-        # Convierte columnas especificas a tipos adecuados
-        if 'warranty' in df_clean.columns:
-            df_clean['warranty'] = df_clean['warranty'].astype('string')
+        return {col: [get_path(r, path) for r in records] for col, (path, _) in schema.items()}
 
-        df_clean.reset_index(inplace=True)
+    def parse_dimensions(self, values):
+        """Separa de forma vectorizada cadenas 'AnchoxAlto' en dos columnas numéricas (ancho, alto)."""
+        dims = pd.Series(values, dtype=object).str.extract(r'^(\d+)x(\d+)$')
+        return dims[0].astype(float), dims[1].astype(float)
 
-        print("Extrayendo dimensiones de imágenes...")
+    @PROFILER.track('flatten', rows_in='records', rows_out=True)
+    def clean_data_init(self, records, schema=raw_schema) -> pd.DataFrame:
+        """
+        Realiza la limpieza inicial construyendo, a partir de los registros crudos, solo las columnas
+        declaradas en el esquema con su tipo de dato.
 
-        def extract_dimensions(size):
-            """Extrae el ancho y alto de una cadena con formato 'AnchoxAlto'."""
-            if isinstance(size, str) and 'x' in size:
-                width, height = map(int, size.split('x'))
-                return width, height
-            return None, None
+        Parámetros:
+            records (list | pd.DataFrame): Registros crudos del archivo .jsonlines.
+            schema (dict): Columna -> (ruta dentro del registro, tipo). Ver `raw_schema`.
 
-        # alto y ancho de cada imagen
-        # Corrección de E501: Líneas largas divididas en varias líneas para mejorar legibilidad
-        df_clean[['pictures_width', 'pictures_height']] = (
-            df_clean['pictures_size'].apply(lambda x: pd.Series(extract_dimensions(x)))
-        )
+        Retorna:
+            pd.DataFrame: DataFrame limpio.
+        """
+        if isinstance(records, pd.DataFrame):
+            records = records.to_dict('records')
+
+        print("Extrayendo campos anidados del esquema...")
+        raw_columns = self.extract_fields(records, schema)
+
+        print("Tipando columnas y extrayendo dimensiones de imágenes...")
+        columns = {}
+        for col, (_, kind) in schema.items():
+            values = raw_columns.pop(col)
+            if kind == 'size':
+                columns[f'{col}_width'], columns[f'{col}_height'] = self.parse_dimensions(values)
+            elif kind == 'timestamp':
+                columns[col] = pd.to_datetime(pd.Series(values, dtype=object), utc=True,
+                                              format='ISO8601', errors='coerce')
+            elif kind == 'timestamp_ms':
+                columns[col] = pd.to_datetime(pd.to_numeric(pd.Series(values, dtype=object), errors='coerce'),
+                                              unit='ms', utc=True)
+            elif kind in ('int', 'float'):
+                columns[col] = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+                if kind == 'float':
+                    columns[col] = columns[col].astype(float)
+            elif kind == 'bool':
+                columns[col] = pd.Series(values, dtype=object)
+                if columns[col].notnull().all():
+                    columns[col] = columns[col].astype(bool)
+            elif kind == 'string':
+                columns[col] = pd.Series(values, dtype=object).astype('string')
+            else:
+                columns[col] = pd.Series(values, dtype=object)
+
+        return pd.DataFrame(columns)
+
+    def normalize_dtypes(self, df, schema=raw_schema):
+        """
+        Aplica a un bloque armado a partir de varias partes (caché y filas nuevas) la misma regla de tipos
+        que `clean_data_init` sobre un bloque completo: booleanos y enteros sin faltantes conservan su
+        tipo, aunque alguna parte los haya convertido a object o float.
+        """
+        for col, (_, kind) in schema.items():
+            if kind not in ('bool', 'int') or col not in df or not df[col].notnull().all():
+                continue
+            if kind == 'bool' and df[col].dtype != bool:
+                df[col] = df[col].astype(bool)
+            elif kind == 'int' and df[col].dtype.kind == 'f':
+                df[col] = df[col].astype('int64')
+        return df
+
+    def clean_version(self):
+        """Versión de la limpieza inicial: código de extracción, tipado y esquema crudo."""
+        return StageCache.code_version(DataPreprocessing.extract_fields, DataPreprocessing.parse_dimensions,
+                                       DataPreprocessing.clean_data_init, JsonLinesReader.decode, raw_schema)
+
+    def clean_lines(self, lines):
+        """
+        Limpia un bloque de líneas crudas del archivo .jsonlines. Cada línea se identifica por el hash de
+        su contenido: las ya limpiadas se leen del caché de etapas sin decodificarlas y solo las nuevas
+        pasan por `clean_data_init`.
 
-        df_clean[['pictures_max_width', 'pictures_max_height']] = (
-            df_clean['pictures_max_size'].apply(lambda x: pd.Series(extract_dimensions(x)))
-        )
+        Parámetros:
+            lines (list): Líneas crudas (bytes).
 
-        # --
-        df_clean['date_created'] = pd.to_datetime(df_clean['date_created'], utc=True)
-        df_clean['last_updated'] = pd.to_datetime(df_clean['last_updated'], utc=True)
+        Retorna:
+            pd.DataFrame: DataFrame limpio, una fila por línea y en el mismo orden.
+        """
+        def compute(rows):
+            return self.clean_data_init(JsonLinesReader.decode([lines[i] for i in rows]))
 
-        df_clean['start_time'] = pd.to_datetime(df_clean['start_time'], unit='ms', utc=True)
-        df_clean['stop_time'] = pd.to_datetime(df_clean['stop_time'], unit='ms', utc=True)
+        df = self.cache.apply('clean', self.clean_version, StageCache.row_keys(lines), compute)
+        return self.normalize_dtypes(df)
 
-        df_clean = df_clean[[
-                'seller_address_state.name', 'seller_address_city.name', 'condition',
-                'base_price', 'shipping_local_pick_up', 'shipping_free_shipping',
-                'shipping_mode', 'non_mercado_pago_payment_methods_description',
-                'non_mercado_pago_payment_methods_type', 'listing_type_id', 'price',
-                'buying_mode', 'tags_0', 'accepts_mercadopago', 'automatic_relist',
-                'status', 'initial_quantity', 'sold_quantity', 'available_quantity',
-                'warranty', 'pictures_width', 'pictures_height', 'pictures_max_width',
-                'pictures_max_height', 'start_time', 'stop_time',
-                'date_created', 'last_updated', 'title', 'seller_id', 'category_id'
-            ]]
+    def dataset_digest(self, path_raw, df_name='train'):
+        """Hash del contenido de las líneas del conjunto indicado (train o test), sin decodificarlas."""
+        reader = JsonLinesReader(path_raw, chunk_size=self.chunk_size)
+        h = hashlib.blake2b(digest_size=16)
+        for line in reader.iter_lines(*self.split_range(df_name)):
+            h.update(line)
+        return h.hexdigest()
 
-        return df_clean.reset_index(drop=True)
+    def stage_key(self, path_raw, use_knn=False):
+        """
+        Llave de la etapa `processed_data_products`: contenido de las filas de train, parámetros y código
+        de la limpieza, la imputación y el Box-Cox.
 
+        Retorna:
+            str: Llave de la etapa.
+        """
+        return StageCache.digest('df_processed', self.dataset_digest(path_raw, 'train'), use_knn, TEST_ROWS,
+                                 StageCache.code_version(DataPreprocessing, MissingValueImputer,
+                                                         BoxCoxTransformer, raw_schema))
+
+    def output_paths(self):
+        """Archivos que genera el preprocesamiento de entrenamiento además de `df_processed`."""
+        return [self.PATH_MODELS / 'imputer.pkl', self.PATH_MODELS / 'boxcox.pkl']
+
+    @PROFILER.track('imputation', rows_in='df', rows_out=True)
     def impute_missing_values(self, df, categorical_strategy='mode',
                               numerical_strategy='median', use_knn=False, n_neighbors=5):
         """
-        Imputa valores faltantes en el DataFrame según el tipo de variable.
+        Imputa valores faltantes en el DataFrame según el tipo de variable, ajustando un
+        `MissingValueImputer` sobre el mismo DataFrame. El imputador ajustado queda en `self.imputer`.
 
         Parámetros:
             df (pd.DataFrame): DataFrame con los datos.
@@ -168,36 +249,16 @@ class DataPreprocessing:
         Retorna:
             pd.DataFrame: DataFrame con valores imputados.
         """
-        df_imputed = df.copy()
-
-        # Identificar columnas categóricas y numéricas
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-        numerical_cols = df.select_dtypes(include=['number']).columns
-
-        # Imputación para variables categóricas
-        for col in categorical_cols:
-            if df_imputed[col].isnull().sum() > 0:
-                if categorical_strategy == 'mode':
-                    mode_value = df_imputed[col].mode()[0]  # Valor más frecuente
-                    df_imputed[col].fillna(mode_value, inplace=True)
-
-        # Imputación para variables numéricas
-        if use_knn:
-            imputer = KNNImputer(n_neighbors=n_neighbors)
-            df_imputed[numerical_cols] = imputer.fit_transform(df_imputed[numerical_cols])
-        else:
-            for col in numerical_cols:
-                if df_imputed[col].isnull().sum() > 0:
-                    if numerical_strategy == 'median':
-                        df_imputed[col].fillna(df_imputed[col].median(), inplace=True)
-                    elif numerical_strategy == 'mean':
-                        df_imputed[col].fillna(df_imputed[col].mean(), inplace=True)
-
-        return df_imputed
+        self.imputer = MissingValueImputer(categorical_strategy=categorical_strategy,
+                                           numerical_strategy=numerical_strategy,
+                                           use_knn=use_knn, n_neighbors=n_neighbors)
+        return self.imputer.fit_transform(df)
 
+    @PROFILER.track('boxcox', rows_in='df', rows_out=True)
     def transform_df_boxcox(self, df, cols):
         """
-        Aplica la transformación de Box-Cox a las columnas especificadas si los valores son positivos.
+        Aplica la transformación de Box-Cox a las columnas especificadas si los valores son positivos,
+        ajustando un `BoxCoxTransformer` sobre el mismo DataFrame. El transformador queda en `self.boxcox`.
 
         Parámetros:
             df (pd.DataFrame): DataFrame con los datos.
@@ -206,43 +267,72 @@ class DataPreprocessing:
         Retorna:
             pd.DataFrame: DataFrame con las transformaciones aplicadas.
         """
-        df_transformed = df.copy()
+        self.boxcox = BoxCoxTransformer(cols)
+        return self.boxcox.fit_transform(df)
+
+    def save_transformers(self):
+        """Guarda en `models/` el imputador y el transformador Box-Cox ajustados."""
+        self.PATH_MODELS.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self.imputer, self.PATH_MODELS / 'imputer.pkl')
+        joblib.dump(self.boxcox, self.PATH_MODELS / 'boxcox.pkl')
+
+    def load_transformers(self):
+        """Carga desde `models/` el imputador y el transformador Box-Cox ajustados en entrenamiento."""
+        self.imputer = joblib.load(self.PATH_MODELS / 'imputer.pkl')
+        self.boxcox = joblib.load(self.PATH_MODELS / 'boxcox.pkl')
+
+    @PROFILER.track('imputation_boxcox_transform', rows_in='df_clean', rows_out=True)
+    def transform(self, df_clean):
+        """
+        Aplica el imputador y el transformador Box-Cox ya ajustados, sin recalcular estadísticos.
 
-        for col in cols:
-            if (df[col] > 0).all():
-                df_transformed[col], _ = stats.boxcox(df[col] + 1)
+        Parámetros:
+            df_clean (pd.DataFrame): DataFrame resultado de `clean_data_init` (uno o más registros).
 
-        return df_transformed
+        Retorna:
+            pd.DataFrame: DataFrame preprocesado.
+        """
+        if self.imputer is None or self.boxcox is None:
+            self.load_transformers()
+        return self.boxcox.transform(self.imputer.transform(df_clean))
 
-    def preprocessing(self, file_path: str, df_name='train') -> pd.DataFrame:
+    def preprocessing(self, file_path: str, df_name='train', use_knn=False) -> pd.DataFrame:
         """
-        Ejecuta el preprocesamiento completo de los datos.
+        Ejecuta el preprocesamiento completo de los datos. Con `df_name='train'` ajusta el imputador y
+        el Box-Cox y los guarda en `models/`; con `df_name='test'` aplica los ya ajustados. La limpieza
+        inicial reutiliza del caché de etapas las líneas ya limpiadas, de modo que solo se decodifican
+        los registros nuevos.
 
         Parámetros:
             file_path (str): Ruta del archivo de datos.
+            df_name (str): 'train' o 'test', define el rango de filas a procesar.
+            use_knn (bool): Si True, imputa las variables numéricas con KNN (solo al ajustar).
 
         Retorna:
             pd.DataFrame: DataFrame preprocesado.
         """
-        X_train, y_train, _, _ = self.build_dataset(file_path)
-        if df_name == 'test':
-            _, _, X_train, y_train = self.build_dataset(file_path)
-
-        print("conformando data set inicial ..")
-        y_train = pd.DataFrame(y_train)
-        X_train = pd.DataFrame(X_train)
-        df_products = pd.concat([X_train, y_train], axis=1)
-        df_products['condition'] = y_train
-
-        print("limpieza inicial ..")
-        df_products_clean = self.clean_data_init(df_products)
+        print("conformando data set inicial y limpieza inicial por bloques ..")
+        reader = JsonLinesReader(file_path, chunk_size=self.chunk_size)
+        clean_chunks = []
+        for lines in reader.iter_line_chunks(*self.split_range(df_name)):
+            clean_chunks.append(self.clean_lines(lines))
+        df_products_clean = pd.concat(clean_chunks, ignore_index=True)
+        del clean_chunks
+        if self.cache.enabled:
+            print("Caché de la etapa de limpieza:", self.cache.stats('clean'))
+
+        if df_name != 'train':
+            print("imputar datos faltantes y box cox con transformadores ajustados ..")
+            return self.transform(df_products_clean)
 
         print("imputar datos faltantes ..")
         df_products_imputed = self.impute_missing_values(df_products_clean,
                                                          categorical_strategy='mode',
-                                                         numerical_strategy='median')
+                                                         numerical_strategy='median',
+                                                         use_knn=use_knn)
 
         print("trasnformación de variables box cox ..")
         df_products_transformed = self.transform_df_boxcox(df_products_imputed, ["base_price", "price"])
 
+        self.save_transformers()
         return df_products_transformed
@@ -0,0 +1,172 @@
+import re
+import json
+import fcntl
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Esta clase implementa un caché persistente de embeddings identificados por el hash del contenido
+    del texto. Los vectores se guardan como una matriz float16 en un archivo binario de solo
+    anexado, leído con memoria mapeada (np.memmap), junto a un archivo con las llaves (sha1 de 20
+    bytes por fila) y un archivo de metadatos. Cada versión del modelo usa su propia carpeta, de
+    modo que cambiar el modelo invalida el caché.
+
+    Varios procesos pueden compartir el caché (pool de la ingeniería de variables, workers de `score`):
+    las lecturas y escrituras de los archivos se hacen con un bloqueo exclusivo y cada proceso incorpora
+    a su índice las filas que anexaron los demás antes de escribir.
+
+    Métodos:
+        make_key(text): Genera la llave (hash del contenido) de un texto.
+        lock(): Bloqueo exclusivo entre procesos de los archivos del caché.
+        sync(): Incorpora al índice las filas anexadas desde la última lectura.
+        lookup(keys, count): Retorna la fila de cada llave en el caché (-1 si no existe).
+        get(rows): Retorna los vectores de las filas indicadas como float32.
+        add(keys, vectors): Anexa nuevos vectores al caché.
+        stats(): Retorna los contadores de aciertos y fallos del caché.
+    """
+    KEY_SIZE = 20
+
+    def __init__(self, path, version):
+        """
+        Inicializa el EmbeddingCache y carga el índice de llaves existente.
+
+        Parámetros:
+            path (str): Carpeta base del caché.
+            version (str): Versión del modelo; define la subcarpeta usada.
+        """
+        self.path = Path(path) / re.sub(r'[^\w.-]', '_', version)
+        self.version = version
+        self.vectors_path = self.path / 'vectors.f16'
+        self.keys_path = self.path / 'keys.bin'
+        self.meta_path = self.path / 'meta.json'
+        self.lock_path = self.path / 'lock'
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+
+        self.dim = None
+        self.index = {}
+        self.n_rows = 0
+        if self.meta_path.exists():
+            with self.lock():
+                self.sync()
+
+    @staticmethod
+    def make_key(text):
+        """Genera la llave de un texto a partir del hash sha1 de su contenido."""
+        return hashlib.sha1(text.encode('utf-8')).digest()
+
+    @contextmanager
+    def lock(self):
+        """Bloqueo exclusivo entre procesos (archivo `lock` de la carpeta), liberado al salir del bloque."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            yield
+
+    def sync(self):
+        """
+        Incorpora al índice las filas anexadas (por este u otros procesos) desde la última lectura. Se
+        llama con el bloqueo tomado.
+        """
+        if self.dim is None and self.meta_path.exists():
+            self.dim = json.loads(self.meta_path.read_text())['dim']
+        if not (self.dim and self.keys_path.exists() and self.vectors_path.exists()):
+            return
+        # Solo son válidas las filas con vector y llave completos; el resto (una escritura
+        # interrumpida) se descarta para que los dos archivos queden alineados
+        n_rows = min(self.keys_path.stat().st_size // self.KEY_SIZE,
+                     self.vectors_path.stat().st_size // (2 * self.dim))
+        for file_path, row_size in ((self.keys_path, self.KEY_SIZE), (self.vectors_path, 2 * self.dim)):
+            if file_path.stat().st_size != n_rows * row_size:
+                with open(file_path, 'r+b') as file:
+                    file.truncate(n_rows * row_size)
+        if n_rows <= self.n_rows:
+            return
+        with open(self.keys_path, 'rb') as file:
+            file.seek(self.n_rows * self.KEY_SIZE)
+            raw_keys = file.read((n_rows - self.n_rows) * self.KEY_SIZE)
+        for i in range(n_rows - self.n_rows):
+            self.index[raw_keys[i * self.KEY_SIZE:(i + 1) * self.KEY_SIZE]] = self.n_rows + i
+        self.n_rows = n_rows
+
+    def lookup(self, keys, count=True):
+        """
+        Retorna la fila de cada llave en el caché y actualiza los contadores.
+
+        Parámetros:
+            keys (list): Llaves a consultar.
+            count (bool): Si es False, no actualiza los contadores (ej. al releer llaves recién anexadas).
+
+        Retorna:
+            np.ndarray: Fila de cada llave, o -1 si no está en el caché.
+        """
+        rows = np.array([self.index.get(key, -1) for key in keys], dtype=np.int64)
+        if not count:
+            return rows
+        n_hits = int((rows >= 0).sum())
+        self.hits += n_hits
+        self.misses += len(keys) - n_hits
+        return rows
+
+    @property
+    def vectors(self):
+        """Matriz de embeddings en memoria mapeada (solo lectura)."""
+        if self._vectors is None or len(self._vectors) < self.n_rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r',
+                                      shape=(self.n_rows, self.dim))
+        return self._vectors
+
+    def get(self, rows):
+        """Retorna los vectores de las filas indicadas como una matriz float32."""
+        if len(rows) == 0:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+    def add(self, keys, vectors):
+        """
+        Anexa nuevos vectores al caché (primero los vectores y luego las llaves, de modo que una
+        escritura interrumpida no deja llaves sin vector). Con el bloqueo tomado, primero incorpora las
+        filas que anexaron otros procesos y solo escribe las llaves que siguen faltando.
+
+        Parámetros:
+            keys (list): Llaves de los textos.
+            vectors (np.ndarray): Embeddings, una fila por llave.
+        """
+        if all(key in self.index for key in keys):
+            return
+        with self.lock():
+            self.sync()
+            new, seen = [], set()
+            for i, key in enumerate(keys):
+                if key not in self.index and key not in seen:
+                    seen.add(key)
+                    new.append(i)
+            if not new:
+                return
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self.meta_path.write_text(json.dumps({'version': self.version, 'dim': self.dim}))
+
+            with open(self.vectors_path, 'ab') as file:
+                file.write(np.ascontiguousarray(vectors[new], dtype=np.float16).tobytes())
+            with open(self.keys_path, 'ab') as file:
+                file.write(b''.join(keys[i] for i in new))
+
+            for offset, i in enumerate(new):
+                self.index[keys[i]] = self.n_rows + offset
+            self.n_rows += len(new)
+
+    def stats(self):
+        """Retorna los contadores de aciertos, fallos, la tasa de aciertos y el tamaño del caché."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self.index)
+        }
@@ -1,6 +1,13 @@
-from sentence_transformers import SentenceTransformer
-import faiss
+import time
 import warnings
+from importlib.metadata import version, PackageNotFoundError
+import numpy as np
+import pandas as pd
+from config import ConfigEnv
+from src.embedding_cache import EmbeddingCache
+from src.hashing_encoder import HashingSentenceEncoder
+from src.onnx_encoder import OnnxSentenceEncoder
+from src.stage_profiler import PROFILER
 warnings.filterwarnings("ignore")
 
 
@@ -8,32 +15,193 @@ class EmbeddingCategorizer:
     """
     Esta clase maneja la categorización de productos mediante embeddings y búsqueda de similitudes.
     Utiliza SentenceTransformer para generar representaciones vectoriales y FAISS para búsqueda eficiente.
+    El modelo (y las librerías torch, sentence_transformers y faiss) se cargan en el primer uso, y
+    solo si algún texto no está en el caché persistente de embeddings. El backend de inferencia
+    ('torch', 'onnx', el mismo modelo exportado a ONNX y cuantizado a int8, o 'hashing', n-gramas de
+    caracteres sin modelo para entornos sin conexión) se elige por configuración.
 
     Métodos:
         __init__(model_name="paraphrase-multilingual-MiniLM-L12-v2"): Inicializa el modelo de
         embeddings optimizado para español.
+        model: Modelo SentenceTransformer, OnnxSentenceEncoder o HashingSentenceEncoder según el
+        backend (carga diferida).
         generate_embeddings(text_list, batch_size=100): Genera embeddings para una lista de textos.
+        cache: Caché persistente de embeddings del modelo (carga diferida).
+        cache_version(): Versión del caché según el modelo, el backend y la versión de su librería.
+        encode(texts, batch_size=100): Retorna los embeddings de los textos, generando solo los
+        textos únicos que no están en el caché.
         create_faiss_index(embeddings): Crea un índice FAISS para búsqueda eficiente con similitud coseno.
-        categorize_products(df, categorias, batch_size=100): Asigna una categoría a cada
+        iter_length_batches(texts, max_batch_chars, max_batch_size): Agrupa los textos por longitud
+        en lotes de tamaño adaptativo.
+        categorize_stream(texts, categorias, max_batch_chars, max_batch_size): Retorna el índice de
+        la categoría más similar de cada texto, codificando y buscando lote a lote.
+        categorize_products(df, categorias, batch_size=100, streaming): Asigna una categoría a cada
         producto en el DataFrame basado en similitud.
     """
-    def __init__(self, model_name="paraphrase-multilingual-MiniLM-L12-v2"):
-        """Inicializa el EmbeddingCategorizer optimizado para español."""
-        print(f"Cargando el modelo {model_name}...")
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name="paraphrase-multilingual-MiniLM-L12-v2",
+                 use_cache=ConfigEnv.EMBEDDING_CACHE, backend=ConfigEnv.EMBEDDING_BACKEND):
+        """
+        Inicializa el EmbeddingCategorizer optimizado para español, sin cargar aún el modelo.
+
+        Parámetros:
+            model_name (str): Nombre del modelo de SentenceTransformer.
+            use_cache (bool): Si es True, los embeddings se guardan y reutilizan desde el caché en disco.
+            backend (str): 'torch' (SentenceTransformer), 'onnx' (ONNX Runtime int8) o 'hashing'
+            (n-gramas de caracteres, sin modelo ni red).
+        """
+        if backend not in ('torch', 'onnx', 'hashing'):
+            raise ValueError(f"Backend de embeddings no soportado: {backend}")
+        self.model_name = model_name
+        self.use_cache = use_cache
+        self.backend = backend
+        self._model = None
+        self._cache = None
+
+    @property
+    def model(self):
+        """
+        Modelo de embeddings. Con el backend 'onnx' es un OnnxSentenceEncoder (exportado en el primer
+        uso si no existe) y con 'hashing' un HashingSentenceEncoder. Con 'torch', SentenceTransformer se
+        carga primero desde el caché local de Hugging Face, de modo que no se requiere red si el modelo
+        ya fue descargado.
+        """
+        if self._model is None and self.backend == 'onnx':
+            self._model = OnnxSentenceEncoder(self.model_name, path=ConfigEnv.ONNX_MODEL_PATH,
+                                              intra_op_threads=ConfigEnv.ONNX_INTRA_OP_THREADS)
+        if self._model is None and self.backend == 'hashing':
+            self._model = HashingSentenceEncoder()
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"Cargando el modelo {self.model_name}...")
+            start = time.perf_counter()
+            try:
+                self._model = SentenceTransformer(self.model_name, local_files_only=True)
+            except (OSError, ValueError):
+                self._model = SentenceTransformer(self.model_name)
+            print(f"Modelo {self.model_name} cargado en {time.perf_counter() - start:.2f} s")
+        return self._model
 
     def generate_embeddings(self, text_list, batch_size=100):
-        """Genera embeddings para una lista de textos usando SentenceTransformer."""
+        """Genera embeddings para una lista de textos con el modelo del backend configurado."""
         return self.model.encode(text_list, batch_size=batch_size, convert_to_numpy=True)
 
+    def cache_version(self):
+        """Versión del caché de embeddings: nombre del modelo, backend y versión de su librería."""
+        library = {'torch': 'sentence-transformers', 'onnx': 'onnxruntime',
+                   'hashing': 'scikit-learn'}[self.backend]
+        try:
+            library_version = version(library)
+        except PackageNotFoundError:
+            library_version = 'na'
+        if self.backend == 'torch':
+            return f"{self.model_name}-st{library_version}"
+        if self.backend == 'hashing':
+            encoder = HashingSentenceEncoder()
+            low, high = encoder.ngram_range
+            return f"hashing-char{low}-{high}-{encoder.dim}-skl{library_version}"
+        return f"{self.model_name}-onnx-int8-ort{library_version}"
+
+    @property
+    def cache(self):
+        """Caché persistente de embeddings del modelo, creado en el primer uso."""
+        if self._cache is None:
+            self._cache = EmbeddingCache(ConfigEnv.EMBEDDING_CACHE_PATH, self.cache_version())
+        return self._cache
+
+    @PROFILER.track('embedding_encode', rows_in='texts', rows_out=True)
+    def encode(self, texts, batch_size=100):
+        """
+        Retorna los embeddings (float32) de una lista de textos. Los textos repetidos se generan una
+        sola vez y, con el caché activo, solo se generan los que no están en disco; si todos están,
+        el modelo no se carga.
+
+        Parámetros:
+            texts (list): Textos a codificar.
+            batch_size (int): Tamaño del lote para los textos que se deben generar.
+
+        Retorna:
+            np.ndarray: Matriz de embeddings, una fila por texto.
+        """
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object).fillna('').astype(str))
+        uniques = list(uniques)
+        if not self.use_cache:
+            return self.generate_embeddings(uniques, batch_size)[codes]
+
+        keys = [EmbeddingCache.make_key(text) for text in uniques]
+        rows = self.cache.lookup(keys)
+        missing = np.flatnonzero(rows < 0)
+        if len(missing):
+            self.cache.add([keys[i] for i in missing],
+                           self.generate_embeddings([uniques[i] for i in missing], batch_size))
+            rows = self.cache.lookup(keys, count=False)  # la segunda consulta no cuenta en las estadísticas
+        return self.cache.get(rows)[codes]
+
     def create_faiss_index(self, embeddings):
         """Crea un índice FAISS para búsqueda eficiente con similitud coseno."""
+        import faiss
         index = faiss.IndexFlatIP(embeddings.shape[1])  # Índice de producto interno
         faiss.normalize_L2(embeddings)  # Normalizar para similitud coseno
         index.add(embeddings)
         return index
 
-    def categorize_products(self, df, categorias, batch_size=100):
+    def iter_length_batches(self, texts, max_batch_chars=ConfigEnv.EMBEDDING_MAX_BATCH_CHARS,
+                            max_batch_size=ConfigEnv.EMBEDDING_MAX_BATCH_SIZE):
+        """
+        Ordena los textos por longitud (en caracteres, como aproximación al número de tokens) y los
+        agrupa en lotes cuyo tamaño se adapta a la longitud: el número de textos por el texto más
+        largo del lote no supera `max_batch_chars`, de modo que se desperdicia poco relleno.
+
+        Parámetros:
+            texts (list): Textos a agrupar.
+            max_batch_chars (int): Presupuesto de caracteres (con relleno) por lote.
+            max_batch_size (int): Número máximo de textos por lote.
+
+        Retorna:
+            generator: Arreglos con las posiciones de los textos de cada lote.
+        """
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        batch = []
+        for i in order:
+            longest = max(len(texts[i]), 1)  # el orden es creciente: es el más largo del lote
+            if batch and ((len(batch) + 1) * longest > max_batch_chars or len(batch) == max_batch_size):
+                yield np.array(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            yield np.array(batch)
+
+    def categorize_stream(self, texts, categorias, max_batch_chars=ConfigEnv.EMBEDDING_MAX_BATCH_CHARS,
+                          max_batch_size=ConfigEnv.EMBEDDING_MAX_BATCH_SIZE):
+        """
+        Asigna a cada texto la categoría más similar procesando los textos únicos en lotes agrupados
+        por longitud: cada lote se codifica (con el caché, si está activo), se busca en el índice FAISS
+        de categorías y se descarta, de modo que solo se conserva el índice de la categoría por texto
+        y la memoria de embeddings no crece con el tamaño de la entrada.
+
+        Parámetros:
+            texts (list): Textos a categorizar.
+            categorias (list): Lista de categorías predefinidas.
+            max_batch_chars (int): Presupuesto de caracteres (con relleno) por lote.
+            max_batch_size (int): Número máximo de textos por lote.
+
+        Retorna:
+            np.ndarray: Índice (en `categorias`) de la categoría más similar de cada texto.
+        """
+        import faiss
+
+        index = self.create_faiss_index(self.encode(categorias))
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object).fillna('').astype(str))
+        uniques = list(uniques)
+
+        closest = np.empty(len(uniques), dtype=np.int32)
+        for batch in self.iter_length_batches(uniques, max_batch_chars, max_batch_size):
+            embeddings = self.encode([uniques[i] for i in batch], batch_size=len(batch))
+            faiss.normalize_L2(embeddings)
+            closest[batch] = index.search(embeddings, 1)[1][:, 0]
+        return closest[codes]
+
+    @PROFILER.track('categorization', rows_in='df', rows_out=True)
+    def categorize_products(self, df, categorias, batch_size=100, streaming=ConfigEnv.EMBEDDING_STREAMING):
         """
         Genera embeddings de productos, los compara con las categorías y asigna la más similar.
 
@@ -41,18 +209,30 @@ class EmbeddingCategorizer:
             df (pd.DataFrame): DataFrame con los productos a categorizar.
             categorias (list): Lista de categorías predefinidas.
             batch_size (int): Tamaño del lote para procesamiento en batch.
+            streaming (bool): Si es True, usa `categorize_stream` (lotes por longitud y memoria acotada).
 
         Retorna:
             pd.DataFrame: DataFrame original con la categoría predicha añadida.
         """
+        if streaming:
+            print("Categorizando productos por lotes agrupados por longitud...")
+            closest_categories = self.categorize_stream(df["title_clean"].tolist(), categorias)
+            df["categoria_predicha"] = np.asarray(categorias, dtype=object)[closest_categories]
+            if self.use_cache:
+                print("Caché de embeddings:", self.cache.stats())
+            return df
+
+        import faiss
 
         # Obtener embeddings de productos
         print("Generando embeddings de productos...")
-        product_embeddings = self.generate_embeddings(df["title_clean"].tolist(), batch_size)
+        product_embeddings = self.encode(df["title_clean"].tolist(), batch_size)
 
-        # Obtener embeddings de categorías
+        # Obtener embeddings de categorías (reutilizados del caché para la misma versión del modelo)
         print("Generando embeddings de categorías...")
-        category_embeddings = self.generate_embeddings(categorias)
+        category_embeddings = self.encode(categorias)
+        if self.use_cache:
+            print("Caché de embeddings:", self.cache.stats())
 
         # Crear índice FAISS
         print("Creando índice FAISS...")
@@ -1,14 +1,58 @@
-import re
+import contextlib
+import functools
+import io
+import os
+import joblib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 import pandas as pd
+from pathlib import Path
 from rapidfuzz import process, fuzz
 from src.data_preprocessing import DataPreprocessing
 from src.text_normalizer import TextNormalizer
 from src.embedding_categorizer import EmbeddingCategorizer
 from src.api_argentina_connector import APIArgentinaConnector
+from src.keyword_classifier import KeywordClassifier
+from src.gazetteer_index import GazetteerIndex
+from src.missing_value_imputer import MissingValueImputer
+from src.stage_cache import StageCache
+from src.stage_profiler import PROFILER
+from config import ConfigEnv
+from constants.constants import (warranty_keywords, WARRANTY_DEFAULT_CLASS, product_keywords,
+                                 PRODUCT_DEFAULT_CLASS)
 import warnings
 warnings.filterwarnings("ignore")
 
+# Columnas de entrada de las variables de texto y geográficas, calculadas fila a fila
+ROW_FEATURE_INPUTS = ['warranty', 'title', 'seller_address_state.name', 'seller_address_city.name']
+
+# FeatureEngineering de cada proceso del pool de variables por fila, cargado una sola vez por `_init_worker`
+_worker_fe = None
+
+
+def _init_worker(snapshot, profile_command=None):
+    """Inicializador del pool: activa el profiler si está activo en el proceso padre, crea el
+    FeatureEngineering del proceso con el snapshot de municipios del padre (sin leerlo del disco ni
+    actualizarlo) y carga spaCy, el modelo de embeddings y el índice de municipios."""
+    global _worker_fe
+    if profile_command:
+        PROFILER.enable(profile_command)
+    _worker_fe = FeatureEngineering(cache=StageCache(enabled=False), n_workers=1, snapshot=snapshot)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_fe.warm_up()
+
+
+def _row_features_shard(df, categorias):
+    """
+    Calcula las variables de texto y geográficas de un shard de filas, sin mensajes de avance.
+
+    Retorna:
+        tuple: (variables del shard, registros del profiler del proceso desde el shard anterior).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_features = _worker_fe.row_features(df, categorias)
+    return df_features, PROFILER.collect()
+
 
 class FeatureEngineering:
     """
@@ -19,77 +63,87 @@ class FeatureEngineering:
         predefinidas.
 
         classify_product(text, **kwargs): Clasifica el título del producto en 'nuevo', 'usado' u 'otro'.
+        classify_products(texts, **kwargs): Versión por lotes de `classify_product`, con el conteo de
+        palabras clave por clase.
+        match_product_class(text): Clasifica un título ya normalizado.
         find_best_match(city, city_dict, score_cutoff=70): Encuentra la mejor coincidencia de ciudad
         en base a similitud.
 
-        match_cities(df, column, city_dict): Aplica la función de coincidencia sobre un DataFrame.
-        feature_engineering_vars(df_clean, categorias): Realiza la ingeniería de características
+        match_cities(df, column, city_dict, score_cutoff=70, chunk_size=2000): Aplica la coincidencia
+        sobre los valores únicos de una columna, en bloque.
+        feature_engineering_vars(df_clean, categorias, fit): Realiza la ingeniería de características
         en los datos procesados.
+        row_features(df, categorias): Variables de texto y geográficas, independientes entre filas.
+        row_features_parallel(df, categorias): `row_features` repartido por shards de filas en un pool
+        de procesos.
+        row_features_code_version(): Hash del código de las variables de texto y geográficas.
+        snapshot_digest(): Hash de los municipios del snapshot vigente.
+        row_features_version(categorias): Versión de las variables de texto y geográficas (código,
+        palabras clave, modelos y snapshot de municipios) usada como versión del caché por fila.
+        stage_key(source_key, categorias, fit): Llave de la etapa de ingeniería de variables.
+        output_paths(): Archivos que genera la ingeniería de variables de entrenamiento.
+        impute(df, fit): Imputa faltantes ajustando el imputador (entrenamiento) o con el ya ajustado.
+        load_imputer(): Carga el imputador ajustado en entrenamiento.
+        gazetteer_index(): Índice de municipios del snapshot vigente, construido una sola vez por snapshot.
+        warm_up(): Carga de forma concurrente spaCy, el modelo de embeddings y el índice de municipios.
     """
-    def __init__(self):
+    def __init__(self, cache=None, n_workers=ConfigEnv.FE_N_WORKERS, shard_rows=ConfigEnv.FE_SHARD_ROWS,
+                 snapshot=None):
         """
         Initializes the FeatureEngineering instance.
+        Los recursos pesados (spaCy, SentenceTransformer, API) se cargan en el primer uso o en `warm_up`,
+        y solo si alguna fila no está en el caché de etapas.
+
+        Parámetros:
+            cache (StageCache): Caché de etapas (por defecto, el configurado en ConfigEnv).
+            n_workers (int): Procesos del pool de las variables de texto y geográficas (1 las calcula en
+            el proceso actual, 0 usa todos los núcleos).
+            shard_rows (int): Filas por shard del pool.
+            snapshot (dict): Snapshot de municipios ya cargado, usado sin leer el disco ni actualizarlo
+            (procesos del pool); None para el del conector.
         """
-        self.dp = DataPreprocessing()
+        self.PATH_MODELS = Path("./models")
+        self.imputer = None
+        self.cache = cache or StageCache()
+        self.n_workers = n_workers or os.cpu_count()
+        self.shard_rows = shard_rows
+        self.dp = DataPreprocessing(cache=self.cache)
         self.tn = TextNormalizer()
         self.ec = EmbeddingCategorizer()
-        self.aac = APIArgentinaConnector()
+        self.aac = APIArgentinaConnector(snapshot=snapshot)
+        self.warranty_classifier = KeywordClassifier(warranty_keywords, WARRANTY_DEFAULT_CLASS)
+        self.product_classifier = KeywordClassifier(product_keywords, PRODUCT_DEFAULT_CLASS)
+        self._gazetteer = None
+        self._gazetteer_snapshot = None
+        self._snapshot_digest = None
+        self._snapshot_digest_snapshot = None
 
     def classify_warranty(self, text):
-        """Clasifica la descripción de garantía en una de las cinco categorías predefinidas."""
-
-        # Clasificación basada en reglas
-        if re.search(r"\b(sin garantia|no tiene garantia|no ofrecemos|experiencia)\b", text):
-            return "sin garantia"
-
-        elif re.search(
-                    r"\b(reputacion|calificacion|calificaciones|comprador|venta|comentario"
-                    r"|prueba)\b", text):
-            return "garantia basada en reputacion"
-
-        elif re.search(
-                    r"\b(con garantia|defectos de fabricacion|fallo|garantia por defectos"
-                    r"|cubre defectos|si|garantia fabrica)\b", text):
-            return "garantia por defectos"
-
-        elif re.search(r"\b(mes|10 dia|30 dia|90 dia)\b", text):
-            return "garantia media"
-
-        elif re.search(r"\b(12 mes|1 ano|2 ano|3 ano|5 ano|garantia de por vida)\b", text):
-            return "garantia larga"
-
-        # Si no se clasifica en ninguna categoría, asignar "sin garantía"
-        return "sin garantia"
+        """Clasifica la descripción de garantía (normalizada) en una de las cinco categorías predefinidas."""
+        return self.warranty_classifier.classify(text)
 
     def classify_product(self, text, **kwargs):
         """Clasifica el título en 'nuevo', 'usado' u 'otro' basándose en palabras clave."""
 
         # Normalización del texto
         text = self.tn.clean_text(text, **kwargs)
+        return self.match_product_class(text)
 
-        # Clasificación basada en palabras clave
-        if re.search(
-                    r"\b(nuevo|flamante|original|precintado|sellado|estreno|intacto|sin uso|garantia|"
-                    r"oficial|modelo|version|ultima|tecnologia|innovador|moderno|actual|premium|"
-                    r"lanzamiento|digital|automatizado|optimizado|avanzado|mejorado|actualizado|"
-                    r"profesional|full|completo|vanguardia|importado nuevo|exclusivo|primera mano|"
-                    r"perfecto estado|accesorios nuevos|edicion limitada|garantia fabrica|full pack)\b",
-                    text):
-            return "nuevo"
-
-        elif re.search(
-                    r"\b(usado|segunda mano|antiguo|vintage|clasico|restaurado|reacondicionado|"
-                    r"detalles|buen estado|desgastado|fallas|defectos|reparado|signos uso|"
-                    r"funcionamiento correcto|original usado|deterioro|envejecido|descatalogado|"
-                    r"discontinuado|unico dueno|coleccionista|retro|pieza antigua|raro|escaso|"
-                    r"usado funcional|autentico|reparacion|adaptado|repuesto|cambio|segunda vida|"
-                    r"estado conservacion|historico|modelo antiguo|desgaste normal|estructura original|"
-                    r"restaurado profesional|manual funcionamiento|marca antigua|pieza unica)\b",
-                    text):
-            return "usado"
-
-        # Si no se clasifica en ninguna categoría, asignar "otro"
-        return "otro"
+    @PROFILER.track('title_classification', rows_in='texts', rows_out=True)
+    def classify_products(self, texts, **kwargs):
+        """
+        Clasifica por lotes los títulos, normalizándolos con `TextNormalizer.clean_series`.
+
+        Retorna:
+            tuple: (pd.Series con la clase de cada título, pd.DataFrame con las coincidencias por clase
+                    en las columnas `title_kw_<clase>`).
+        """
+        return self.product_classifier.classify_series(self.tn.clean_series(texts, **kwargs),
+                                                       prefix='title_kw')
+
+    def match_product_class(self, text):
+        """Clasifica un título ya normalizado en 'nuevo', 'usado' u 'otro'."""
+        return self.product_classifier.classify(text)
 
     def find_best_match(self, city, city_dict, score_cutoff=70):
         """Encuentra la mejor coincidencia en base a similitud con RapidFuzz."""
@@ -105,27 +159,298 @@ class FeatureEngineering:
 
         return city, 0  # Si no hay coincidencia, devuelve el original con score 0
 
-    def match_cities(self, df, column, city_dict):
-        """Aplica la función de coincidencia sobre un DataFrame."""
-        df[[f"{column}_match", f"{column}_score"]] = df[column].apply(
-            lambda x: pd.Series(self.find_best_match(x, city_dict))
-        )
+    @PROFILER.track('state_matching', rows_in='df', rows_out=True)
+    def match_cities(self, df, column, city_dict, score_cutoff=70, chunk_size=2000):
+        """
+        Aplica la coincidencia de `find_best_match` sobre una columna completa, con el mismo resultado.
+        Cada valor único se resuelve una sola vez: primero por búsqueda exacta en el diccionario y el
+        resto con `process.cdist` en bloques de `chunk_size` valores, usando todos los núcleos.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame con la columna a comparar.
+            column (str): Columna con los nombres normalizados.
+            city_dict (dict): Nombre normalizado -> nombre oficial.
+            score_cutoff (int): Puntaje mínimo de similitud para aceptar una coincidencia.
+            chunk_size (int): Número de valores únicos comparados por bloque.
+
+        Retorna:
+            pd.DataFrame: DataFrame con las columnas `<column>_match` y `<column>_score`.
+        """
+        codes, uniques = pd.factorize(df[column])
+        choices = list(city_dict)
+
+        # La posición extra recibe los nulos (código -1 de factorize)
+        matches = np.empty(len(uniques) + 1, dtype=object)
+        scores = np.zeros(len(uniques) + 1)
+        pending = []
+        for i, city in enumerate(uniques):
+            if not city:
+                matches[i] = None
+            elif city in city_dict:
+                matches[i], scores[i] = city_dict[city], 100.0
+            else:
+                pending.append(i)
+
+        for start in range(0, len(pending) if choices else 0, chunk_size):
+            chunk = pending[start:start + chunk_size]
+            similarity = process.cdist([uniques[i] for i in chunk], choices, scorer=fuzz.ratio,
+                                       score_cutoff=score_cutoff, dtype=np.float64, workers=-1)
+            best = similarity.argmax(axis=1)  # ante empates, la primera opción (igual que extractOne)
+            best_scores = similarity[np.arange(len(chunk)), best]
+            for i, choice_idx, score in zip(chunk, best, best_scores):
+                if score >= score_cutoff:
+                    matches[i], scores[i] = city_dict[choices[choice_idx]], score
+
+        # Sin coincidencia: se conserva el valor original con puntaje 0
+        for i in pending:
+            if matches[i] is None:
+                matches[i] = uniques[i]
+
+        df[f"{column}_match"] = matches[codes]
+        df[f"{column}_score"] = scores[codes]
         return df
 
-    def feature_engineering_vars(self, df_clean: pd.DataFrame,  categorias):
+    def gazetteer_index(self):
+        """
+        Retorna el índice de municipios por provincia del snapshot vigente. Se construye una sola vez y
+        se reconstruye solo si el conector reemplazó el snapshot (actualización en segundo plano), de modo
+        que las llamadas sucesivas a `feature_engineering_vars` (ej. el servidor de predicción) lo reutilizan.
+
+        Retorna:
+            GazetteerIndex: Índice de municipios; sus diccionarios guardan el original con tildes.
+        """
+        snapshot = self.aac.snapshot()
+        if self._gazetteer is None or self._gazetteer_snapshot is not snapshot:
+            self._gazetteer = GazetteerIndex(pd.DataFrame(snapshot['municipios']), self.tn.normalize_text)
+            self._gazetteer_snapshot = snapshot
+        return self._gazetteer
+
+    @PROFILER.track('warm_up')
+    def warm_up(self):
+        """
+        Carga de forma concurrente los recursos independientes que usa `feature_engineering_vars`:
+        el modelo de spaCy y las stopwords, el modelo de embeddings (solo sin caché de embeddings,
+        pues con caché se carga únicamente si hay títulos nuevos) y el índice de municipios.
+
+        Retorna:
+            GazetteerIndex: Índice de municipios del snapshot vigente (`gazetteer_index`).
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            text_resources = executor.submit(lambda: (self.tn.nlp, self.tn.stop_words))
+            embedding_model = None if self.ec.use_cache else executor.submit(lambda: self.ec.model)
+            gazetteer = executor.submit(self.gazetteer_index)
+            text_resources.result()
+            if embedding_model is not None:
+                embedding_model.result()
+            return gazetteer.result()
+
+    def load_imputer(self):
+        """Carga desde `models/` el imputador de las variables creadas ajustado en entrenamiento."""
+        self.imputer = joblib.load(self.PATH_MODELS / 'imputer_feature_engineering.pkl')
+
+    @PROFILER.track('feature_imputation', rows_in='df', rows_out=True)
+    def impute(self, df, fit=True):
+        """
+        Imputa los valores faltantes de las variables creadas. Con `fit=True` ajusta el imputador y lo
+        guarda en `models/imputer_feature_engineering.pkl`; con `fit=False` aplica el ya ajustado.
+        """
+        path = self.PATH_MODELS / 'imputer_feature_engineering.pkl'
+        if fit:
+            df_imputed = self.dp.impute_missing_values(df, categorical_strategy='mode',
+                                                       numerical_strategy='median')
+            self.imputer = self.dp.imputer
+            self.PATH_MODELS.mkdir(parents=True, exist_ok=True)
+            joblib.dump(self.imputer, path)
+            return df_imputed
+
+        if self.imputer is None:
+            self.load_imputer()
+        return self.imputer.transform(df)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def row_features_code_version():
+        """Hash del código y las constantes de las variables de texto y geográficas (una vez por proceso)."""
+        return StageCache.code_version(
+            FeatureEngineering.row_features, FeatureEngineering.classify_products,
+            FeatureEngineering.match_product_class, FeatureEngineering.match_cities, TextNormalizer,
+            KeywordClassifier, GazetteerIndex, EmbeddingCategorizer, warranty_keywords, product_keywords,
+            WARRANTY_DEFAULT_CLASS, PRODUCT_DEFAULT_CLASS)
+
+    def snapshot_digest(self):
+        """Hash de los municipios del snapshot vigente, recalculado solo si el conector lo reemplazó."""
+        snapshot = self.aac.snapshot()
+        if self._snapshot_digest is None or self._snapshot_digest_snapshot is not snapshot:
+            self._snapshot_digest = StageCache.digest(snapshot['municipios'])
+            self._snapshot_digest_snapshot = snapshot
+        return self._snapshot_digest
+
+    def row_features_version(self, categorias):
+        """
+        Versión de las variables de texto y geográficas: código que las calcula, palabras clave,
+        categorías, modelo de spaCy y stopwords, modelo de embeddings y snapshot de municipios.
+        """
+        return StageCache.digest(
+            self.row_features_code_version(), categorias, self.tn.cache_version(), self.ec.cache_version(),
+            ConfigEnv.EMBEDDING_STREAMING, self.snapshot_digest())
+
+    def stage_key(self, source_key, categorias, fit=True):
+        """
+        Llave de la etapa `feaure_engineering_products`: llave de `df_processed`, versión de las
+        variables de texto y geográficas y código de las demás variables y de la imputación.
+
+        Retorna:
+            str: Llave de la etapa, o None si `df_processed` no tiene llave.
+        """
+        if source_key is None:
+            return None
+        return StageCache.digest('df_feature_engineering', source_key, fit,
+                                 self.row_features_version(categorias),
+                                 StageCache.code_version(FeatureEngineering, MissingValueImputer))
+
+    def output_paths(self):
+        """Archivos que genera la ingeniería de variables de entrenamiento además del artefacto."""
+        return [self.PATH_MODELS / 'imputer_feature_engineering.pkl']
+
+    def row_features(self, df, categorias):
+        """
+        Calcula las variables de texto y geográficas, que dependen solo de la garantía, el título, la
+        provincia y la ciudad de cada fila: limpieza y clase de la garantía, limpieza y clase del título,
+        categoría predicha y coincidencia de provincia y ciudad. Como cada fila se calcula de forma
+        independiente, `feature_engineering_vars` las guarda por fila en el caché de etapas.
+
+        Parámetros:
+            df (pd.DataFrame): Filas con las columnas de `ROW_FEATURE_INPUTS`.
+            categorias (list): Lista de categorías predefinidas.
+
+        Retorna:
+            pd.DataFrame: Variables creadas, una fila por fila de `df` y en el mismo orden.
+        """
+        print("Cargando modelos y tabla de municipios...")
+        gazetteer = self.warm_up()
 
         print("Clasificando garantía...")
-        df_clean = df_clean.reset_index()
+        df_clean = df[ROW_FEATURE_INPUTS].reset_index(drop=True).reset_index()
         keep_words = ['sin', 'con']
         df_temp = df_clean[df_clean['warranty'].notnull()]  # Solo procesar la informacion con data
-        df_temp['warranty_clean'] = df_temp['warranty'].astype(str).apply(
-            lambda text: self.tn.clean_text(text, remove_sw=True, lemmatize=True,
-                                            stem=False, use_regex=True, keep_words=keep_words))
+        with PROFILER.stage('warranty_cleaning', rows_in=len(df_temp)):
+            df_temp['warranty_clean'] = self.tn.clean_series(df_temp['warranty'].astype(str),
+                                                             remove_sw=True, lemmatize=True, stem=False,
+                                                             use_regex=True, keep_words=keep_words)
+
+        # Clasificar toda la serie en una pasada; las coincidencias por clase quedan como variables
+        with PROFILER.stage('warranty_classification', rows_in=len(df_temp)):
+            df_temp["warranty_class"], warranty_hits = self.warranty_classifier.classify_series(
+                df_temp["warranty_clean"], prefix='warranty_kw')
+        df_temp = df_temp.join(warranty_hits)
 
-        # Aplicar la función al dataset
-        df_temp["warranty_class"] = df_temp["warranty_clean"].map(self.classify_warranty)
+        df_clean = df_clean.merge(df_temp[['index', 'warranty_class', *warranty_hits.columns]],
+                                  on='index', how='left')
+        df_clean[warranty_hits.columns] = df_clean[warranty_hits.columns].fillna(0).astype(int)
+
+        print("Limpieza de titulos de productos ...")
 
-        df_clean = df_clean.merge(df_temp[['index', 'warranty_class']], on='index', how='left')
+        df_temp = df_clean[df_clean['title'].notnull()]  # Solo procesar la informacion con data
+
+        with PROFILER.stage('title_cleaning', rows_in=len(df_temp)):
+            df_temp['title_clean'] = self.tn.clean_series(df_temp['title'].astype(str), remove_sw=False,
+                                                          lemmatize=False, stem=False, use_regex=True)
+
+        # Clasificar a partir de `title_clean`: la limpieza con regex ya está hecha (y es idempotente),
+        # solo falta quitar stopwords y lematizar
+        print("Clasificando títulos de productos...")
+        df_temp["title_class"], title_hits = self.classify_products(df_temp["title_clean"], remove_sw=True,
+                                                                    lemmatize=True, stem=False,
+                                                                    use_regex=False)
+        df_temp = df_temp.join(title_hits)
+
+        df_clean = df_clean.merge(df_temp[['index', 'title_class', 'title_clean', *title_hits.columns]],
+                                  on='index', how='left')
+        df_clean[title_hits.columns] = df_clean[title_hits.columns].fillna(0).astype(int)
+
+        # Categorizar productos
+        print("Categorizando productos...")
+        df_categorizado = self.ec.categorize_products(df_clean, categorias)
+
+        print("Match provincias y ciudades...")
+
+        # match provincias ar -----
+        df_categorizado['seller_address_state.name_clean'] = self.tn.clean_series(
+            df_categorizado['seller_address_state.name'].fillna('').astype(str), remove_sw=False,
+            lemmatize=False, stem=False, use_regex=True)
+
+        # Índice de municipios por provincia (de `warm_up`); los diccionarios guardan el original con tildes
+        df_categorizado = self.match_cities(df_categorizado, "seller_address_state.name_clean",
+                                            gazetteer.states)
+
+        # match ciudades ar -----
+        df_categorizado['seller_address_city.name_clean'] = self.tn.clean_series(
+            df_categorizado['seller_address_city.name'].fillna('').astype(str), remove_sw=False,
+            lemmatize=False, stem=False, use_regex=True)
+
+        # Solo se comparan los municipios de la provincia resuelta (nacional si no se resolvió)
+        city_column = "seller_address_city.name_clean"
+        with PROFILER.stage('city_matching', rows_in=len(df_categorizado)):
+            df_categorizado[f"{city_column}_match"], df_categorizado[f"{city_column}_score"] = \
+                gazetteer.match_series(df_categorizado[city_column],
+                                       df_categorizado["seller_address_state.name_clean_match"])
+
+        print("Caché de normalización de texto:", self.tn.cache_stats())
+        return df_categorizado.drop(columns=['index', *ROW_FEATURE_INPUTS])
+
+    def row_features_parallel(self, df, categorias):
+        """
+        Calcula `row_features` repartiendo las filas en shards de `shard_rows` filas entre un pool de
+        `n_workers` procesos. Cada proceso carga spaCy, el modelo de embeddings y el índice de municipios
+        una sola vez (inicializador del pool); el índice se construye con el snapshot de este proceso, de
+        modo que todos usan los mismos municipios que la versión del caché por fila y solo este proceso lo
+        actualiza. Los shards se reensamblan en el orden original, de modo que el resultado es el mismo
+        que el de `row_features`. Con un proceso, o si las filas caben en un shard, se calcula en el
+        proceso actual. Si el profiler está activo, las etapas medidas en cada proceso se agregan a las
+        del proceso actual.
+
+        Parámetros:
+            df (pd.DataFrame): Filas con las columnas de `ROW_FEATURE_INPUTS`.
+            categorias (list): Lista de categorías predefinidas.
+
+        Retorna:
+            pd.DataFrame: Variables creadas, una fila por fila de `df` y en el mismo orden.
+        """
+        shards = [df[ROW_FEATURE_INPUTS].iloc[start:start + self.shard_rows]
+                  for start in range(0, len(df), self.shard_rows)]
+        n_workers = min(self.n_workers, len(shards))
+        with PROFILER.stage('row_features', rows_in=len(df)) as record:
+            if n_workers <= 1:
+                df_features = self.row_features(df, categorias)
+            else:
+                print(f"Variables de texto y geográficas: {len(df):,} filas en {len(shards)} shards de hasta "
+                      f"{self.shard_rows:,} filas ({n_workers} procesos) ...")
+                parts, profile_command = [], PROFILER.command if PROFILER.enabled else None
+                with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                         initargs=(self.aac.snapshot(), profile_command)) as executor:
+                    for part, records in executor.map(_row_features_shard, shards,
+                                                      [categorias] * len(shards)):
+                        parts.append(part)
+                        PROFILER.merge(records)
+                df_features = pd.concat(parts, ignore_index=True)
+            record['rows_out'] = len(df_features)
+        return df_features
+
+    def feature_engineering_vars(self, df_clean: pd.DataFrame,  categorias, fit=True):
+
+        # Variables de texto y geográficas: solo se calculan las filas que no están en el caché de etapas
+        df_clean = df_clean.reset_index()
+        df_row_features = self.cache.apply('row_features', lambda: self.row_features_version(categorias),
+                                           StageCache.frame_keys(df_clean, ROW_FEATURE_INPUTS),
+                                           lambda rows: self.row_features_parallel(df_clean.iloc[rows],
+                                                                                   categorias))
+        # Parquet lee los faltantes de texto como None; se restauran como NaN, igual que al calcularlos
+        text_columns = df_row_features.columns[df_row_features.dtypes == object]
+        df_row_features[text_columns] = df_row_features[text_columns].where(
+            df_row_features[text_columns].notnull(), np.nan)
+        if self.cache.enabled:
+            print("Caché de la etapa de variables de texto y geográficas:", self.cache.stats('row_features'))
+        df_clean = pd.concat([df_clean, df_row_features], axis=1)
         df_clean['have_warranty'] = np.where(df_clean['warranty_class'].isin([np.nan, 'sin garantia']), 0, 1)
 
         # ----
@@ -146,12 +471,7 @@ class FeatureEngineering:
         df_clean['diff_price'] = df_clean['price'] - df_clean['base_price']
 
         # ----
-        df_clean['date_created'] = pd.to_datetime(df_clean['date_created'], utc=True, errors='coerce')
-        df_clean['last_updated'] = pd.to_datetime(df_clean['last_updated'], utc=True, errors='coerce')
-
-        df_clean['start_time'] = pd.to_datetime(df_clean['start_time'], utc=True, errors='coerce')
-        df_clean['stop_time'] = pd.to_datetime(df_clean['stop_time'], utc=True, errors='coerce')
-
+        # Las fechas llegan tipadas (datetime64 UTC) desde DataPreprocessing / ArtifactStore
         df_clean['time_to_start'] = (df_clean['start_time'] - df_clean['date_created'])\
             .dt.total_seconds() / 86400  # Días
 
@@ -161,56 +481,9 @@ class FeatureEngineering:
         df_clean['time_since_last_update'] = (df_clean['last_updated'] - df_clean['date_created']) \
             .dt.total_seconds() / 86400  # Dias
 
-        # --
-        print("Limpieza de titulos de productos ...")
-
-        df_temp = df_clean[df_clean['title'].notnull()]  # Solo procesar la informacion con data
-
-        df_temp['title_clean'] = df_temp['title'].astype(str).apply(
-            lambda text: self.tn.clean_text(text, remove_sw=False, lemmatize=False,
-                                            stem=False, use_regex=True))
-
-        # Aplicar la función a los títulos limpios
-        print("Clasificando títulos de productos...")
-        df_temp["title_class"] = df_temp["title"].apply(
-            lambda text: self.classify_product(text, remove_sw=True, lemmatize=True,
-                                               stem=False, use_regex=True)
-        )
-
-        df_clean = df_clean.merge(df_temp[['index', 'title_class', 'title_clean']], on='index', how='left')
         df_clean['len_title'] = df_clean['title'].str.len()
 
-        # Categorizar productos
-        print("Categorizando productos...")
-        df_categorizado = self.ec.categorize_products(df_clean, categorias)
-
-        print("Conexión API gov Argentina...")
-        ciudades_ar = self.aac.api_gob_ar()
-        print("ciudades_ar loaded")
-
-        print("Match provincias y ciudades...")
-
-        # match provincias ar -----
-        df_categorizado['seller_address_state.name_clean'] = df_categorizado[
-            'seller_address_state.name'].fillna('').apply(lambda text: self.tn.clean_text(
-                text, remove_sw=False, lemmatize=False, stem=False, use_regex=True))
-
-        # Guarda el original con tildes
-        state_dict = {self.tn.normalize_text(c): c for c in ciudades_ar["provincia_name"]}
-        df_categorizado = self.match_cities(df_categorizado, "seller_address_state.name_clean", state_dict)
-
-        # match ciudades ar -----
-        df_categorizado['seller_address_city.name_clean'] = df_categorizado[
-            'seller_address_city.name'].fillna('').apply(lambda text: self.tn.clean_text(
-                text, remove_sw=False, lemmatize=False, stem=False, use_regex=True))
-
-        # Guarda el original con tildes
-        ciudad_dict = {self.tn.normalize_text(c): c for c in ciudades_ar["nombre"]}
-        df_categorizado = self.match_cities(df_categorizado, "seller_address_city.name_clean", ciudad_dict)
-
         print("imputar datos faltantes ..")
-        df_categorizado = self.dp.impute_missing_values(df_categorizado,
-                                                        categorical_strategy='mode',
-                                                        numerical_strategy='median')
+        df_clean = self.impute(df_clean, fit=fit)
 
-        return df_categorizado.reset_index()
+        return df_clean.reset_index()
@@ -0,0 +1,216 @@
+import joblib
+import numpy as np
+import pandas as pd
+from constants.constants import conversion_dict
+
+
+class FeaturePipeline:
+    """
+    Esta clase reúne en un único artefacto ajustado la transformación de variables del modelo: la
+    conversión de tipos de `conversion_dict` (enteros truncados y texto como str), el escalado MinMax
+    de las numéricas, el one-hot de las categóricas y la codificación de las variables de alta
+    cardinalidad (antes `label_encoders.pkl`).
+    En inferencia solo transforma: las categorías se codifican con búsquedas vectorizadas en tablas
+    hash (pd.Index.get_indexer), los valores desconocidos van a un bucket explícito (fila de ceros en
+    el one-hot, código `len(clases)` en las etiquetas) y la salida es un arreglo float32, sin
+    recorrer filas en Python.
+
+    Métodos:
+        from_artifacts(preprocessor, label_encoders): Construye el pipeline a partir del ColumnTransformer
+        y los LabelEncoder ya ajustados.
+        cast(df): Aplica la conversión de tipos a las columnas del pipeline.
+        fit(df): Ajusta el escalado, las categorías y las etiquetas a partir de los datos.
+        transform(df): Retorna la matriz float32 del modelo (numéricas escaladas y one-hot).
+        transform_labels(df): Retorna los códigos int32 de las variables de alta cardinalidad.
+        native_mask(max_categories): Máscara de las columnas categóricas de `transform_native`.
+        transform_native(df, max_categories): Retorna la matriz para modelos con categóricas nativas.
+        save(path) / load(path): Guarda y carga el artefacto con joblib.
+    """
+    def __init__(self, numeric_columns, categorical_columns, label_columns=(), conversion=conversion_dict):
+        """
+        Inicializa el FeaturePipeline (sin ajustar).
+
+        Parámetros:
+            numeric_columns (list): Variables numéricas escaladas con MinMax.
+            categorical_columns (list): Variables categóricas codificadas con one-hot.
+            label_columns (list): Variables de alta cardinalidad codificadas como enteros.
+            conversion (dict): Columna -> tipo esperado; se guarda solo para las columnas usadas.
+        """
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.label_columns = list(label_columns)
+        used = self.numeric_columns + self.categorical_columns + self.label_columns
+        self.conversion = {col: conversion[col] for col in used if col in conversion}
+
+    def cast(self, df):
+        """
+        Aplica la conversión de tipos de `conversion` a las columnas del pipeline: las enteras se truncan
+        (como `astype(int)`, conservando los faltantes) y las de texto se convierten a str. Las flotantes
+        y las categóricas no requieren conversión, ya que se leen como float64 y objetos.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame con las columnas del pipeline.
+
+        Retorna:
+            pd.DataFrame: Columnas del pipeline con los tipos convertidos.
+        """
+        casts = {}
+        for col, dtype in self.conversion.items():
+            if dtype == 'int' and not pd.api.types.is_integer_dtype(df[col].dtype):
+                casts[col] = np.trunc(df[col].to_numpy(dtype=np.float64))
+            elif dtype == 'str':
+                casts[col] = df[col].astype(str)
+        used = self.numeric_columns + self.categorical_columns + self.label_columns
+        return df[used].assign(**casts)
+
+    @classmethod
+    def from_artifacts(cls, preprocessor, label_encoders):
+        """
+        Construye el pipeline a partir de `preprocessor.pkl` (MinMaxScaler 'num' y OneHotEncoder 'cat')
+        y de `label_encoders.pkl`, con los mismos parámetros ajustados.
+
+        Parámetros:
+            preprocessor (ColumnTransformer): Preprocesador ajustado.
+            label_encoders (dict): Columna -> LabelEncoder ajustado.
+
+        Retorna:
+            FeaturePipeline: Pipeline ajustado equivalente.
+        """
+        transformers = {name: (transformer, list(columns))
+                        for name, transformer, columns in preprocessor.transformers_ if name != 'remainder'}
+        scaler, numeric_columns = transformers['num']
+        encoder, categorical_columns = transformers['cat']
+
+        pipeline = cls(numeric_columns, categorical_columns, label_encoders.keys())
+        pipeline.scale_ = scaler.scale_.astype(np.float64)
+        pipeline.min_ = scaler.min_.astype(np.float64)
+        pipeline.categories_ = [pd.Index(categories) for categories in encoder.categories_]
+        pipeline.label_classes_ = {col: pd.Index(encoder.classes_) for col, encoder in label_encoders.items()}
+        return pipeline
+
+    def fit(self, df):
+        """
+        Ajusta el escalado MinMax (rango [0, 1]), las categorías del one-hot y las clases de las
+        etiquetas a partir de un DataFrame de entrenamiento.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame de entrenamiento.
+
+        Retorna:
+            FeaturePipeline: La instancia ajustada.
+        """
+        df = self.cast(df)
+        numeric = df[self.numeric_columns].to_numpy(dtype=np.float64)
+        data_min, data_max = np.nanmin(numeric, axis=0), np.nanmax(numeric, axis=0)
+        data_range = data_max - data_min
+        self.scale_ = 1.0 / np.where(data_range == 0, 1.0, data_range)
+        self.min_ = -data_min * self.scale_
+        self.categories_ = [pd.Index(np.sort(df[col].dropna().astype(str).unique()))
+                            for col in self.categorical_columns]
+        self.label_classes_ = {col: pd.Index(np.sort(df[col].astype(str).unique()))
+                               for col in self.label_columns}
+        return self
+
+    @property
+    def feature_names(self):
+        """Nombres de las columnas de `transform`, con el formato de `get_feature_names_out`."""
+        names = [f"num__{col}" for col in self.numeric_columns]
+        for col, categories in zip(self.categorical_columns, self.categories_):
+            names += [f"cat__{col}_{category}" for category in categories]
+        return np.array(names, dtype=object)
+
+    def transform(self, df):
+        """
+        Transforma un DataFrame en la matriz del modelo: numéricas escaladas (calculadas en float64) y
+        one-hot de las categóricas, con una fila de ceros para categorías desconocidas o nulas.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame con las columnas del pipeline.
+
+        Retorna:
+            np.ndarray: Matriz float32 de forma (filas, len(feature_names)).
+        """
+        df = self.cast(df)
+        n_rows, n_numeric = len(df), len(self.numeric_columns)
+        n_features = n_numeric + sum(len(categories) for categories in self.categories_)
+        X = np.zeros((n_rows, n_features), dtype=np.float32)
+        X[:, :n_numeric] = df[self.numeric_columns].to_numpy(dtype=np.float64) * self.scale_ + self.min_
+
+        offset, rows = n_numeric, np.arange(n_rows)
+        for col, categories in zip(self.categorical_columns, self.categories_):
+            codes = categories.get_indexer(np.asarray(df[col], dtype=object))
+            known = codes >= 0
+            X[rows[known], offset + codes[known]] = 1.0
+            offset += len(categories)
+        return X
+
+    def transform_labels(self, df):
+        """
+        Codifica las variables de alta cardinalidad como enteros según las clases ajustadas; los
+        valores desconocidos reciben el código `len(clases)`.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame con las columnas de etiquetas.
+
+        Retorna:
+            np.ndarray: Matriz int32 de forma (filas, len(label_columns)).
+        """
+        df = self.cast(df)
+        codes = np.empty((len(df), len(self.label_columns)), dtype=np.int32)
+        for j, col in enumerate(self.label_columns):
+            classes = self.label_classes_[col]
+            col_codes = classes.get_indexer(df[col].astype(str).to_numpy(dtype=object))
+            codes[:, j] = np.where(col_codes >= 0, col_codes, len(classes))
+        return codes
+
+    def native_columns(self, max_categories=255):
+        """
+        Columnas categóricas de `transform_native`: las del one-hot y las de etiquetas con a lo sumo
+        `max_categories` clases (límite de bins de HistGradientBoosting).
+        """
+        categorical = list(self.categorical_columns)
+        categorical += [col for col in self.label_columns if len(self.label_classes_[col]) <= max_categories]
+        return categorical
+
+    def native_mask(self, max_categories=255):
+        """Máscara booleana de las columnas categóricas de `transform_native` (después de las numéricas)."""
+        n_numeric = len(self.numeric_columns)
+        return np.arange(n_numeric + len(self.native_columns(max_categories))) >= n_numeric
+
+    def transform_native(self, df, max_categories=255):
+        """
+        Transforma un DataFrame para modelos con soporte nativo de categóricas: numéricas sin escalar y
+        cada categórica como su código entero (sin one-hot ni LabelEncoder aparte); las categorías
+        desconocidas o nulas quedan como NaN (faltante). Las variables de etiquetas con más de
+        `max_categories` clases se excluyen.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame con las columnas del pipeline.
+            max_categories (int): Máximo de clases de una categórica nativa.
+
+        Retorna:
+            tuple: (X float32, máscara booleana de categóricas, nombres de las columnas).
+        """
+        df = self.cast(df)
+        categorical = self.native_columns(max_categories)
+        categories = dict(zip(self.categorical_columns, self.categories_))
+        categories.update(self.label_classes_)
+
+        X = np.empty((len(df), len(self.numeric_columns) + len(categorical)), dtype=np.float32)
+        X[:, :len(self.numeric_columns)] = df[self.numeric_columns].to_numpy(dtype=np.float64)
+        for j, col in enumerate(categorical, start=len(self.numeric_columns)):
+            values = df[col] if col in self.categorical_columns else df[col].astype(str)
+            codes = categories[col].get_indexer(np.asarray(values, dtype=object))
+            X[:, j] = np.where(codes >= 0, codes, np.nan)
+
+        names = np.array(self.numeric_columns + categorical, dtype=object)
+        return X, self.native_mask(max_categories), names
+
+    def save(self, path):
+        """Guarda el pipeline ajustado con joblib."""
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        """Carga un pipeline ajustado guardado con `save`."""
+        return joblib.load(path)
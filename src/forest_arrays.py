@@ -0,0 +1,175 @@
+import json
+import numpy as np
+from pathlib import Path
+
+
+class ForestArrays:
+    """
+    Esta clase guarda un bosque de árboles de decisión ajustado (RandomForestClassifier) como arreglos
+    planos y contiguos de nodos: variable, umbral float32, hijos izquierdo/derecho y probabilidades de
+    las hojas. Los arreglos se guardan como `.npy` y se cargan con memory mapping en milisegundos, sin
+    deserializar objetos; varios procesos que cargan la misma carpeta comparten las páginas de solo
+    lectura del sistema operativo.
+
+    Los umbrales se redondean hacia abajo a float32, de modo que `x <= umbral` da el mismo resultado que
+    en scikit-learn para entradas float32 (la matriz del FeaturePipeline). Las hojas apuntan a sí mismas,
+    por lo que la predicción recorre todos los árboles y filas a la vez, nivel por nivel, con NumPy.
+
+    Métodos:
+        from_sklearn(forest): Convierte un bosque ajustado de scikit-learn.
+        save(path): Guarda los arreglos y los metadatos en una carpeta.
+        load(path, mmap_mode): Carga una carpeta guardada con `save`.
+        apply(X): Retorna el nodo hoja alcanzado en cada árbol para cada fila.
+        predict_proba(X, chunk_size): Probabilidades por clase (promedio de los árboles).
+        predict(X): Clase predicha.
+    """
+    FORMAT_VERSION = 1
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, n_features, max_depth):
+        """
+        Inicializa el ForestArrays a partir de los arreglos de nodos.
+
+        Parámetros:
+            feature (np.ndarray): Variable evaluada en cada nodo (int32, 0 en las hojas).
+            threshold (np.ndarray): Umbral de cada nodo (float32, +inf en las hojas).
+            left, right (np.ndarray): Índice global de los hijos (int32; las hojas apuntan a sí mismas).
+            value (np.ndarray): Probabilidades por clase de cada nodo (float32, filas x clases).
+            roots (np.ndarray): Índice global de la raíz de cada árbol (int32).
+            classes (np.ndarray): Clases del modelo, en el orden de `value`.
+            n_features (int): Número de variables de entrada.
+            max_depth (int): Profundidad máxima de los árboles.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """
+        Convierte un bosque ajustado de scikit-learn en arreglos planos de nodos.
+
+        Parámetros:
+            forest: RandomForestClassifier (o ExtraTreesClassifier) ajustado.
+
+        Retorna:
+            ForestArrays: Bosque equivalente.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+
+            threshold = tree.threshold.astype(np.float32)
+            # Redondeo hacia abajo: para x float32, x <= t32 equivale a x <= t64
+            rounded_up = threshold.astype(np.float64) > tree.threshold
+            threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+            threshold[leaf] = np.inf
+
+            proba = tree.value[:, 0, :]
+            proba = proba / proba.sum(axis=1, keepdims=True)
+
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(threshold)
+            lefts.append((np.where(leaf, nodes, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(leaf, nodes, tree.children_right) + offset).astype(np.int32))
+            values.append(proba.astype(np.float32))
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+                   np.concatenate(rights), np.concatenate(values), np.array(roots, dtype=np.int32),
+                   forest.classes_, forest.n_features_in_,
+                   max(estimator.tree_.max_depth for estimator in forest.estimators_))
+
+    def save(self, path):
+        """
+        Guarda cada arreglo como `.npy` contiguo y los metadatos en `meta.json` dentro de la carpeta.
+
+        Parámetros:
+            path (str | Path): Carpeta de destino.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            'format_version': self.FORMAT_VERSION,
+            'classes': self.classes_.tolist(),
+            'n_features': int(self.n_features_in_),
+            'max_depth': int(self.max_depth),
+            'n_trees': int(len(self.roots)),
+            'n_nodes': int(len(self.feature)),
+        }
+        with open(path / 'meta.json', 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Carga un bosque guardado con `save`; por defecto los arreglos se mapean en memoria de solo lectura.
+
+        Parámetros:
+            path (str | Path): Carpeta del bosque.
+            mmap_mode (str): Modo de `np.load` ('r' para memory mapping, None para leer a memoria).
+
+        Retorna:
+            ForestArrays: Bosque cargado.
+        """
+        path = Path(path)
+        with open(path / 'meta.json', 'r') as f:
+            meta = json.load(f)
+        if meta['format_version'] != cls.FORMAT_VERSION:
+            raise ValueError(f"Versión de formato no soportada en {path}: {meta['format_version']}")
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in cls.ARRAYS}
+        return cls(**arrays, classes=meta['classes'], n_features=meta['n_features'],
+                   max_depth=meta['max_depth'])
+
+    def apply(self, X):
+        """
+        Recorre todos los árboles a la vez: en cada nivel, cada par (fila, árbol) avanza al hijo izquierdo
+        si `x[variable] <= umbral` y al derecho en otro caso; las hojas se quedan en su lugar.
+
+        Parámetros:
+            X (np.ndarray): Matriz de entrada (filas x variables).
+
+        Retorna:
+            np.ndarray: Nodo hoja (índice global) de forma (filas, árboles).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X, chunk_size=10000):
+        """
+        Probabilidades por clase, promedio de las probabilidades de las hojas de cada árbol (igual que
+        `RandomForestClassifier.predict_proba`). Se procesa por bloques para acotar la memoria.
+
+        Parámetros:
+            X (np.ndarray): Matriz de entrada (filas x variables).
+            chunk_size (int): Filas por bloque.
+
+        Retorna:
+            np.ndarray: Probabilidades float64 de forma (filas, clases).
+        """
+        proba = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            proba[start:start + chunk_size] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return proba
+
+    def predict(self, X):
+        """Clase de mayor probabilidad para cada fila."""
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
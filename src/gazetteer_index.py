@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+from src.text_normalizer import TextNormalizer
+
+
+class GazetteerIndex:
+    """
+    Esta clase indexa la tabla de municipios de Argentina (`APIArgentinaConnector.api_gob_ar`) para
+    acotar la búsqueda difusa de ciudades. Los municipios se particionan por provincia y, dentro de
+    cada partición (y a nivel nacional), un índice invertido de trigramas de caracteres selecciona
+    los candidatos que comparten al menos un trigrama con el texto buscado; solo esos se comparan
+    con `fuzz.ratio`.
+
+    Métodos:
+        ngrams(text): Retorna los trigramas de caracteres de un texto.
+        candidates(city, province): Retorna los índices de los municipios candidatos.
+        match(city, province, score_cutoff): Encuentra el municipio más similar dentro de la provincia,
+        o a nivel nacional si la provincia no fue resuelta.
+        match_series(cities, provinces, score_cutoff): Aplica `match` a los pares únicos de dos Series.
+    """
+    NATIONAL = None  # Llave de la partición con todos los municipios
+
+    def __init__(self, ciudades_ar, normalize=TextNormalizer.normalize_text, n=3):
+        """
+        Construye las particiones por provincia y el índice invertido de n-gramas.
+
+        Parámetros:
+            ciudades_ar (pd.DataFrame): Municipios, con las columnas 'nombre' y 'provincia_name'.
+            normalize (callable): Función de normalización de los nombres (sin tildes, minúsculas).
+            n (int): Longitud de los n-gramas de caracteres.
+        """
+        self.n = n
+        self.names = ciudades_ar['nombre'].tolist()
+        self.provinces = ciudades_ar['provincia_name'].tolist()
+        self.partitions = set(self.provinces)
+
+        # Nombres normalizados, precalculados si la tabla viene del snapshot de municipios
+        if 'nombre_normalizado' in ciudades_ar:
+            self.keys = ciudades_ar['nombre_normalizado'].tolist()
+            state_keys = ciudades_ar['provincia_normalizada'].tolist()
+        else:
+            self.keys = [normalize(name) for name in self.names]
+            state_keys = [normalize(province) for province in self.provinces]
+
+        # Diccionarios nombre normalizado -> nombre oficial, como los usa `match_cities`
+        self.states = dict(zip(state_keys, self.provinces))
+        self.cities = dict(zip(self.keys, self.names))
+
+        # Búsqueda exacta y listas de trigramas por partición (provincia y nacional)
+        self.exact = {}
+        postings = {}
+        for idx, (key, province) in enumerate(zip(self.keys, self.provinces)):
+            for partition in (province, self.NATIONAL):
+                self.exact.setdefault((partition, key), idx)
+                for gram in self.ngrams(key):
+                    postings.setdefault((partition, gram), []).append(idx)
+        self.postings = {key: np.unique(ids) for key, ids in postings.items()}
+        self.comparisons = 0
+
+    def ngrams(self, text):
+        """Retorna el conjunto de n-gramas de caracteres del texto, con relleno de espacios en los bordes."""
+        padded = f" {text} "
+        return {padded[i:i + self.n] for i in range(max(len(padded) - self.n + 1, 1))}
+
+    def candidates(self, city, province=None):
+        """
+        Retorna los índices (ordenados) de los municipios de la partición que comparten al menos un
+        n-grama con `city`.
+
+        Parámetros:
+            city (str): Nombre normalizado de la ciudad.
+            province (str): Provincia oficial de la partición; None para buscar a nivel nacional.
+
+        Retorna:
+            np.ndarray: Índices de los municipios candidatos.
+        """
+        ids = [self.postings[(province, gram)] for gram in self.ngrams(city)
+               if (province, gram) in self.postings]
+        if not ids:
+            return np.empty(0, dtype=int)
+        return np.unique(np.concatenate(ids))
+
+    def match(self, city, province=None, score_cutoff=70):
+        """
+        Encuentra el municipio más similar a `city`. Si `province` es una provincia de la tabla, solo
+        se consideran sus municipios; de lo contrario, la búsqueda es nacional.
+
+        Parámetros:
+            city (str): Nombre normalizado de la ciudad.
+            province (str): Provincia ya resuelta (nombre oficial) o cualquier otro valor si no lo está.
+            score_cutoff (int): Puntaje mínimo de similitud para aceptar una coincidencia.
+
+        Retorna:
+            tuple: (nombre oficial, puntaje); (None, 0) si la entrada es vacía y (city, 0) si no hay
+            coincidencia, igual que `FeatureEngineering.find_best_match`.
+        """
+        if not city:
+            return None, 0
+
+        partition = province if province in self.partitions else self.NATIONAL
+        if (partition, city) in self.exact:
+            return self.names[self.exact[(partition, city)]], 100.0
+
+        ids = self.candidates(city, partition)
+        self.comparisons += len(ids)
+        match = process.extractOne(city, [self.keys[i] for i in ids], scorer=fuzz.ratio,
+                                   score_cutoff=score_cutoff)
+        if match:
+            return self.names[ids[match[2]]], match[1]
+        return city, 0
+
+    def match_series(self, cities, provinces, score_cutoff=70):
+        """
+        Aplica `match` una sola vez por cada par único (ciudad, provincia) y lo lleva a todas las filas.
+
+        Parámetros:
+            cities (pd.Series): Nombres normalizados de las ciudades.
+            provinces (pd.Series): Provincias resueltas (por ejemplo, `<estado>_match`).
+            score_cutoff (int): Puntaje mínimo de similitud para aceptar una coincidencia.
+
+        Retorna:
+            tuple: (np.ndarray con los nombres oficiales, np.ndarray con los puntajes).
+        """
+        pairs = pd.MultiIndex.from_arrays([cities.fillna(''), provinces.fillna('')])
+        codes, uniques = pd.factorize(pairs)
+        results = [self.match(city, province, score_cutoff) for city, province in uniques]
+
+        matches = np.array([result[0] for result in results], dtype=object)
+        scores = np.array([result[1] for result in results], dtype=float)
+        return matches[codes], scores[codes]
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class HashingSentenceEncoder:
+    """
+    Esta clase genera embeddings de oraciones sin modelo ni red: cada texto se representa con sus
+    n-gramas de caracteres (dentro de cada palabra) proyectados a un vector de dimensión fija con
+    HashingVectorizer de scikit-learn y normalizado (L2). Es determinista y no requiere descargas, por
+    lo que sirve como reemplazo del modelo de embeddings en benchmarks y entornos sin conexión; textos
+    con palabras parecidas quedan cerca, pero no captura la semántica del modelo original.
+
+    Expone el mismo `encode` que SentenceTransformer, de modo que puede reemplazarlo sin cambiar a quien
+    lo usa.
+
+    Métodos:
+        vectorizer: HashingVectorizer de n-gramas de caracteres (carga diferida).
+        encode(texts, batch_size=100, convert_to_numpy=True): Genera los embeddings de una lista de textos.
+    """
+    def __init__(self, dim=384, ngram_range=(3, 5)):
+        """
+        Inicializa el HashingSentenceEncoder.
+
+        Parámetros:
+            dim (int): Dimensión de los embeddings.
+            ngram_range (tuple): Largo mínimo y máximo de los n-gramas de caracteres.
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self._vectorizer = None
+
+    @property
+    def vectorizer(self):
+        """HashingVectorizer de n-gramas de caracteres, sin signo alternado y con norma L2."""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(analyzer='char_wb', ngram_range=self.ngram_range,
+                                                 n_features=self.dim, alternate_sign=False, norm='l2')
+        return self._vectorizer
+
+    def encode(self, texts, batch_size=100, convert_to_numpy=True):
+        """
+        Genera los embeddings de una lista de textos, por lotes.
+
+        Parámetros:
+            texts (list): Textos a codificar.
+            batch_size (int): Textos por lote.
+            convert_to_numpy (bool): Se acepta por compatibilidad con SentenceTransformer; siempre
+            retorna un arreglo de numpy.
+
+        Retorna:
+            np.ndarray: Matriz float32 de embeddings normalizados, una fila por texto.
+        """
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            embeddings[start:start + len(batch)] = self.vectorizer.transform(batch).toarray()
+        return embeddings
@@ -0,0 +1,152 @@
+import os
+import json
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from src.stage_cache import StageCache
+from src.stage_profiler import PROFILER
+
+
+class HyperparameterTuner:
+    """
+    Esta clase busca los hiperparámetros del RandomForest con Optuna: muestreo bayesiano (TPE) y poda
+    por successive halving. Cada trial se evalúa en peldaños (rungs) con una fracción creciente de los
+    datos de entrenamiento, midiendo el ROC AUC sobre una partición de validación fija; los trials
+    que quedan en la parte baja de un peldaño se detienen sin llegar a los datos completos. El
+    estudio se guarda en SQLite con un nombre que incluye el hash de los datos, de las variables y de
+    la configuración de la búsqueda: al ejecutar de nuevo sobre los mismos datos se continúa el mismo
+    estudio, y tras un reentrenamiento con otros datos se empieza uno nuevo, sin mezclar sus trials.
+
+    Métodos:
+        rungs(): Fracciones de datos de cada peldaño.
+        suggest_params(trial): Espacio de búsqueda del RandomForest.
+        objective(trial, X_train, y_train, X_valid, y_valid): Evalúa un trial peldaño a peldaño.
+        study_key(X, y, feature_names): Llave del estudio según los datos y la configuración.
+        tune(X, y, feature_names, n_trials): Ejecuta trials nuevos en el estudio de los datos y retorna
+        los mejores hiperparámetros.
+        save_best_params(params, path): Escribe los mejores hiperparámetros en el JSON del modelo.
+    """
+    def __init__(self, storage_path="models/tuning.sqlite3", study_name="rf_condition", n_jobs=1,
+                 cpu_budget=None, min_fraction=0.1, reduction_factor=3, valid_size=0.2, random_state=42):
+        """
+        Inicializa el HyperparameterTuner.
+
+        Parámetros:
+            storage_path (str): Archivo SQLite donde se guarda el estudio.
+            study_name (str): Prefijo del nombre del estudio dentro del archivo.
+            n_jobs (int): Trials ejecutados en paralelo.
+            cpu_budget (int): Núcleos totales disponibles; cada trial usa cpu_budget // n_jobs.
+            min_fraction (float): Fracción de los datos de entrenamiento del primer peldaño.
+            reduction_factor (int): Factor de crecimiento de los datos por peldaño y de poda.
+            valid_size (float): Fracción de los datos reservada para validación.
+            random_state (int): Semilla del muestreo y de los modelos.
+        """
+        self.storage_path = Path(storage_path)
+        self.study_name = study_name
+        self.n_jobs = max(1, n_jobs)
+        self.cpu_budget = cpu_budget or os.cpu_count()
+        self.min_fraction = min_fraction
+        self.reduction_factor = reduction_factor
+        self.valid_size = valid_size
+        self.random_state = random_state
+
+    def rungs(self):
+        """Fracciones de datos por peldaño: min_fraction * reduction_factor^k, terminando en 1.0."""
+        fractions, fraction = [], self.min_fraction
+        while fraction < 1.0:
+            fractions.append(fraction)
+            fraction *= self.reduction_factor
+        return fractions + [1.0]
+
+    def suggest_params(self, trial):
+        """Espacio de búsqueda, con las mismas llaves que `best_hyperparameters_rf.json`."""
+        return {
+            'n_estimators': trial.suggest_int('n_estimators', 50, 300),
+            'max_depth': trial.suggest_int('max_depth', 6, 32),
+            'min_samples_split': trial.suggest_int('min_samples_split', 2, 20),
+            'min_samples_leaf': trial.suggest_int('min_samples_leaf', 1, 10),
+            'max_features': trial.suggest_categorical('max_features', ['sqrt', 'log2']),
+        }
+
+    def objective(self, trial, X_train, y_train, X_valid, y_valid):
+        """
+        Entrena el RandomForest del trial en cada peldaño (los primeros n registros de una permutación
+        fija) y reporta el ROC AUC de validación; Optuna poda el trial si queda por debajo del corte.
+        El paso reportado es el recurso usado en unidades de `min_fraction` (1, 3, 9, 10 con los valores
+        por defecto), de modo que las promociones de SuccessiveHalvingPruner (pasos min_resource *
+        reduction_factor^k) coinciden con los peldaños.
+
+        Retorna:
+            float: ROC AUC de validación con los datos completos.
+        """
+        import optuna
+
+        params = self.suggest_params(trial)
+        order = np.random.RandomState(self.random_state).permutation(len(y_train))
+        score = None
+        for fraction in self.rungs():
+            rows = order[:max(int(len(order) * fraction), 2)]
+            model = RandomForestClassifier(**params, random_state=self.random_state,
+                                           n_jobs=max(1, self.cpu_budget // self.n_jobs))
+            model.fit(X_train[rows], y_train[rows])
+            score = roc_auc_score(y_valid, model.predict_proba(X_valid)[:, 1])
+            trial.report(score, round(fraction / self.min_fraction))
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return score
+
+    def study_key(self, X, y, feature_names):
+        """
+        Llave del estudio: hash de la matriz de variables, de la variable objetivo, de los nombres de las
+        variables, del espacio de búsqueda y de la configuración de la validación y de la poda.
+        """
+        return StageCache.digest(
+            StageCache.array_digest(X, y), list(feature_names),
+            StageCache.code_version(HyperparameterTuner.suggest_params),
+            self.valid_size, self.min_fraction, self.reduction_factor, self.random_state)
+
+    @PROFILER.track('tuning', rows_in='y')
+    def tune(self, X, y, feature_names, n_trials=50):
+        """
+        Ejecuta `n_trials` trials nuevos en el estudio de estos datos (`<study_name>-<llave>`), que se
+        crea si no existe; los trials ya guardados de ese estudio se conservan y orientan al muestreo.
+
+        Parámetros:
+            X (np.ndarray): Matriz de variables.
+            y (array): Variable objetivo (0/1).
+            feature_names (list): Nombres de las columnas de `X`.
+            n_trials (int): Número de trials de esta ejecución.
+
+        Retorna:
+            dict: Mejores hiperparámetros encontrados.
+        """
+        import optuna
+
+        y = np.asarray(y)
+        study_name = f"{self.study_name}-{self.study_key(X, y, feature_names)[:16]}"
+        X_train, X_valid, y_train, y_valid = train_test_split(
+            X, y, test_size=self.valid_size, stratify=y, random_state=self.random_state)
+
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        study = optuna.create_study(
+            study_name=study_name, storage=f"sqlite:///{self.storage_path}", load_if_exists=True,
+            direction='maximize', sampler=optuna.samplers.TPESampler(seed=self.random_state),
+            pruner=optuna.pruners.SuccessiveHalvingPruner(min_resource=1,
+                                                          reduction_factor=self.reduction_factor))
+
+        finished = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+        previous = len(study.get_trials(deepcopy=False, states=finished))
+        print(f"Estudio '{study_name}': {previous} trials previos, {n_trials} por ejecutar "
+              f"({self.n_jobs} en paralelo, {max(1, self.cpu_budget // self.n_jobs)} núcleos por trial)")
+        study.optimize(lambda trial: self.objective(trial, X_train, y_train, X_valid, y_valid),
+                       n_trials=n_trials, n_jobs=self.n_jobs)
+
+        print(f"Mejor ROC AUC de validación: {study.best_value:.4f}")
+        return study.best_params
+
+    def save_best_params(self, params, path="models/best_hyperparameters_rf.json"):
+        """Escribe los mejores hiperparámetros en el JSON que carga `ModelTraining.train_best_model`."""
+        with open(path, 'w') as f:
+            json.dump(params, f)
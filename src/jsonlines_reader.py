@@ -0,0 +1,195 @@
+import os
+import json
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+class JsonLinesReader:
+    """
+    Esta clase permite leer un archivo `.jsonlines` en streaming, entregando bloques de registros
+    de tamaño acotado. Los rangos de filas se resuelven como posiciones en bytes del archivo, de modo
+    que la partición train/test se lee una sola vez y la cola (ej. los últimos 10k registros) se
+    alcanza sin decodificar la cabeza del archivo.
+
+    Métodos:
+        byte_offset(row): Retorna la posición en bytes donde inicia la fila `row` (admite negativos).
+        iter_lines(start, stop): Itera las líneas crudas del rango de filas [start, stop).
+        iter_chunks(start, stop): Itera bloques de registros (list[dict]) del rango de filas [start, stop).
+        iter_line_chunks(start, stop): Itera bloques de líneas crudas del rango de filas [start, stop).
+        decode(lines): Decodifica una lista de líneas crudas.
+        byte_ranges(part_size): Divide el archivo en rangos de bytes alineados a inicios de línea.
+        iter_byte_chunks(byte_start, byte_stop): Itera bloques de registros de un rango de bytes.
+    """
+    def __init__(self, path, chunk_size=50000, block_size=1 << 20):
+        """
+        Inicializa el lector.
+
+        Parámetros:
+            path (str): Ruta del archivo `.jsonlines`.
+            chunk_size (int): Número máximo de registros por bloque.
+            block_size (int): Tamaño en bytes de los bloques usados para ubicar saltos de línea.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.block_size = block_size
+        self.size = os.path.getsize(path)
+
+    def _offset_from_start(self, n_rows):
+        """Posición en bytes después de saltar `n_rows` líneas desde el inicio, sin decodificarlas."""
+        if n_rows <= 0:
+            return 0
+        with open(self.path, 'rb') as f:
+            pos = 0
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    return self.size
+                count = block.count(b'\n')
+                if count < n_rows:
+                    n_rows -= count
+                    pos += len(block)
+                    continue
+                idx = -1
+                for _ in range(n_rows):
+                    idx = block.index(b'\n', idx + 1)
+                return pos + idx + 1
+
+    def _offset_from_end(self, n_rows):
+        """Posición en bytes donde inicia la `n_rows`-ésima línea contando desde el final del archivo."""
+        if n_rows <= 0 or self.size == 0:
+            return self.size
+        with open(self.path, 'rb') as f:
+            f.seek(self.size - 1)
+            # Un salto de línea final termina la última fila, no inicia una nueva
+            end = self.size - 1 if f.read(1) == b'\n' else self.size
+            while end > 0:
+                start = max(0, end - self.block_size)
+                f.seek(start)
+                block = f.read(end - start)
+                count = block.count(b'\n')
+                if count < n_rows:
+                    n_rows -= count
+                    end = start
+                    continue
+                idx = len(block)
+                for _ in range(n_rows):
+                    idx = block.rindex(b'\n', 0, idx)
+                return start + idx + 1
+        return 0
+
+    def byte_offset(self, row):
+        """
+        Retorna la posición en bytes donde inicia la fila indicada.
+
+        Parámetros:
+            row (int | None): Índice de la fila. Los negativos cuentan desde el final y None es el final.
+
+        Retorna:
+            int: Posición en bytes dentro del archivo.
+        """
+        if row is None:
+            return self.size
+        if row < 0:
+            return self._offset_from_end(-row)
+        return self._offset_from_start(row)
+
+    def iter_lines(self, start=0, stop=None):
+        """Itera las líneas crudas (bytes) del rango de filas [start, stop)."""
+        return self._iter_byte_lines(self.byte_offset(start), self.byte_offset(stop))
+
+    def _iter_byte_lines(self, byte_start, byte_stop):
+        """Itera las líneas no vacías que inician en [byte_start, byte_stop) (byte_start inicia línea)."""
+        with open(self.path, 'rb') as f:
+            f.seek(byte_start)
+            pos = byte_start
+            for line in f:
+                if pos >= byte_stop:
+                    break
+                pos += len(line)
+                if line.strip():
+                    yield line
+
+    def iter_chunks(self, start=0, stop=None):
+        """
+        Itera bloques de registros decodificados del rango de filas [start, stop).
+
+        Parámetros:
+            start (int): Fila inicial (admite negativos para contar desde el final).
+            stop (int | None): Fila final, excluida (admite negativos). None lee hasta el final.
+
+        Retorna:
+            generator: Listas de diccionarios con a lo sumo `chunk_size` registros.
+        """
+        return self._iter_decoded(self.iter_lines(start, stop))
+
+    def iter_line_chunks(self, start=0, stop=None):
+        """
+        Itera bloques de líneas crudas, sin decodificar, del rango de filas [start, stop); permite
+        identificar cada registro por el hash de su línea antes de decodificarlo.
+
+        Retorna:
+            generator: Listas de líneas (bytes) con a lo sumo `chunk_size` elementos.
+        """
+        return self._iter_line_chunks(self.iter_lines(start, stop))
+
+    def _iter_line_chunks(self, lines_iter):
+        """Agrupa líneas crudas en bloques de a lo sumo `chunk_size` líneas."""
+        lines = []
+        for line in lines_iter:
+            lines.append(line)
+            if len(lines) >= self.chunk_size:
+                yield lines
+                lines = []
+        if lines:
+            yield lines
+
+    @staticmethod
+    def decode(lines):
+        """Decodifica una lista de líneas crudas en registros (dict)."""
+        return [_loads(line) for line in lines]
+
+    def _iter_decoded(self, lines_iter):
+        """Agrupa líneas crudas en bloques de a lo sumo `chunk_size` registros decodificados."""
+        for lines in self._iter_line_chunks(lines_iter):
+            yield self.decode(lines)
+
+    def byte_ranges(self, part_size=64 << 20):
+        """
+        Divide el archivo en rangos de bytes de aproximadamente `part_size`, con cada límite desplazado
+        al inicio de la línea siguiente; así cada línea pertenece a un único rango y los rangos se pueden
+        leer en paralelo sin contar filas.
+
+        Parámetros:
+            part_size (int): Tamaño aproximado en bytes de cada rango.
+
+        Retorna:
+            list: Tuplas (byte_start, byte_stop) contiguas que cubren el archivo.
+        """
+        bounds = [0]
+        with open(self.path, 'rb') as f:
+            while bounds[-1] + part_size < self.size:
+                f.seek(bounds[-1] + part_size - 1)
+                # Si el byte anterior al límite es un salto de línea, el límite ya inicia una línea
+                f.readline()
+                if f.tell() >= self.size:
+                    break
+                bounds.append(f.tell())
+        bounds.append(self.size)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def iter_byte_chunks(self, byte_start, byte_stop):
+        """
+        Itera bloques de registros decodificados de las líneas que inician en [byte_start, byte_stop).
+
+        Parámetros:
+            byte_start (int): Inicio del rango (debe ser inicio de línea, ej. de `byte_ranges`).
+            byte_stop (int): Fin del rango, excluido.
+
+        Retorna:
+            generator: Listas de diccionarios con a lo sumo `chunk_size` registros.
+        """
+        return self._iter_decoded(self._iter_byte_lines(byte_start, byte_stop))
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+
+class KeywordClassifier:
+    """
+    Esta clase clasifica textos normalizados a partir de listas de palabras clave por clase, usando un
+    autómata (trie) de palabras construido una sola vez. Cada texto se recorre en una sola pasada,
+    contando las coincidencias de todas las clases a la vez; la clase asignada es la primera, en orden
+    de prioridad, con al menos una coincidencia. Es equivalente a evaluar en cascada expresiones
+    regulares `\\b(kw1|kw2|...)\\b` sobre texto limpio (tokens separados por un espacio).
+
+    Métodos:
+        count_hits(text): Cuenta las coincidencias de palabras clave de cada clase en un texto.
+        classify(text): Retorna la clase de un texto.
+        classify_series(series, prefix): Clasifica una Serie completa y retorna además el conteo de
+        coincidencias por clase.
+    """
+    def __init__(self, keywords, default):
+        """
+        Construye el autómata de palabras clave.
+
+        Parámetros:
+            keywords (dict): Clase -> lista de palabras clave (una o más palabras), en orden de prioridad.
+            default (str): Clase asignada cuando no hay coincidencias.
+        """
+        self.classes = list(keywords)
+        self.default = default
+        self.trie = {}
+        for class_idx, class_keywords in enumerate(keywords.values()):
+            for keyword in class_keywords:
+                node = self.trie
+                for token in keyword.split():
+                    node = node.setdefault(token, {})
+                node.setdefault(None, []).append(class_idx)  # la llave None marca el fin de una palabra clave
+
+    def count_hits(self, text):
+        """
+        Cuenta las coincidencias de palabras clave de cada clase en un texto normalizado.
+
+        Parámetros:
+            text (str): Texto normalizado.
+
+        Retorna:
+            list: Número de coincidencias por clase, en el orden de `self.classes`.
+        """
+        counts = [0] * len(self.classes)
+        tokens = text.split()
+        n_tokens = len(tokens)
+        trie = self.trie
+        for start, token in enumerate(tokens):
+            node = trie.get(token)
+            position = start + 1
+            while node is not None:
+                for class_idx in node.get(None, ()):
+                    counts[class_idx] += 1
+                if position == n_tokens:
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return counts
+
+    def resolve(self, counts):
+        """Retorna la primera clase, en orden de prioridad, con al menos una coincidencia."""
+        for class_idx, count in enumerate(counts):
+            if count:
+                return self.classes[class_idx]
+        return self.default
+
+    def classify(self, text):
+        """Clasifica un texto normalizado."""
+        return self.resolve(self.count_hits(text))
+
+    def classify_series(self, series, prefix='kw'):
+        """
+        Clasifica una Serie de textos normalizados, procesando una sola vez cada valor único.
+
+        Parámetros:
+            series (pd.Series): Textos normalizados.
+            prefix (str): Prefijo de las columnas de conteo.
+
+        Retorna:
+            tuple: (pd.Series con la clase de cada fila,
+                    pd.DataFrame con el conteo de coincidencias por clase, columnas `<prefix>_<clase>`).
+        """
+        codes, uniques = pd.factorize(series.fillna(''))
+        counts = np.array([self.count_hits(text) for text in uniques], dtype=np.int32)
+        counts = counts.reshape(len(uniques), len(self.classes))
+        labels = np.array([self.resolve(row) for row in counts], dtype=object)
+
+        columns = [f"{prefix}_{name.replace(' ', '_')}" for name in self.classes]
+        hits = pd.DataFrame(counts[codes], columns=columns, index=series.index)
+        return pd.Series(labels[codes], index=series.index), hits
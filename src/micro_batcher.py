@@ -0,0 +1,181 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Esta clase agrupa en micro-lotes los registros de solicitudes concurrentes antes de puntuarlos: el
+    primer registro en cola abre un lote que se cierra al llegar a `max_batch_size` registros o al
+    cumplirse `max_wait_ms`, y el lote completo pasa una sola vez por la función de puntuación (embeddings
+    y bosque vectorizados sobre todo el lote). La puntuación corre en un único hilo aparte, de modo que el
+    event loop sigue aceptando solicitudes mientras se procesa un lote. Si un lote falla, los registros de
+    cada solicitud se vuelven a puntuar por separado, de modo que el error solo llega a la solicitud que
+    lo provoca y no a las demás agrupadas con ella.
+
+    También registra las métricas del servicio: latencia por solicitud (p50/p99 sobre una ventana de las
+    últimas solicitudes), throughput en registros/s y tamaño medio de los lotes.
+
+    Métodos:
+        start(): Inicia la tarea que arma y procesa los lotes.
+        stop(): Detiene la tarea y el hilo de puntuación.
+        submit(records): Encola los registros de una solicitud y espera sus resultados.
+        metrics(): Retorna las métricas de latencia, throughput y lotes.
+    """
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=10, window=10000):
+        """
+        Inicializa el MicroBatcher.
+
+        Parámetros:
+            score_fn (callable): Función que recibe una lista de registros y retorna una lista de
+            resultados en el mismo orden.
+            max_batch_size (int): Máximo de registros por lote.
+            max_wait_ms (float): Espera máxima, en milisegundos, desde el primer registro del lote.
+            window (int): Número de solicitudes recientes usadas para los percentiles de latencia.
+        """
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.latencies = deque(maxlen=window)
+        self.started_at = time.monotonic()
+        self.n_requests = 0
+        self.n_records = 0
+        self.n_batches = 0
+        self.n_errors = 0
+        self.n_failed_requests = 0
+        self._next_request = 0
+        self._queue = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+
+    def start(self):
+        """Inicia la tarea de micro-batching en el event loop actual."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self.started_at = time.monotonic()
+
+    async def stop(self):
+        """Cancela la tarea de micro-batching y libera el hilo de puntuación."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, records):
+        """
+        Encola los registros de una solicitud y espera a que sus lotes se procesen.
+
+        Parámetros:
+            records (list): Registros de la solicitud.
+
+        Retorna:
+            list: Resultados de `score_fn`, uno por registro y en el mismo orden.
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in records]
+        request, self._next_request = self._next_request, self._next_request + 1
+        for record, future in zip(records, futures):
+            self._queue.put_nowait((request, record, future))
+        try:
+            return await asyncio.gather(*futures)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+            self.n_requests += 1
+
+    async def _next_batch(self):
+        """Espera el primer registro y agrega los siguientes hasta llenar el lote o agotar la espera."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _score(self, records):
+        """
+        Puntúa registros con `score_fn` y valida que retorne un resultado por registro.
+
+        Manejo de errores:
+            - Si `score_fn` retorna más o menos resultados que registros, lanza ValueError.
+        """
+        results = list(self.score_fn(records))
+        if len(results) != len(records):
+            raise ValueError(f"score_fn retornó {len(results)} resultados para {len(records)} registros")
+        return results
+
+    @staticmethod
+    def _resolve(items, results=None, error=None):
+        """Entrega a los futuros pendientes de `items` su resultado o el error."""
+        for i, (_, _, future) in enumerate(items):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    async def _run(self):
+        """
+        Arma lotes y los puntúa en el hilo de puntuación, resolviendo los futuros de cada registro. Si el
+        lote falla, puntúa por separado los registros de cada solicitud y solo las que fallan reciben el
+        error.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                results = await loop.run_in_executor(self._executor, self._score,
+                                                     [record for _, record, _ in batch])
+            except Exception:
+                self.n_errors += 1
+                requests = {}
+                for item in batch:
+                    requests.setdefault(item[0], []).append(item)
+                for items in requests.values():
+                    try:
+                        results = await loop.run_in_executor(self._executor, self._score,
+                                                             [record for _, record, _ in items])
+                    except Exception as error:
+                        self.n_failed_requests += 1
+                        self._resolve(items, error=error)
+                        continue
+                    self.n_batches += 1
+                    self.n_records += len(items)
+                    self._resolve(items, results)
+                continue
+            self.n_batches += 1
+            self.n_records += len(batch)
+            self._resolve(batch, results)
+
+    def metrics(self):
+        """
+        Retorna las métricas del servicio desde el inicio.
+
+        Retorna:
+            dict: Latencia p50/p99 en ms, solicitudes y registros por segundo, tamaño medio de lote,
+            número de solicitudes, registros, lotes, lotes con error y solicitudes con error.
+        """
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'requests_per_second': self.n_requests / elapsed,
+            'records_per_second': self.n_records / elapsed,
+            'mean_batch_size': self.n_records / self.n_batches if self.n_batches else None,
+            'requests': self.n_requests,
+            'records': self.n_records,
+            'batches': self.n_batches,
+            'batch_errors': self.n_errors,
+            'failed_requests': self.n_failed_requests,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+        }
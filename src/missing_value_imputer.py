@@ -0,0 +1,83 @@
+from sklearn.impute import KNNImputer
+
+
+class MissingValueImputer:
+    """
+    Esta clase imputa valores faltantes con estadísticos aprendidos una sola vez (fit) sobre el conjunto
+    de entrenamiento, de modo que en predicción se aplican sin recalcularlos sobre el lote recibido.
+
+    Métodos:
+        fit(df): Aprende la moda de las variables categóricas y la mediana/media (o un KNNImputer)
+        de las variables numéricas.
+        transform(df): Imputa los valores faltantes con los estadísticos aprendidos.
+        fit_transform(df): Ajusta e imputa el mismo DataFrame.
+    """
+    def __init__(self, categorical_strategy='mode', numerical_strategy='median', use_knn=False,
+                 n_neighbors=5):
+        """
+        Inicializa el MissingValueImputer.
+
+        Parámetros:
+            categorical_strategy (str): Estrategia para variables categóricas ('mode' por defecto).
+            numerical_strategy (str): Estrategia para variables numéricas ('median', 'mean').
+            use_knn (bool): Si True, usa KNN Imputer para las variables numéricas.
+            n_neighbors (int): Número de vecinos para KNN.
+        """
+        self.categorical_strategy = categorical_strategy
+        self.numerical_strategy = numerical_strategy
+        self.use_knn = use_knn
+        self.n_neighbors = n_neighbors
+
+    def fit(self, df):
+        """
+        Aprende los valores de imputación de cada columna.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame de entrenamiento.
+
+        Retorna:
+            MissingValueImputer: La instancia ajustada.
+        """
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+        self.numerical_cols_ = df.select_dtypes(include=['number']).columns.tolist()
+        self.fill_values_ = {}
+
+        if self.categorical_strategy == 'mode':
+            for col in categorical_cols:
+                mode = df[col].mode()
+                if len(mode):
+                    self.fill_values_[col] = mode[0]  # Valor más frecuente
+
+        self.knn_ = None
+        if self.use_knn:
+            self.knn_ = KNNImputer(n_neighbors=self.n_neighbors).fit(df[self.numerical_cols_])
+        else:
+            for col in self.numerical_cols_:
+                if self.numerical_strategy == 'median':
+                    self.fill_values_[col] = df[col].median()
+                elif self.numerical_strategy == 'mean':
+                    self.fill_values_[col] = df[col].mean()
+
+        return self
+
+    def transform(self, df):
+        """
+        Imputa los valores faltantes con los estadísticos aprendidos en `fit`.
+
+        Parámetros:
+            df (pd.DataFrame): DataFrame a imputar (puede ser un único registro).
+
+        Retorna:
+            pd.DataFrame: DataFrame con valores imputados.
+        """
+        fill_values = {col: value for col, value in self.fill_values_.items() if col in df.columns}
+        df_imputed = df.fillna(fill_values)
+
+        if self.knn_ is not None:
+            df_imputed[self.numerical_cols_] = self.knn_.transform(df_imputed[self.numerical_cols_])
+
+        return df_imputed
+
+    def fit_transform(self, df):
+        """Ajusta el imputador e imputa el mismo DataFrame."""
+        return self.fit(df).transform(df)
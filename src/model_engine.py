@@ -0,0 +1,141 @@
+import json
+from abc import ABC, abstractmethod
+import joblib
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from src.forest_arrays import ForestArrays
+
+
+class ModelEngine(ABC):
+    """
+    Esta clase define la interfaz de un motor de entrenamiento: cómo se transforman las variables con el
+    FeaturePipeline, cómo se construye el estimador a partir de sus hiperparámetros y dónde se guarda el
+    modelo entrenado. `ModelTraining` y `PredictAndEvaluate` solo usan esta interfaz, de modo que el motor
+    se elige con `MODEL_ENGINE` sin cambiar el resto del flujo.
+
+    Métodos:
+        transform(pipeline, df): Retorna la matriz del motor y los nombres de sus columnas.
+        load_params(path_models): Carga los hiperparámetros guardados o los valores por defecto.
+        build(params, pipeline): Construye el estimador sin entrenar para las columnas del pipeline.
+        feature_importance(model): Importancia de las variables del modelo (None si no la expone).
+        save_model(model, path_models): Guarda el modelo entrenado en la carpeta de modelos.
+        model_paths(path_models): Archivos que escribe `save_model`.
+        load_model(path_models): Carga el modelo para predecir.
+    """
+    name = None
+    model_file = None
+    params_file = None
+    default_params = {}
+
+    @abstractmethod
+    def transform(self, pipeline, df):
+        """Retorna (X, nombres de las columnas) a partir del FeaturePipeline ajustado."""
+
+    def load_params(self, path_models):
+        """
+        Carga los hiperparámetros de `params_file` en la carpeta de modelos; si no existe, usa los de
+        `default_params`.
+
+        Parámetros:
+            path_models (Path): Carpeta de los modelos.
+
+        Retorna:
+            dict: Hiperparámetros del estimador.
+        """
+        params_path = path_models / self.params_file
+        if not params_path.exists():
+            print(f"No existe {params_path}, se usan los hiperparámetros por defecto")
+            return dict(self.default_params)
+        with open(params_path, 'r') as f:
+            return json.load(f)
+
+    @abstractmethod
+    def build(self, params, pipeline):
+        """Construye el estimador sin entrenar para las columnas que produce `transform` con `pipeline`."""
+
+    def feature_importance(self, model):
+        """Importancia de las variables, en el orden de las columnas de `transform`."""
+        return getattr(model, 'feature_importances_', None)
+
+    def save_model(self, model, path_models):
+        """Guarda el modelo entrenado con joblib en `model_file`."""
+        joblib.dump(model, path_models / self.model_file)
+
+    def load_model(self, path_models):
+        """Carga el modelo guardado con `save_model`."""
+        return joblib.load(path_models / self.model_file)
+
+    def model_paths(self, path_models):
+        """Archivos que escribe `save_model`; su contenido identifica el modelo que carga `load_model`."""
+        return [path_models / self.model_file]
+
+
+class RandomForestEngine(ModelEngine):
+    """
+    Motor RandomForest (el modelo original): numéricas escaladas y one-hot de las categóricas. Además del
+    pickle, el bosque se exporta a arreglos planos de nodos (`ForestArrays`), que es lo que se carga para
+    predecir: se mapean en memoria en milisegundos en lugar de deserializar el pickle.
+    """
+    name = 'rf'
+    model_file = 'best_rf.pkl'
+    arrays_dir = 'best_rf_arrays'
+    params_file = 'best_hyperparameters_rf.json'
+
+    def transform(self, pipeline, df):
+        return pipeline.transform(df), pipeline.feature_names
+
+    def build(self, params, pipeline):
+        return RandomForestClassifier(**params, random_state=42, n_jobs=-1)
+
+    def save_model(self, model, path_models):
+        """Guarda el pickle y la exportación a arreglos planos del bosque."""
+        super().save_model(model, path_models)
+        ForestArrays.from_sklearn(model).save(path_models / self.arrays_dir)
+
+    def load_model(self, path_models):
+        """Carga los arreglos del bosque (memory mapping) si existen; si no, el pickle."""
+        if (path_models / self.arrays_dir / 'meta.json').exists():
+            return ForestArrays.load(path_models / self.arrays_dir)
+        return super().load_model(path_models)
+
+    def model_paths(self, path_models):
+        """El pickle, `meta.json` y los arreglos `.npy` de la exportación del bosque."""
+        arrays_path = path_models / self.arrays_dir
+        return super().model_paths(path_models) + [arrays_path / 'meta.json'] + [
+            arrays_path / f"{name}.npy" for name in ForestArrays.ARRAYS]
+
+
+class HistGradientBoostingEngine(ModelEngine):
+    """
+    Motor HistGradientBoosting con soporte nativo de categóricas (sin one-hot ni LabelEncoder aparte,
+    incluye las variables de etiquetas con a lo sumo 255 clases) y parada temprana sobre una partición
+    de validación interna.
+    """
+    name = 'hgb'
+    model_file = 'best_hgb.pkl'
+    params_file = 'best_hyperparameters_hgb.json'
+    default_params = {
+        'learning_rate': 0.1,
+        'max_iter': 500,
+        'max_leaf_nodes': 63,
+        'min_samples_leaf': 20,
+        'l2_regularization': 0.0,
+    }
+    max_categories = 255
+
+    def transform(self, pipeline, df):
+        X, _, names = pipeline.transform_native(df, self.max_categories)
+        return X, names
+
+    def build(self, params, pipeline):
+        return HistGradientBoostingClassifier(**params,
+                                              categorical_features=pipeline.native_mask(self.max_categories),
+                                              max_bins=self.max_categories, early_stopping=True,
+                                              validation_fraction=0.1, n_iter_no_change=20,
+                                              random_state=42)
+
+    def feature_importance(self, model):
+        return None
+
+
+# Motores disponibles por nombre (variable de entorno MODEL_ENGINE)
+MODEL_ENGINES = {engine.name: engine for engine in (RandomForestEngine, HistGradientBoostingEngine)}
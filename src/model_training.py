@@ -1,25 +1,49 @@
-import json
+import inspect
+import io
+import time
 import joblib
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from sklearn.model_selection import cross_val_score
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.metrics import accuracy_score, roc_auc_score, log_loss, brier_score_loss
+from config import ConfigEnv
 from constants.constants import conversion_dict, feature, feature_engineering, target
+from src.feature_pipeline import FeaturePipeline
+from src.forest_arrays import ForestArrays
+from src.model_engine import MODEL_ENGINES
+from src.stage_cache import StageCache
+from src.stage_profiler import PROFILER
 import warnings
 warnings.filterwarnings("ignore")
 
 
+# Métricas disponibles en la validación cruzada: (y real, probabilidad de la clase 1, predicción)
+CV_METRICS = {
+    'accuracy': lambda y, proba, pred: accuracy_score(y, pred),
+    'roc_auc': lambda y, proba, pred: roc_auc_score(y, proba),
+    'log_loss': lambda y, proba, pred: log_loss(y, proba),
+    'brier': lambda y, proba, pred: brier_score_loss(y, proba),
+}
+
+
 class ModelTraining:
     """
     Clase para la preparación de datos, transformación y entrenamiento del modelo.
 
     Métodos:
-        separate_variable_types(df): Identifica y separa variables en diferentes tipos
-        (numéricas, categóricas, texto y booleanas).
-        X_transform_preprocessed(df): Preprocesa el dataset, aplica transformaciones y devuelve
-        los datos listos para el modelado.
-        train_best_model(df): Carga los mejores hiperparámetros, entrena un modelo RandomForest y lo guarda.
+        get_engine(name): Retorna el motor de entrenamiento de `MODEL_ENGINES` (rf - hgb).
+        load_feature_pipeline(): Carga el FeaturePipeline ajustado (o lo construye a partir de
+        `preprocessor.pkl` y `label_encoders.pkl`).
+        X_transform_preprocessed(df, engine): Preprocesa el dataset con las transformaciones del motor y
+        devuelve los datos listos para el modelado.
+        cross_validate(model, X, y, n_splits, metrics): Validación cruzada en una sola pasada, con todas
+        las métricas calculadas a partir de las probabilidades fuera de fold (OOF).
+        train_best_model(df, engine): Carga los mejores hiperparámetros y entrena el modelo del motor.
+        compare_engines(df, engines): Compara los motores (tiempo de ajuste, tamaño, latencia y métricas).
+        stage_key(source_key, engine): Llave de la etapa de entrenamiento (datos, parámetros y código).
+        output_paths(engine): Archivos que genera el entrenamiento del motor.
     """
 
     def __init__(self):
@@ -27,123 +51,223 @@ class ModelTraining:
         Initializes the ModelTraining instance.
         """
         self.PATH_MODELS = Path("./models")
+        self.feature_pipeline = None
+        self.oof_predictions = None
 
-    def separate_variable_types(self, df):
+    def get_engine(self, name):
         """
-        Identifica y separa las variables del dataset en diferentes categorías según su tipo de datos.
+        Retorna una instancia del motor de entrenamiento.
 
         Parámetros:
-            df (pd.DataFrame): DataFrame de entrada.
+            name (str): Nombre del motor en `MODEL_ENGINES` (rf - hgb).
 
         Retorna:
-            dict: Diccionario con listas de variables categorizadas en numéricas, categóricas, texto y
-            booleanas.
+            ModelEngine: Motor de entrenamiento.
         """
-        numeric_vars = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-        categorical_vars = df.select_dtypes(include=['category']).columns.tolist()
-        text_vars = [col for col in df.select_dtypes(include=['object']).columns
-                     if df[col].apply(lambda x: isinstance(x, str)).all()]
-
-        boolean_vars = df.select_dtypes(include=['bool']).columns.tolist()
-
-        # Asegurar que las categóricas no contengan solo texto
-        categorical_vars += [col for col in df.select_dtypes(include=['object']).columns
-                             if col not in text_vars]
+        if name not in MODEL_ENGINES:
+            raise ValueError(f"Motor de entrenamiento desconocido: {name} "
+                             f"(opciones: {', '.join(MODEL_ENGINES)})")
+        return MODEL_ENGINES[name]()
 
-        return {
-            'numeric': numeric_vars,
-            'categorical': categorical_vars,
-            'text': text_vars,
-            'boolean': boolean_vars
-        }
+    def load_feature_pipeline(self):
+        """
+        Carga el FeaturePipeline ajustado desde `models/feature_pipeline.pkl`. Si no existe, lo construye
+        a partir de `preprocessor.pkl` y `label_encoders.pkl` (con los parámetros ya ajustados) y lo guarda.
 
-    def X_transform_preprocessed(self, df):
+        Retorna:
+            FeaturePipeline: Pipeline de transformación ajustado.
         """
-        Preprocesa el dataset, aplicando transformaciones y separando las características.
+        if self.feature_pipeline is None:
+            pipeline_path = self.PATH_MODELS / 'feature_pipeline.pkl'
+            if pipeline_path.exists():
+                self.feature_pipeline = FeaturePipeline.load(pipeline_path)
+            else:
+                print("Construyendo feature_pipeline.pkl a partir del preprocesador y los label encoders...")
+                self.feature_pipeline = FeaturePipeline.from_artifacts(
+                    joblib.load(self.PATH_MODELS / 'preprocessor.pkl'),
+                    joblib.load(self.PATH_MODELS / 'label_encoders.pkl'))
+                self.feature_pipeline.save(pipeline_path)
+        return self.feature_pipeline
+
+    @PROFILER.track('encoding', rows_in='df', rows_out=True)
+    def X_transform_preprocessed(self, df, engine=None):
+        """
+        Preprocesa el dataset con el FeaturePipeline ajustado (solo transformación, también en
+        entrenamiento, pues el preprocesador se ajustó en el discovery).
 
         Parámetros:
             df (pd.DataFrame): DataFrame con los datos de entrenamiento.
+            engine (ModelEngine): Motor cuyas transformaciones se aplican (por defecto RandomForest).
 
         Retorna:
-            tuple: (X_transformed, y) con las variables preprocesadas listas para el modelado.
+            tuple: (X_transformed, y, feature_names) con la matriz float32 lista para el modelado.
         """
+        engine = engine or self.get_engine('rf')
         df = df[feature_engineering + feature + target]
-        df = df.astype(conversion_dict)
-        type_feature = self.separate_variable_types(df)
-        print(type_feature)
-
         print("Dataset cargado con shape:", df.shape)
 
         # Transformar variable objetivo
         print("Transformando variable objetivo...")
-        df[target[0]] = df[target[0]].map({'new': 1, 'used': 0})
-        print("Valores únicos en 'condition':", df[target[0]].unique())
+        y = df[target[0]].map({'new': 1, 'used': 0})
+        print("Valores únicos en 'condition':", y.unique())
 
-        X = df.drop(columns=target[0])
-        y = df[target[0]]
-        print("X shape:", X.shape, "y shape:", y.shape)
+        print("Aplicar feature pipeline")
+        pipeline = self.load_feature_pipeline()
+        X_transformed, feature_names = engine.transform(pipeline, df)
+        print("X shape:", X_transformed.shape, "y shape:", y.shape)
 
-        # Separar características por tipo
-        print("Separando características...")
-        numerical_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-        categorical_features = X.select_dtypes(include=['category']).columns.tolist()
-        text_features = [col for col in X.select_dtypes(include=['object'])
-                         if df[col].apply(lambda x: isinstance(x, str)).all()]
+        return X_transformed, y, feature_names
 
-        print("Numéricas:", numerical_features, "Categóricas:", categorical_features, "Texto:", text_features)
-
-        # Cargar label encoder y preprocesador
-        print("Cargar modelo y preprocesador")
-        preprocessor_path = self.PATH_MODELS / 'preprocessor.pkl'
-        encoder_path = self.PATH_MODELS / 'label_encoders.pkl'
-
-        preprocessor = joblib.load(preprocessor_path)
-        label_encoders = joblib.load(encoder_path)
-        print("Label encoder y preprocesador cargados correctamente.")
-
-        print("Aplicando LabelEncoder...")
-        for col, encoder in label_encoders.items():
-            X[col] = encoder.fit_transform(X[col].astype(str))
-
-        print("Aplicar preprocessor")
-        X_transformed = preprocessor.transform(X)
+    @PROFILER.track('cross_validation', rows_in='y')
+    def cross_validate(self, model, X, y, n_splits=ConfigEnv.CV_FOLDS, metrics=ConfigEnv.CV_METRICS):
+        """
+        Validación cruzada estratificada (mismos folds que `cross_val_score(cv=n_splits)`) con un solo
+        ajuste por fold: cada métrica se calcula sobre las predicciones del mismo modelo del fold. El
+        paralelismo queda dentro del modelo (n_jobs de los árboles), sin paralelismo anidado.
 
-        return X_transformed, y, preprocessor.get_feature_names_out()
+        Parámetros:
+            model: Estimador de scikit-learn con `predict_proba`.
+            X (np.ndarray): Matriz de variables.
+            y (pd.Series): Variable objetivo (0/1).
+            n_splits (int): Número de folds.
+            metrics (list): Nombres de las métricas de `CV_METRICS`.
 
-    def train_best_model(self, df):
+        Retorna:
+            dict: Métrica -> arreglo con el valor de cada fold. Las predicciones fuera de fold
+            quedan en `self.oof_predictions` (columnas row, fold, y_true, oof_proba).
         """
-        Carga los mejores hiperparámetros, entrena un modelo RandomForest y lo guarda en el sistema.
+        y = np.asarray(y)
+        scores = {metric: [] for metric in metrics}
+        oof_proba = np.empty(len(y), dtype=np.float64)
+        oof_fold = np.empty(len(y), dtype=np.int16)
+
+        for fold, (train_idx, test_idx) in enumerate(StratifiedKFold(n_splits=n_splits).split(X, y)):
+            fold_model = clone(model).fit(X[train_idx], y[train_idx])
+            proba = fold_model.predict_proba(X[test_idx])
+            pred = fold_model.classes_.take(proba.argmax(axis=1))
+            oof_proba[test_idx], oof_fold[test_idx] = proba[:, 1], fold
+            for metric in metrics:
+                scores[metric].append(CV_METRICS[metric](y[test_idx], proba[:, 1], pred))
+            print(f"Fold {fold + 1}/{n_splits}: " + ", ".join(f"{m}={s[-1]:.4f}" for m, s in scores.items()))
+
+        self.oof_predictions = pd.DataFrame({'row': np.arange(len(y)), 'fold': oof_fold,
+                                             'y_true': y, 'oof_proba': oof_proba})
+        return {metric: np.array(values) for metric, values in scores.items()}
+
+    def train_best_model(self, df, engine=ConfigEnv.MODEL_ENGINE):
+        """
+        Carga los mejores hiperparámetros y entrena el modelo del motor indicado.
 
         Parámetros:
             df (pd.DataFrame): DataFrame con los datos de entrenamiento.
+            engine (str): Nombre del motor de entrenamiento (rf - hgb).
 
         Retorna:
-            None
+            tuple: (modelo entrenado, nombres de las variables). Las predicciones fuera de fold quedan
+            en `self.oof_predictions`.
         """
-        X_train, y_train, feature_names = self.X_transform_preprocessed(df)
+        engine = self.get_engine(engine)
+        X_train, y_train, feature_names = self.X_transform_preprocessed(df, engine)
         print("X_train shape:", X_train.shape, "y_train shape:", y_train.shape)
 
         # Cargar mejores hiperparámetros
-        print("Cargar mejores parámetros")
-        with open(self.PATH_MODELS / 'best_hyperparameters_rf.json', 'r') as f:
-            best_params = json.load(f)
+        print(f"Cargar mejores parámetros ({engine.name})")
+        best_params = engine.load_params(self.PATH_MODELS)
         print(best_params)
 
         # Inicializar modelo con mejores hiperparámetros
-        best_rf = RandomForestClassifier(**best_params, random_state=42, n_jobs=-1)
-
-        # Validación cruzada con 10 folds
-        print("Ejecutando validación cruzada 10 folds...")
-        cv_accuracy = cross_val_score(best_rf, X_train, y_train, cv=10, scoring='accuracy', n_jobs=-1)
-        cv_roc_auc = cross_val_score(best_rf, X_train, y_train, cv=10, scoring='roc_auc', n_jobs=-1)
+        best_model = engine.build(best_params, self.load_feature_pipeline())
 
-        print(f"Cross-Validation Accuracy (mean): {cv_accuracy.mean():.4f} ± {cv_accuracy.std():.4f}")
-        print(f"Cross-Validation ROC AUC (mean): {cv_roc_auc.mean():.4f} ± {cv_roc_auc.std():.4f}")
+        # Validación cruzada en una sola pasada: un ajuste por fold para todas las métricas
+        print(f"Ejecutando validación cruzada {ConfigEnv.CV_FOLDS} folds...")
+        cv_scores = self.cross_validate(best_model, X_train, y_train)
+        for metric, values in cv_scores.items():
+            print(f"Cross-Validation {metric} (mean): {values.mean():.4f} ± {values.std():.4f}")
 
         # Entrenar modelo final en todo el dataset
-        best_rf.fit(X_train, y_train)
+        with PROFILER.stage('fit', rows_in=len(X_train)):
+            best_model.fit(X_train, y_train)
+
+        return best_model, feature_names
+
+    def stage_key(self, source_key, engine=ConfigEnv.MODEL_ENGINE):
+        """
+        Llave de la etapa `model_training`: llave de `df_feature_engineering`, motor, hiperparámetros,
+        configuración de la validación cruzada, transformadores del discovery y código del entrenamiento.
+
+        Retorna:
+            str: Llave de la etapa, o None si `df_feature_engineering` no tiene llave.
+        """
+        if source_key is None:
+            return None
+        model_engine = self.get_engine(engine)
+        return StageCache.digest(
+            'model_training', source_key, engine, model_engine.load_params(self.PATH_MODELS),
+            ConfigEnv.CV_FOLDS, ConfigEnv.CV_METRICS,
+            [StageCache.file_digest(self.PATH_MODELS / name)
+             for name in ('preprocessor.pkl', 'label_encoders.pkl')],
+            StageCache.code_version(ModelTraining, inspect.getmodule(type(model_engine)), FeaturePipeline,
+                                    ForestArrays, feature, feature_engineering, target, conversion_dict))
+
+    def output_paths(self, engine=ConfigEnv.MODEL_ENGINE):
+        """Archivos del modelo que escribe el motor: el modelo serializado y, con rf, los arreglos de
+        `best_rf_arrays/` (meta.json y un .npy por arreglo)."""
+        return self.get_engine(engine).model_paths(self.PATH_MODELS)
+
+    def compare_engines(self, df, engines=tuple(MODEL_ENGINES), test_size=0.2, n_single=200):
+        """
+        Compara los motores de entrenamiento sobre la misma partición estratificada de los mismos datos:
+        tiempo de ajuste, tamaño del modelo serializado, latencia de una fila (mediana de `n_single`
+        llamadas a predict_proba), latencia por lote (todas las filas de prueba) y accuracy/ROC AUC.
 
-        return best_rf, feature_names
+        Parámetros:
+            df (pd.DataFrame): DataFrame con los datos de entrenamiento.
+            engines (list): Nombres de los motores a comparar.
+            test_size (float): Fracción de los datos reservada para la evaluación.
+            n_single (int): Número de predicciones de una fila para la latencia unitaria.
+
+        Retorna:
+            pd.DataFrame: Una fila por motor con sus métricas.
+        """
+        train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=test_size, random_state=42,
+                                               stratify=df[target[0]])
+        results = []
+        for name in engines:
+            engine = self.get_engine(name)
+            print(f"Evaluando motor {name}...")
+            X, y, feature_names = self.X_transform_preprocessed(df, engine)
+            y = np.asarray(y)
+
+            model = engine.build(engine.load_params(self.PATH_MODELS), self.load_feature_pipeline())
+            start = time.perf_counter()
+            model.fit(X[train_idx], y[train_idx])
+            fit_seconds = time.perf_counter() - start
+
+            buffer = io.BytesIO()
+            joblib.dump(model, buffer)
+
+            X_test, y_test = X[test_idx], y[test_idx]
+            single = []
+            for i in range(min(n_single, len(test_idx))):
+                start = time.perf_counter()
+                model.predict_proba(X_test[i:i + 1])
+                single.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            proba = model.predict_proba(X_test)[:, 1]
+            batch_seconds = time.perf_counter() - start
+
+            results.append({
+                'engine': name,
+                'n_features': len(feature_names),
+                'fit_seconds': fit_seconds,
+                'model_size_mb': buffer.tell() / 1e6,
+                'single_row_latency_ms': np.median(single) * 1e3,
+                'batch_latency_ms_per_1k_rows': batch_seconds / len(test_idx) * 1e6,
+                'accuracy': accuracy_score(y_test, model.classes_.take((proba >= 0.5).astype(int))),
+                'roc_auc': roc_auc_score(y_test, proba),
+            })
+
+        return pd.DataFrame(results)
 
     def save_feature_importance(self, importances, feature_names, top_n=10):
         """
@@ -0,0 +1,127 @@
+import re
+import json
+from pathlib import Path
+import numpy as np
+
+
+class OnnxSentenceEncoder:
+    """
+    Esta clase genera embeddings de oraciones con el modelo de SentenceTransformer exportado a ONNX y
+    cuantizado a int8 (cuantización dinámica), ejecutado con ONNX Runtime en CPU con un número
+    explícito de hilos. Replica el pooling promedio (mean pooling) del modelo original y expone el
+    mismo `encode` que SentenceTransformer, de modo que puede reemplazarlo sin cambiar a quien lo usa.
+
+    Métodos:
+        export(): Exporta el modelo de Hugging Face a ONNX, lo cuantiza a int8 y guarda el tokenizador.
+        tokenizer: Tokenizador rápido (librería tokenizers) del modelo exportado (carga diferida).
+        session: Sesión de ONNX Runtime del modelo cuantizado (carga diferida).
+        encode(texts, batch_size=100, convert_to_numpy=True): Genera los embeddings de una lista de textos.
+    """
+    def __init__(self, model_name, path="models/onnx", intra_op_threads=1, max_seq_length=128):
+        """
+        Inicializa el OnnxSentenceEncoder, sin cargar aún el modelo.
+
+        Parámetros:
+            model_name (str): Nombre del modelo de SentenceTransformer (sin el prefijo de organización
+            se asume `sentence-transformers/`).
+            path (str): Carpeta base de los modelos exportados.
+            intra_op_threads (int): Hilos de ONNX Runtime por operación (0 usa todos los núcleos).
+            max_seq_length (int): Longitud máxima en tokens, igual que el modelo original.
+        """
+        self.model_name = model_name
+        self.path = Path(path) / re.sub(r'[^\w.-]', '_', model_name)
+        self.model_path = self.path / 'model.int8.onnx'
+        self.intra_op_threads = intra_op_threads
+        self.max_seq_length = max_seq_length
+        self._tokenizer = None
+        self._session = None
+
+    def export(self):
+        """
+        Exporta el modelo de Hugging Face a ONNX (fp32), lo cuantiza a int8 con `quantize_dynamic`
+        y guarda el tokenizador. Solo se requiere torch en este paso.
+        """
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        hf_name = self.model_name if '/' in self.model_name else f"sentence-transformers/{self.model_name}"
+        print(f"Exportando {hf_name} a ONNX int8 en {self.path}...")
+        self.path.mkdir(parents=True, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(hf_name)
+        model = AutoModel.from_pretrained(hf_name).eval()
+
+        fp32_path = self.path / 'model.onnx'
+        sample = tokenizer(["texto de ejemplo"], return_tensors='pt')
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'}
+                        for name in ('input_ids', 'attention_mask', 'last_hidden_state')}
+        with torch.no_grad():
+            torch.onnx.export(model, (sample['input_ids'], sample['attention_mask']), str(fp32_path),
+                              input_names=['input_ids', 'attention_mask'],
+                              output_names=['last_hidden_state'], dynamic_axes=dynamic_axes,
+                              opset_version=14)
+        quantize_dynamic(str(fp32_path), str(self.model_path), weight_type=QuantType.QInt8)
+        fp32_path.unlink()
+
+        tokenizer.save_pretrained(self.path)
+        (self.path / 'encoder.json').write_text(json.dumps({
+            'model_name': hf_name, 'max_seq_length': self.max_seq_length,
+            'pad_token': tokenizer.pad_token, 'pad_id': tokenizer.pad_token_id
+        }))
+
+    @property
+    def tokenizer(self):
+        """Tokenizador rápido del modelo exportado, con truncamiento y relleno al más largo del lote."""
+        if self._tokenizer is None:
+            from tokenizers import Tokenizer
+            if not self.model_path.exists():
+                self.export()
+            config = json.loads((self.path / 'encoder.json').read_text())
+            self._tokenizer = Tokenizer.from_file(str(self.path / 'tokenizer.json'))
+            self._tokenizer.enable_truncation(max_length=config['max_seq_length'])
+            self._tokenizer.enable_padding(pad_id=config['pad_id'], pad_token=config['pad_token'])
+        return self._tokenizer
+
+    @property
+    def session(self):
+        """Sesión de ONNX Runtime en CPU con `intra_op_threads` hilos por operación."""
+        if self._session is None:
+            import onnxruntime as ort
+            if not self.model_path.exists():
+                self.export()
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.intra_op_threads
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = ort.InferenceSession(str(self.model_path), options,
+                                                 providers=['CPUExecutionProvider'])
+        return self._session
+
+    def encode(self, texts, batch_size=100, convert_to_numpy=True):
+        """
+        Genera los embeddings de una lista de textos con pooling promedio sobre los tokens válidos.
+
+        Parámetros:
+            texts (list): Textos a codificar.
+            batch_size (int): Número de textos por inferencia.
+            convert_to_numpy (bool): Se acepta por compatibilidad con SentenceTransformer.encode.
+
+        Retorna:
+            np.ndarray: Matriz float32 de embeddings, una fila por texto.
+        """
+        input_names = {model_input.name for model_input in self.session.get_inputs()}
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[start:start + batch_size]))
+            inputs = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            }
+            hidden = self.session.run(None, {name: value for name, value in inputs.items()
+                                             if name in input_names})[0]
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        if not batches:
+            return np.empty((0, self.session.get_outputs()[0].shape[-1]), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32)
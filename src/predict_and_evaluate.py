@@ -1,6 +1,7 @@
-import joblib
 from pathlib import Path
+from config import ConfigEnv
 from src.model_training import ModelTraining
+from src.stage_profiler import PROFILER
 from sklearn.metrics import accuracy_score, roc_auc_score
 import warnings
 warnings.filterwarnings("ignore")
@@ -14,12 +15,16 @@ class PredictAndEvaluate:
         evaluate_model(df): Evalúa un modelo calculando Accuracy y ROC AUC en train y test.
     """
 
-    def __init__(self):
+    def __init__(self, engine=ConfigEnv.MODEL_ENGINE):
         """
         Initializes the PredictAndEvaluate instance.
+
+        Parámetros:
+            engine (str): Motor de entrenamiento del modelo a evaluar (rf - hgb).
         """
         self.PATH_MODELS = Path("./models")
         self.mt = ModelTraining()
+        self.engine = self.mt.get_engine(engine)
 
     def evaluate_model(self, df):
         """
@@ -33,16 +38,16 @@ class PredictAndEvaluate:
         Retorna:
             dict con métricas en train y test.
         """
-        X_test, y_test, _ = self.mt.X_transform_preprocessed(df)
+        X_test, y_test, _ = self.mt.X_transform_preprocessed(df, self.engine)
 
         print("Cargar modelo")
-        model_path = self.PATH_MODELS / 'best_rf.pkl'
-        model = joblib.load(model_path)
+        model = self.engine.load_model(self.PATH_MODELS)
         print("Modelo cargado correctamente")
 
         # Predicciones
-        y_test_pred = model.predict(X_test)
-        y_test_prob = model.predict_proba(X_test)[:, 1]
+        with PROFILER.stage('predict', rows_in=len(X_test)):
+            y_test_pred = model.predict(X_test)
+            y_test_prob = model.predict_proba(X_test)[:, 1]
 
         # Calcular métricas
         results = {
@@ -0,0 +1,86 @@
+from contextlib import asynccontextmanager
+from config import ConfigEnv
+from src.micro_batcher import MicroBatcher
+from src.scoring_pipeline import ScoringPipeline
+
+
+class PredictionServer:
+    """
+    Esta clase expone el ScoringPipeline como un servicio HTTP (ASGI, FastAPI) de larga vida: todos los
+    artefactos ajustados se cargan al iniciar y quedan en memoria, y las solicitudes concurrentes se
+    agrupan con un MicroBatcher antes de las etapas de embeddings y del bosque.
+
+    Rutas:
+        POST /predict: Recibe un registro o una lista de registros con la forma de las líneas del archivo
+        .jsonlines y retorna, por registro, 'id', 'p_new' y 'predicted_condition'.
+        GET /metrics: Latencia p50/p99, throughput y tamaño de los lotes.
+        GET /health: Estado del servicio.
+
+    Métodos:
+        create_app(): Construye la aplicación FastAPI.
+        run(host, port): Inicia el servidor con uvicorn.
+    """
+    def __init__(self, pipeline=None, max_batch_size=ConfigEnv.SERVER_MAX_BATCH_SIZE,
+                 max_wait_ms=ConfigEnv.SERVER_MAX_WAIT_MS):
+        """
+        Inicializa el PredictionServer.
+
+        Parámetros:
+            pipeline (ScoringPipeline): Pipeline de puntuación (por defecto, el del motor configurado).
+            max_batch_size (int): Máximo de registros por micro-lote.
+            max_wait_ms (float): Espera máxima, en milisegundos, para completar un micro-lote.
+        """
+        self.pipeline = pipeline or ScoringPipeline()
+        self.batcher = MicroBatcher(self.score_records, max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms)
+
+    def score_records(self, records):
+        """Puntúa un micro-lote y retorna un dict por registro."""
+        return self.pipeline.score(records).to_dict('records')
+
+    def create_app(self):
+        """
+        Construye la aplicación FastAPI; al iniciar carga los artefactos y arranca el micro-batching.
+
+        Retorna:
+            FastAPI: Aplicación ASGI.
+        """
+        from fastapi import Body, FastAPI, HTTPException
+
+        @asynccontextmanager
+        async def lifespan(app):
+            print("Cargando artefactos del modelo ...")
+            self.pipeline.warm_up()
+            self.batcher.start()
+            print("Servidor listo.")
+            yield
+            await self.batcher.stop()
+
+        app = FastAPI(title="ML Condition Predictor", lifespan=lifespan)
+
+        @app.post("/predict")
+        async def predict(payload=Body(...)):
+            records = payload if isinstance(payload, list) else [payload]
+            if not records or not all(isinstance(record, dict) for record in records):
+                raise HTTPException(status_code=422,
+                                    detail="Se espera un registro JSON o una lista de registros")
+            try:
+                return {'predictions': await self.batcher.submit(records)}
+            except Exception as error:
+                raise HTTPException(status_code=500, detail=f"Error al puntuar el lote: {error}")
+
+        @app.get("/metrics")
+        async def metrics():
+            return self.batcher.metrics()
+
+        @app.get("/health")
+        async def health():
+            return {'status': 'ok', 'engine': self.pipeline.engine.name}
+
+        return app
+
+    def run(self, host=ConfigEnv.SERVER_HOST, port=ConfigEnv.SERVER_PORT):
+        """Inicia el servidor con uvicorn (un solo proceso, los artefactos quedan en memoria)."""
+        import uvicorn
+
+        uvicorn.run(self.create_app(), host=host, port=port)
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from config import ConfigEnv
+from constants.constants import categorias_MELI
+from src.data_preprocessing import DataPreprocessing
+from src.feature_engineering import FeatureEngineering
+from src.model_training import ModelTraining
+from src.stage_cache import StageCache
+from src.stage_profiler import PROFILER
+
+
+class ScoringPipeline:
+    """
+    Esta clase encadena, con todos los artefactos ajustados cargados una sola vez, las etapas de `predict`
+    para registros crudos con la misma forma que los del archivo .jsonlines: limpieza e imputación
+    (DataPreprocessing), ingeniería de variables (FeatureEngineering, con spaCy, el modelo de embeddings
+    y el índice de municipios ya cargados), FeaturePipeline y el modelo del motor configurado. Está pensada
+    para procesos de larga vida (servidor de predicción, workers de scoring por lotes).
+
+    Métodos:
+        warm_up(): Carga todos los artefactos y recursos antes de la primera predicción.
+        score(records): Retorna la probabilidad de 'new' y la condición predicha de cada registro.
+    """
+    def __init__(self, engine=ConfigEnv.MODEL_ENGINE, quiet=True):
+        """
+        Inicializa el ScoringPipeline.
+
+        Parámetros:
+            engine (str): Motor de entrenamiento del modelo a usar (rf - hgb).
+            quiet (bool): Si es True, silencia los mensajes de avance de las etapas en cada lote.
+        """
+        self.PATH_MODELS = Path("./models")
+        self.quiet = quiet
+        self.dp = DataPreprocessing()
+        # Los lotes del servicio no se guardan en el caché de etapas por fila ni se reparten en un pool
+        self.fe = FeatureEngineering(cache=StageCache(enabled=False), n_workers=1)
+        self.mt = ModelTraining()
+        self.engine = self.mt.get_engine(engine)
+        self.model = None
+        self.feature_pipeline = None
+
+    def warm_up(self):
+        """Carga los transformadores, el FeaturePipeline, el modelo y los recursos de texto y municipios."""
+        self.dp.load_transformers()
+        self.feature_pipeline = self.mt.load_feature_pipeline()
+        self.model = self.engine.load_model(self.PATH_MODELS)
+        self.fe.load_imputer()
+        self.fe.warm_up()
+        return self
+
+    @PROFILER.track('scoring', rows_in='records', rows_out=True)
+    def score(self, records):
+        """
+        Calcula la predicción de un lote de registros crudos.
+
+        Parámetros:
+            records (list): Registros (dict) con la forma de las líneas del archivo .jsonlines.
+
+        Retorna:
+            pd.DataFrame: Una fila por registro, en el mismo orden, con las columnas 'id',
+            'p_new' (probabilidad de 'new') y 'predicted_condition' ('new' - 'used').
+        """
+        if self.model is None:
+            self.warm_up()
+
+        with contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext():
+            df_clean = self.dp.transform(self.dp.clean_data_init(records))
+            df_features = self.fe.feature_engineering_vars(df_clean, categorias_MELI, fit=False)
+            X, _ = self.engine.transform(self.feature_pipeline, df_features)
+
+        proba = self.model.predict_proba(X)[:, list(self.model.classes_).index(1)]
+        return pd.DataFrame({
+            'id': [record.get('id') for record in records],
+            'p_new': proba,
+            'predicted_condition': np.where(proba >= 0.5, 'new', 'used'),
+        })
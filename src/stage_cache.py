@@ -0,0 +1,234 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import ConfigEnv
+from src.artifact_store import ArtifactStore
+
+
+class StageCache:
+    """
+    Esta clase implementa el caché incremental y direccionado por contenido de las etapas del pipeline,
+    en dos niveles:
+
+    - Por etapa: la salida de un comando (ej. `df_processed`) se registra con una llave que resume sus
+      datos de entrada, sus parámetros y las versiones de su código y de los modelos que usa. Si la
+      llave coincide y los archivos de salida no cambiaron, el comando se omite y se reutiliza la salida.
+    - Por fila: las etapas cuyas filas se calculan de forma independiente (limpieza de los registros
+      crudos, variables de texto y geográficas) guardan su salida por llave de fila (hash del contenido
+      de la fila) en partes Parquet dentro de `<path>/<etapa>/<versión>/`. Solo se calculan las filas
+      cuya llave no está en el caché, de modo que al agregar publicaciones nuevas solo se procesan esas.
+      Al cambiar la versión de una etapa se descartan las partes de las versiones anteriores.
+
+    Métodos:
+        digest(*parts): Hash de valores serializables en JSON.
+        row_keys(values): Llave de cada fila a partir de su contenido (bytes o texto).
+        frame_keys(df, columns): Llave de cada fila a partir de los valores de varias columnas.
+        code_version(*objects): Hash del código fuente de módulos, clases o funciones.
+        file_digest(path): Hash del contenido de un archivo (None si no existe).
+        array_digest(*arrays): Hash del contenido de arreglos de numpy.
+        output_digests(paths): Hash de cada archivo de salida de una etapa.
+        is_fresh(store, name, cache_key): Indica si un artefacto está al día con la llave de su etapa.
+        load_rows(stage, version): Filas guardadas de una etapa y versión.
+        save_rows(stage, version, df): Agrega una parte con filas nuevas de una etapa.
+        apply(stage, version, keys, compute): Retorna la salida por fila, calculando solo las que faltan;
+        la versión puede ser una función, evaluada solo con el caché activo.
+        stats(stage): Filas, llaves únicas, filas reutilizadas y calculadas de una etapa.
+    """
+    KEY_COLUMN = '_row_key'
+    MAX_PARTS = 16
+
+    def __init__(self, path=ConfigEnv.STAGE_CACHE_PATH, enabled=ConfigEnv.STAGE_CACHE):
+        """
+        Inicializa el StageCache.
+
+        Parámetros:
+            path (str): Carpeta de las partes por fila de cada etapa.
+            enabled (bool): Si es False, no se omiten etapas ni se guardan o reutilizan filas.
+        """
+        self.path = Path(path)
+        self.enabled = enabled
+        self._rows = {}
+        self._stats = {}
+
+    @staticmethod
+    def digest(*parts):
+        """Hash (blake2b de 128 bits, en hexadecimal) de valores serializables en JSON."""
+        h = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+            h.update(b'\x1e')
+        return h.hexdigest()
+
+    @staticmethod
+    def row_keys(values):
+        """
+        Llave de cada fila a partir de su contenido.
+
+        Parámetros:
+            values (list): Bytes (ej. líneas crudas del archivo .jsonlines) o textos.
+
+        Retorna:
+            np.ndarray: Llaves hexadecimales, una por fila.
+        """
+        return np.array([hashlib.blake2b(value if isinstance(value, bytes) else str(value).encode('utf-8'),
+                                         digest_size=16).hexdigest() for value in values], dtype=object)
+
+    @classmethod
+    def frame_keys(cls, df, columns):
+        """Llave de cada fila a partir de los valores de `columns`; los faltantes se distinguen del texto."""
+        values = [df[col].astype(object).where(df[col].notnull(), '\x00').astype(str) for col in columns]
+        return cls.row_keys(['\x1f'.join(row) for row in zip(*values)])
+
+    @classmethod
+    def code_version(cls, *objects):
+        """
+        Hash del código fuente de módulos, clases o funciones; los demás objetos (ej. constantes) se
+        incluyen por su valor.
+        """
+        sources = [inspect.getsource(obj) if inspect.ismodule(obj) or inspect.isclass(obj)
+                   or inspect.isfunction(obj) else obj for obj in objects]
+        return cls.digest(*sources)
+
+    @staticmethod
+    def file_digest(path):
+        """Hash del contenido de un archivo, o None si no existe."""
+        path = Path(path)
+        if not path.is_file():
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    @staticmethod
+    def array_digest(*arrays):
+        """Hash del contenido, la forma y el tipo de uno o más arreglos de numpy."""
+        h = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            h.update(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+            h.update(array.tobytes())
+        return h.hexdigest()
+
+    def output_digests(self, paths):
+        """Hash de cada archivo de salida de una etapa, para detectar si fue reemplazado o eliminado."""
+        return {str(path): self.file_digest(path) for path in paths}
+
+    def is_fresh(self, store, name, cache_key):
+        """
+        Indica si el artefacto `name` se generó con la misma llave de etapa y si sus archivos de salida
+        registrados siguen intactos.
+
+        Parámetros:
+            store (ArtifactStore): Almacén del artefacto.
+            name (str): Nombre del artefacto (ej. 'df_processed').
+            cache_key (str): Llave actual de la etapa (None si no se puede calcular).
+
+        Retorna:
+            bool: True si la etapa se puede omitir.
+        """
+        if not self.enabled or cache_key is None or not store.artifact_path(name).exists():
+            return False
+        metadata = store.metadata(name)
+        if metadata.get('cache_key') != cache_key:
+            return False
+        outputs = metadata.get('outputs', {})
+        return all(self.file_digest(path) == digest for path, digest in outputs.items())
+
+    def stage_path(self, stage, version):
+        """Carpeta de las partes de una etapa y versión."""
+        return self.path / stage / version
+
+    def load_rows(self, stage, version):
+        """
+        Carga (una vez por proceso) las filas guardadas de una etapa y versión.
+
+        Retorna:
+            pd.DataFrame: Filas con la columna de llave; vacío si no hay partes.
+        """
+        if (stage, version) not in self._rows:
+            store = ArtifactStore(self.stage_path(stage, version))
+            parts = [store.load(path.stem) for path in sorted(store.path.glob('part-*.parquet'))]
+            rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame({self.KEY_COLUMN: []})
+            self._rows[(stage, version)] = rows.drop_duplicates(self.KEY_COLUMN, ignore_index=True)
+        return self._rows[(stage, version)]
+
+    def save_rows(self, stage, version, df):
+        """
+        Agrega una parte con filas nuevas de forma atómica (archivo temporal y renombrado), elimina las
+        versiones anteriores de la etapa y, si hay más de `MAX_PARTS` partes, las compacta en una.
+
+        Parámetros:
+            stage (str): Nombre de la etapa.
+            version (str): Versión de la etapa.
+            df (pd.DataFrame): Filas nuevas, con la columna de llave.
+        """
+        store = ArtifactStore(self.stage_path(stage, version))
+        for old in store.path.parent.glob('*') if store.path.parent.exists() else []:
+            if old.name != version:
+                shutil.rmtree(old, ignore_errors=True)
+
+        def write(rows):
+            name = f"part-{uuid.uuid4().hex}"
+            tmp_path = store.save(rows, f"_tmp-{name}", stage=stage, version=version)
+            os.replace(tmp_path, store.artifact_path(name))
+
+        write(df)
+        parts = sorted(store.path.glob('part-*.parquet'))
+        if len(parts) > self.MAX_PARTS:
+            rows = pd.concat([store.load(path.stem) for path in parts], ignore_index=True)
+            write(rows.drop_duplicates(self.KEY_COLUMN, ignore_index=True))
+            for path in parts:
+                path.unlink()
+
+    def apply(self, stage, version, keys, compute):
+        """
+        Retorna la salida de una etapa por fila, reutilizando las filas cuya llave ya está en el caché y
+        calculando una sola vez cada llave faltante.
+
+        Parámetros:
+            stage (str): Nombre de la etapa.
+            version (str | callable): Versión de la etapa (parámetros, código y modelos), o una función
+            sin argumentos que la retorna; la función solo se evalúa con el caché activo.
+            keys (np.ndarray): Llave de cada fila.
+            compute (callable): Recibe las posiciones de las filas a calcular y retorna un DataFrame con
+            su salida, una fila por posición y en el mismo orden.
+
+        Retorna:
+            pd.DataFrame: Salida de la etapa, una fila por llave y en el mismo orden, con índice 0..n-1.
+        """
+        if not self.enabled:
+            return compute(np.arange(len(keys))).reset_index(drop=True)
+        if callable(version):
+            version = version()
+
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+        rows = self.load_rows(stage, version)
+        positions = pd.Index(rows[self.KEY_COLUMN]).get_indexer(uniques)
+        missing = np.flatnonzero(positions < 0)
+        if len(missing):
+            first_rows = np.unique(codes, return_index=True)[1]
+            computed = compute(first_rows[missing]).reset_index(drop=True)
+            computed.insert(0, self.KEY_COLUMN, np.asarray(uniques)[missing])
+            self.save_rows(stage, version, computed)
+            rows = pd.concat([rows, computed], ignore_index=True) if len(rows) else computed
+            self._rows[(stage, version)] = rows
+            positions = pd.Index(rows[self.KEY_COLUMN]).get_indexer(uniques)
+
+        stats = self._stats.setdefault(stage, {'rows': 0, 'unique': 0, 'hits': 0, 'misses': 0})
+        stats['rows'] += len(keys)
+        stats['unique'] += len(uniques)
+        stats['hits'] += len(uniques) - len(missing)
+        stats['misses'] += len(missing)
+        return rows.iloc[positions[codes]].drop(columns=self.KEY_COLUMN).reset_index(drop=True)
+
+    def stats(self, stage):
+        """Filas, llaves únicas, llaves reutilizadas (hits) y calculadas (misses) de una etapa."""
+        return self._stats.get(stage, {'rows': 0, 'unique': 0, 'hits': 0, 'misses': 0})
@@ -0,0 +1,259 @@
+import functools
+import inspect
+import json
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+class StageProfiler:
+    """
+    Esta clase registra métricas por etapa del pipeline (aplanado, imputación, limpieza de garantía y
+    títulos, categorización, match geográfico, codificación, validación cruzada, ajuste y predicción):
+    tiempo de reloj, tiempo de CPU del proceso, incremento del pico de memoria residente (RSS), filas de
+    entrada y salida y filas por segundo. Las etapas se marcan con `stage(...)` en el código; mientras
+    el profiler está inactivo no se registra nada. Los resultados se exportan a JSON y al formato de
+    texto de Prometheus, y una etapa elegida se puede perfilar además con cProfile o pyinstrument.
+
+    Métodos:
+        enable(command, capture_stage, capture_tool): Activa el registro para un comando.
+        stage(name, rows_in): Context manager que mide una etapa; `rows_out` se asigna en el registro.
+        track(name, rows_in, rows_out): Decorador que mide cada llamada a un método como una etapa.
+        collect(): Retorna y vacía los registros (procesos de un pool).
+        merge(records): Agrega los registros medidos en otro proceso.
+        summary(): Métricas agregadas por etapa.
+        to_prometheus(): Métricas en formato de texto de Prometheus.
+        dump(path): Escribe los archivos JSON, Prometheus y de la captura en una carpeta.
+    """
+    METRIC_PREFIX = 'ml_condition_stage'
+
+    def __init__(self):
+        """Inicializa el StageProfiler inactivo."""
+        self.enabled = False
+        self.command = None
+        self.capture_stage = None
+        self.capture_tool = 'cprofile'
+        self.capture = None
+        self.records = []
+        self._lock = threading.Lock()
+
+    def enable(self, command, capture_stage=None, capture_tool='cprofile'):
+        """
+        Activa el registro de etapas.
+
+        Parámetros:
+            command (str): Nombre del comando perfilado (etiqueta de las métricas y de los archivos).
+            capture_stage (str): Etapa a capturar con un perfilador de funciones (None para ninguna).
+            capture_tool (str): 'cprofile' o 'pyinstrument'.
+        """
+        if capture_tool not in ('cprofile', 'pyinstrument'):
+            raise ValueError(f"Perfilador desconocido: {capture_tool} (opciones: cprofile, pyinstrument)")
+        self.enabled = True
+        self.command = command
+        self.capture_stage = capture_stage
+        self.capture_tool = capture_tool
+        self.capture = None
+        self.records = []
+
+    @staticmethod
+    def peak_rss_mb():
+        """Pico de memoria residente del proceso en MB (ru_maxrss se reporta en KB en Linux)."""
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    @staticmethod
+    def rows_per_second(entry):
+        """Filas por segundo: filas de entrada (o de salida si no hay) sobre el tiempo de reloj."""
+        rows = entry['rows_in'] if entry['rows_in'] is not None else entry['rows_out']
+        return rows / entry['wall_seconds'] if rows and entry['wall_seconds'] else None
+
+    def _start_capture(self):
+        """Inicia el perfilador de funciones de la etapa capturada."""
+        if self.capture_tool == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def _stop_capture(self, profiler):
+        """Detiene el perfilador de funciones y lo conserva para `dump`."""
+        if self.capture_tool == 'pyinstrument':
+            profiler.stop()
+        else:
+            profiler.disable()
+        self.capture = profiler
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Mide una etapa. El registro entregado admite asignar `record['rows_out']` dentro del bloque.
+
+        Parámetros:
+            name (str): Nombre de la etapa.
+            rows_in (int): Filas de entrada de la etapa.
+
+        Retorna:
+            dict: Registro de la etapa (vacío y sin efecto si el profiler está inactivo).
+        """
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        if not self.enabled:
+            yield record
+            return
+
+        capture = self._start_capture() if name == self.capture_stage and self.capture is None else None
+        rss_before = self.peak_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            record['peak_rss_mb'] = self.peak_rss_mb()
+            record['peak_rss_delta_mb'] = record['peak_rss_mb'] - rss_before
+            record['rows_per_second'] = self.rows_per_second(record)
+            if capture is not None:
+                self._stop_capture(capture)
+            with self._lock:
+                self.records.append(record)
+
+    def track(self, name, rows_in=None, rows_out=False):
+        """
+        Decorador que mide cada llamada de la función decorada como la etapa `name`.
+
+        Parámetros:
+            name (str): Nombre de la etapa.
+            rows_in (str): Nombre del argumento cuyo largo son las filas de entrada (None para no contar).
+            rows_out (bool): Si es True, las filas de salida son el largo del resultado (o de su primer
+            elemento si es una tupla).
+
+        Retorna:
+            callable: Decorador.
+        """
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                n_in = len(signature.bind(*args, **kwargs).arguments[rows_in]) if rows_in else None
+                with self.stage(name, rows_in=n_in) as record:
+                    result = func(*args, **kwargs)
+                    if rows_out:
+                        record['rows_out'] = len(result[0] if isinstance(result, tuple) else result)
+                    return result
+            return wrapper
+        return decorator
+
+    def collect(self):
+        """
+        Retorna los registros acumulados y los vacía. Los procesos de un pool lo llaman al terminar cada
+        tarea para enviar sus registros al proceso padre junto con el resultado.
+
+        Retorna:
+            list: Registros medidos desde el último `collect` (vacía si el profiler está inactivo).
+        """
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def merge(self, records):
+        """Agrega los registros medidos en otro proceso (ver `collect`)."""
+        with self._lock:
+            self.records.extend(records)
+
+    def summary(self):
+        """
+        Agrega los registros por etapa, en el orden en que se ejecutaron por primera vez: suma tiempos y
+        filas, cuenta las llamadas y conserva el mayor incremento de pico de RSS.
+
+        Retorna:
+            list: Un dict por etapa.
+        """
+        stages = {}
+        for record in self.records:
+            total = stages.setdefault(record['stage'], {
+                'stage': record['stage'], 'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                'peak_rss_delta_mb': 0.0, 'rows_in': None, 'rows_out': None})
+            total['calls'] += 1
+            total['wall_seconds'] += record['wall_seconds']
+            total['cpu_seconds'] += record['cpu_seconds']
+            total['peak_rss_delta_mb'] = max(total['peak_rss_delta_mb'], record['peak_rss_delta_mb'])
+            for key in ('rows_in', 'rows_out'):
+                if record[key] is not None:
+                    total[key] = (total[key] or 0) + record[key]
+        for total in stages.values():
+            total['rows_per_second'] = self.rows_per_second(total)
+        return list(stages.values())
+
+    def to_prometheus(self):
+        """
+        Retorna las métricas agregadas en formato de texto de Prometheus, con las etiquetas `command` y
+        `stage`.
+
+        Retorna:
+            str: Texto con un bloque HELP/TYPE por métrica.
+        """
+        metrics = {
+            'wall_seconds': 'Tiempo de reloj de la etapa en segundos',
+            'cpu_seconds': 'Tiempo de CPU del proceso durante la etapa en segundos',
+            'peak_rss_delta_mb': 'Incremento del pico de memoria residente durante la etapa en MB',
+            'rows_in': 'Filas de entrada de la etapa',
+            'rows_out': 'Filas de salida de la etapa',
+            'rows_per_second': 'Filas por segundo de la etapa',
+            'calls': 'Número de ejecuciones de la etapa',
+        }
+        summary = self.summary()
+        lines = []
+        for metric, description in metrics.items():
+            name = f"{self.METRIC_PREFIX}_{metric}"
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+            for total in summary:
+                if total[metric] is not None:
+                    labels = f'command="{self.command}",stage="{total["stage"]}"'
+                    lines.append(f"{name}{{{labels}}} {total[metric]}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Escribe `<comando>_<fecha>.json` (registros y resumen), `<comando>_<fecha>.prom` y, si se capturó
+        una etapa, `.prof` (cProfile, legible con pstats/snakeviz) o `.html` (pyinstrument).
+
+        Parámetros:
+            path (str | Path): Carpeta de destino.
+
+        Retorna:
+            list: Rutas de los archivos escritos.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        created_at = datetime.now(timezone.utc)
+        base = path / f"{self.command}_{created_at.strftime('%Y%m%dT%H%M%S')}"
+
+        report = {'command': self.command, 'created_at': created_at.isoformat(),
+                  'peak_rss_mb': self.peak_rss_mb(), 'stages': self.summary(), 'records': self.records}
+        paths = [base.with_suffix('.json'), base.with_suffix('.prom')]
+        with open(paths[0], 'w') as f:
+            json.dump(report, f, indent=2)
+        with open(paths[1], 'w') as f:
+            f.write(self.to_prometheus())
+
+        if self.capture is not None:
+            if self.capture_tool == 'pyinstrument':
+                paths.append(base.with_suffix('.html'))
+                with open(paths[-1], 'w') as f:
+                    f.write(self.capture.output_html())
+            else:
+                paths.append(base.with_suffix('.prof'))
+                self.capture.dump_stats(paths[-1])
+        return paths
+
+
+# Profiler del proceso, compartido por todas las etapas del pipeline
+PROFILER = StageProfiler()
@@ -0,0 +1,113 @@
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+
+
+class TextCache:
+    """
+    Esta clase implementa un caché persistente en disco (SQLite) para los resultados de normalización
+    de texto. Cada entrada se identifica por el texto y los parámetros de limpieza, y el caché completo
+    se invalida cuando cambia su versión (modelo de spaCy, lista de stopwords). El tamaño se acota
+    eliminando las entradas menos usadas recientemente.
+
+    Métodos:
+        make_key(text, **params): Genera la llave de una entrada a partir del texto y los parámetros.
+        get_many(keys): Retorna las entradas existentes para una lista de llaves.
+        set_many(items): Guarda nuevas entradas y aplica la política de tamaño máximo.
+        stats(): Retorna los contadores de aciertos y fallos del caché.
+    """
+    def __init__(self, path, version, max_entries=1000000):
+        """
+        Inicializa el TextCache. La conexión a la base de datos se abre en el primer uso.
+
+        Parámetros:
+            path (str): Ruta del archivo SQLite.
+            version (str): Versión del caché; si difiere de la guardada, el caché se vacía.
+            max_entries (int): Número máximo de entradas antes de eliminar las menos usadas.
+        """
+        self.path = Path(path)
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+
+    @property
+    def conn(self):
+        """Conexión SQLite, creada y validada contra la versión en el primer uso."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS entries "
+                               "(key TEXT PRIMARY KEY, value TEXT, last_access REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(text, **params):
+        """Genera la llave de una entrada a partir del texto y los parámetros de limpieza."""
+        payload = json.dumps([text, sorted(params.items())], ensure_ascii=False, default=list)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys, batch=500):
+        """
+        Retorna las entradas existentes y actualiza su último acceso.
+
+        Parámetros:
+            keys (list): Llaves a consultar.
+            batch (int): Número de llaves por consulta SQL.
+
+        Retorna:
+            dict: Llave -> texto normalizado, solo para las llaves encontradas.
+        """
+        found = {}
+        for i in range(0, len(keys), batch):
+            chunk = keys[i:i + batch]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk).fetchall()
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            self.conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?",
+                                  [(now, key) for key in found])
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items):
+        """
+        Guarda nuevas entradas y, si se supera `max_entries`, elimina las menos usadas recientemente.
+
+        Parámetros:
+            items (dict): Llave -> texto normalizado.
+        """
+        now = time.time()
+        self.conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                              [(key, value, now) for key, value in items.items()])
+        n_entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if n_entries > self.max_entries:
+            self.conn.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries "
+                              "ORDER BY last_access LIMIT ?)", (n_entries - self.max_entries,))
+        self.conn.commit()
+
+    def stats(self):
+        """Retorna los contadores de aciertos, fallos y la tasa de aciertos del caché."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
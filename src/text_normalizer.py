@@ -1,71 +1,160 @@
-import unicodedata
-import spacy
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer
 import re
+import time
+import hashlib
+import unicodedata
+from importlib.metadata import version
+import numpy as np
+import pandas as pd
 from config import ConfigEnv
-from constants.constants import LANGUAGE_MAPPING
+from constants.constants import LANGUAGE_MAPPING, SPACY_DISABLED_COMPONENTS, TEXT_CACHE_VERSION
+from src.text_cache import TextCache
+
+# Expresiones regulares compiladas una sola vez
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+SPACES_PATTERN = re.compile(r'\s+')
 
 
 class TextNormalizer:
     """
     Esta clase proporciona métodos para la limpieza y normalización de texto en español e inglés.
     Incluye eliminación de stopwords, lematización, stemming y limpieza de caracteres especiales.
+    El modelo de spaCy, las stopwords, el stemmer y el caché se cargan de forma diferida en el primer
+    uso, y los recursos de NLTK solo se descargan si no están en disco.
 
     Métodos:
+        nlp: Modelo de spaCy (carga diferida).
+        stop_words: Conjunto de stopwords del idioma (carga diferida).
+        stemmer: SnowballStemmer del idioma (carga diferida).
+        cache: Caché persistente de textos normalizados (carga diferida).
         normalize_text(text): Normaliza el texto eliminando tildes y convirtiendo letras a minúsculas
         remove_stopwords(text, keep_words=[]): Elimina stopwords del texto en español o inglés,
         excepto términos clave.
         lemmatize_text(text): Aplica lematización al texto en español o inglés.
+        lemmatize_texts(texts, batch_size, n_process): Aplica lematización por lotes con `nlp.pipe`.
         stem_text(text): Aplica stemming al texto en español o inglés.
         clean_text_regex(text): Elimina caracteres especiales, tildes y normaliza el texto.
         clean_text(text, remove_sw=True, lemmatize=True, stem=False, use_regex=True, keep_words=[]):
             Aplica las funciones de limpieza según los parámetros especificados.
+        clean_texts(texts, remove_sw, lemmatize, stem, use_regex, keep_words, batch_size, n_process):
+            Versión por lotes de `clean_text`, que lematiza con `nlp.pipe` y conserva el orden.
+        clean_series(series, batch_size, n_process, **kwargs): Limpia solo los valores únicos de una
+        Serie, reutilizando el caché persistente, y mapea los resultados a todas las filas.
+        cache_version(): Versión del caché según el modelo de spaCy y la lista de stopwords.
+        cache_stats(): Contadores de filas, valores únicos y aciertos del caché.
     """
-    def __init__(self):
+    def __init__(self, use_cache=ConfigEnv.TEXT_CACHE):
         """
-        Inicializa TextNormalizer cargando el modelo de lenguaje adecuado según la configuración.
-        Descarga las stopwords necesarias para la limpieza del texto.
+        Inicializa TextNormalizer según el idioma configurado, sin cargar aún ningún recurso pesado.
+
+        Parámetros:
+            use_cache (bool): Si es True, `clean_series` usa el caché persistente en disco.
         """
         self.lenguage_env = LANGUAGE_MAPPING[ConfigEnv.LENGUAGE]
-        if self.lenguage_env == 'spanish':
-            self.nlp_es = spacy.load("es_core_news_sm")
-        else:
-            self.nlp_en = spacy.load("en_core_web_sm")
+        self.model_name = "es_core_news_sm" if self.lenguage_env == 'spanish' else "en_core_web_sm"
+        self.use_cache = use_cache
+        self.rows_seen = 0
+        self.unique_seen = 0
+        self._nlp = None
+        self._stop_words = None
+        self._stop_words_keep = {}
+        self._stemmer = None
+        self._cache = None
+
+    @property
+    def nlp(self):
+        """Modelo de spaCy del idioma, sin los componentes que no intervienen en la lematización."""
+        if self._nlp is None:
+            import spacy
+            start = time.perf_counter()
+            self._nlp = spacy.load(self.model_name, disable=SPACY_DISABLED_COMPONENTS)
+            print(f"Modelo {self.model_name} cargado en {time.perf_counter() - start:.2f} s")
+        return self._nlp
+
+    @property
+    def stop_words(self):
+        """Stopwords del idioma. Solo se descargan si el corpus de NLTK no está en disco."""
+        if self._stop_words is None:
+            import nltk
+            from nltk.corpus import stopwords
+            try:
+                nltk.data.find('corpora/stopwords')
+            except LookupError:
+                nltk.download('stopwords')
+            self._stop_words = frozenset(stopwords.words(self.lenguage_env))
+        return self._stop_words
+
+    @property
+    def stemmer(self):
+        """SnowballStemmer del idioma."""
+        if self._stemmer is None:
+            from nltk.stem import SnowballStemmer
+            self._stemmer = SnowballStemmer(self.lenguage_env)
+        return self._stemmer
+
+    @property
+    def cache(self):
+        """Caché persistente de textos normalizados, o None si está deshabilitado."""
+        if self._cache is None and self.use_cache:
+            self._cache = TextCache(ConfigEnv.TEXT_CACHE_PATH, self.cache_version(),
+                                    max_entries=ConfigEnv.TEXT_CACHE_MAX_ENTRIES)
+        return self._cache
+
+    def cache_version(self):
+        """Versión del caché: cambia con el modelo de spaCy, su versión o la lista de stopwords."""
+        stop_words = '\n'.join(sorted(self.stop_words))
+        stop_words_hash = hashlib.sha1(stop_words.encode('utf-8')).hexdigest()[:12]
+        model_version = version(self.model_name)
+        return f"v{TEXT_CACHE_VERSION}-{self.model_name}-{model_version}-{stop_words_hash}"
 
-        nltk.download('stopwords')
-        nltk.download('punkt')
+    def stop_words_without(self, keep_words=()):
+        """Stopwords del idioma excepto `keep_words`; el conjunto resultante se reutiliza entre llamadas."""
+        key = tuple(keep_words)
+        if key not in self._stop_words_keep:
+            self._stop_words_keep[key] = self.stop_words.difference(keep_words)
+        return self._stop_words_keep[key]
 
-    def normalize_text(self, text):
+    @staticmethod
+    def normalize_text(text):
         text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('utf-8')  # Quita tildes
         return text.lower().strip()
 
     def remove_stopwords(self, text, keep_words=[]):
         """Elimina stopwords del texto en español o inglés, excepto términos clave."""
-        stop_words = set(stopwords.words(self.lenguage_env))
-        stop_words.difference_update(keep_words)  # Asegura que las palabras en keep_words no sean eliminadas
+        stop_words = self.stop_words_without(keep_words)  # keep_words no se eliminan
         return ' '.join([word for word in text.split() if word.lower() not in stop_words])
 
     def lemmatize_text(self, text):
         """Aplica lematización al texto en español o inglés."""
-        nlp = self.nlp_es if self.lenguage_env == 'spanish' else self.nlp_en
-        doc = nlp(text)
+        doc = self.nlp(text)
         return ' '.join([token.lemma_ for token in doc])
 
+    def lemmatize_texts(self, texts, batch_size=ConfigEnv.SPACY_BATCH_SIZE,
+                        n_process=ConfigEnv.SPACY_N_PROCESS):
+        """
+        Aplica lematización por lotes con `nlp.pipe`, conservando el orden de entrada.
+
+        Parámetros:
+            texts (list): Lista de textos.
+            batch_size (int): Número de textos por lote enviado a spaCy.
+            n_process (int): Número de procesos de spaCy.
+
+        Retorna:
+            list: Textos lematizados en el mismo orden.
+        """
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        return [' '.join([token.lemma_ for token in doc]) for doc in docs]
+
     def stem_text(self, text):
         """Aplica stemming al texto en español o inglés."""
-        stemmer = SnowballStemmer(self.lenguage_env)
-        return ' '.join([stemmer.stem(word) for word in text.split()])
+        return ' '.join([self.stemmer.stem(word) for word in text.split()])
 
     def clean_text_regex(self, text):
         """Limpia texto eliminando caracteres especiales, quitando tildes y convirtiendo 'ñ' en 'n'."""
-        text = re.sub(r'http\S+|www\S+', '', text)  # Elimina URLs
-        text = re.sub(r'[^\w\s]', '', text)  # Elimina signos de puntuación
-        text = re.sub(r'\s+', ' ', text).strip()  # Reduce múltiples espacios
-        # text = re.sub(r'\d+', '', text)  # Elimina números
-        text = ''.join(char.lower() if char.isalpha() or
-                       char.isdigit() else char for char in text)  # Convierte letras a minúsculas
+        text = URL_PATTERN.sub('', text)  # Elimina URLs
+        text = PUNCTUATION_PATTERN.sub('', text)  # Elimina signos de puntuación
+        text = SPACES_PATTERN.sub(' ', text).strip()  # Reduce múltiples espacios
+        text = text.lower()  # Convierte letras a minúsculas
 
         # Normaliza el texto para eliminar tildes y cambiar 'ñ' por 'n'
         text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
@@ -99,3 +188,88 @@ class TextNormalizer:
         if stem:
             text = self.stem_text(text)
         return text
+
+    def clean_texts(self, texts, remove_sw=True, lemmatize=True, stem=False, use_regex=True, keep_words=[],
+                    batch_size=ConfigEnv.SPACY_BATCH_SIZE, n_process=ConfigEnv.SPACY_N_PROCESS):
+        """
+        Versión por lotes de `clean_text`: aplica la misma limpieza a una lista de textos, lematizando
+        con `nlp.pipe` en lugar de invocar el modelo de spaCy texto a texto.
+
+        Parámetros:
+            texts (iterable): Textos a limpiar.
+            remove_sw, lemmatize, stem, use_regex, keep_words: Igual que en `clean_text`.
+            batch_size (int): Número de textos por lote enviado a spaCy.
+            n_process (int): Número de procesos de spaCy.
+
+        Retorna:
+            list: Textos limpios y normalizados, en el mismo orden de entrada.
+        """
+        texts = list(texts)
+        stop_words = self.stop_words_without(keep_words) if remove_sw or lemmatize else frozenset()
+
+        def drop_stopwords(text):
+            return ' '.join([word for word in text.split() if word.lower() not in stop_words])
+
+        if use_regex:
+            texts = [self.clean_text_regex(text) for text in texts]
+        if remove_sw:
+            texts = [drop_stopwords(text) for text in texts]
+        if lemmatize:
+            texts = self.lemmatize_texts(texts, batch_size=batch_size, n_process=n_process)
+            texts = [drop_stopwords(self.clean_text_regex(text)) for text in texts]
+        if stem:
+            texts = [self.stem_text(text) for text in texts]
+        return texts
+
+    def clean_series(self, series, batch_size=ConfigEnv.SPACY_BATCH_SIZE,
+                     n_process=ConfigEnv.SPACY_N_PROCESS, **kwargs):
+        """
+        Limpia una Serie de textos procesando una sola vez cada valor único. Los valores ya normalizados
+        en ejecuciones anteriores se leen del caché persistente y solo los nuevos pasan por `clean_texts`.
+        Los faltantes (NaN o None) no se limpian y se retornan como NaN.
+
+        Parámetros:
+            series (pd.Series | list): Textos (str) a limpiar; admite faltantes.
+            batch_size (int): Número de textos por lote enviado a spaCy.
+            n_process (int): Número de procesos de spaCy.
+            **kwargs: Parámetros de limpieza de `clean_text` (remove_sw, lemmatize, stem, use_regex,
+            keep_words).
+
+        Retorna:
+            pd.Series: Textos limpios (NaN en los faltantes), con el mismo índice de entrada.
+        """
+        series = pd.Series(series)
+        codes, uniques = pd.factorize(series)
+        uniques = list(uniques)
+        self.rows_seen += len(series)
+        self.unique_seen += len(uniques)
+
+        if self.cache is None:
+            cleaned = self.clean_texts(uniques, batch_size=batch_size, n_process=n_process, **kwargs)
+        else:
+            keys = [self.cache.make_key(text, **kwargs) for text in uniques]
+            found = self.cache.get_many(keys)
+            missing = [i for i, key in enumerate(keys) if key not in found]
+            new_values = self.clean_texts([uniques[i] for i in missing], batch_size=batch_size,
+                                          n_process=n_process, **kwargs)
+            self.cache.set_many({keys[i]: value for i, value in zip(missing, new_values)})
+            found.update({keys[i]: value for i, value in zip(missing, new_values)})
+            cleaned = [found[key] for key in keys]
+
+        # La posición extra recibe los faltantes (código -1 de factorize)
+        values = np.append(np.asarray(cleaned, dtype=object), np.nan)
+        return pd.Series(values[codes], index=series.index)
+
+    def cache_stats(self):
+        """
+        Retorna los contadores de `clean_series`: filas recibidas, valores únicos procesados y,
+        si el caché está activo, aciertos/fallos del caché persistente.
+        """
+        stats = {
+            'rows': self.rows_seen,
+            'unique': self.unique_seen,
+            'dedup_rate': 1 - self.unique_seen / self.rows_seen if self.rows_seen else 0.0
+        }
+        if self._cache is not None:
+            stats.update(self._cache.stats())
+        return stats